@@ -0,0 +1,208 @@
+"""HTTP API for programmatic Kimaiko imports, on the same engine as the Streamlit app.
+
+Run locally with:
+    uvicorn api:app --port 8000
+
+Endpoints:
+    POST   /jobs              submit a job: mapping document + source workbooks (multipart)
+    GET    /jobs              list the jobs
+    GET    /jobs/{id}         job status and timings
+    GET    /jobs/{id}/result  download the generated archive
+    DELETE /jobs/{id}         remove a finished job and its files
+"""
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi.responses import FileResponse
+
+from utils.file_operations import (generate_kimaiko_files, open_source_file, resolve_source, get_used_source_files,
+                                   OUTPUT_FORMATS, DEFAULT_PART_ROWS)
+from utils.frame_store import FrameStore
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+
+# Uploaded sources and generated archives are kept here, one directory per job
+JOBS_DIR = Path(os.environ.get("KIMAIKO_JOBS_DIR") or tempfile.mkdtemp(prefix="kimaiko-jobs-"))
+
+# Number of jobs generated at the same time; the others wait in the queue
+API_WORKERS = int(os.environ.get("KIMAIKO_API_WORKERS", "2"))
+
+# Uploads are copied to disk by chunks of this size, never held whole in memory
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+ARCHIVE_NAME = "import_kimaiko.zip"
+
+app = FastAPI(title="Import Kimaiko")
+
+_jobs: Dict[str, Dict] = {}
+_jobs_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=API_WORKERS, thread_name_prefix="kimaiko-job")
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+def _update_job(job_id: str, **fields) -> None:
+    with _jobs_lock:
+        _jobs[job_id].update(fields)
+
+def _job_view(job: Dict) -> Dict:
+    """Public fields of a job"""
+    return {key: job[key] for key in ("id", "status", "error", "submitted_at", "started_at",
+                                      "finished_at", "sources", "output_formats", "timings")}
+
+def _get_job(job_id: str) -> Dict:
+    with _jobs_lock:
+        if job_id not in _jobs:
+            raise HTTPException(status_code=404, detail=f"Tâche '{job_id}' inconnue")
+        return dict(_jobs[job_id])
+
+def _parse_mapping_document(content: bytes) -> Dict:
+    """
+    Read the mapping document: the mappings themselves, as configured in the
+    app, or an object with a "mappings" key
+    """
+    try:
+        document = json.loads(content)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Document de mapping invalide: {str(e)}")
+    if isinstance(document, dict) and isinstance(document.get("mappings"), dict):
+        document = document["mappings"]
+    if not isinstance(document, dict) or not all(isinstance(m, dict) for m in document.values()):
+        raise HTTPException(status_code=422, detail="Le document de mapping doit associer chaque modèle à ses colonnes")
+    return document
+
+async def _save_upload(upload: UploadFile, path: Path) -> None:
+    """Copy an upload to disk chunk by chunk"""
+    with open(path, "wb") as f:
+        while chunk := await upload.read(UPLOAD_CHUNK_SIZE):
+            f.write(chunk)
+    await upload.close()
+
+def _run_job(job_id: str) -> None:
+    """Load the job's sources and generate its archive (worker thread)"""
+    job = _get_job(job_id)
+    job_dir = JOBS_DIR / job_id
+    timings = dict(job["timings"])
+    started = time.perf_counter()
+    timings["queued_seconds"] = round(started - job["submitted_clock"], 3)
+    _update_job(job_id, status="running", started_at=_now(), timings=dict(timings))
+
+    store = FrameStore(str(job_dir))
+    try:
+        step = time.perf_counter()
+        source_files = {name: open_source_file(path, store=store) for name, path in job["source_paths"].items()}
+        for name in source_files:
+            resolve_source(source_files, name)
+        timings["load_seconds"] = round(time.perf_counter() - step, 3)
+
+        step = time.perf_counter()
+        archive = generate_kimaiko_files(job["mappings"], source_files, job["output_formats"], part_rows=job["part_rows"])
+        (job_dir / ARCHIVE_NAME).write_bytes(archive)
+        timings["generate_seconds"] = round(time.perf_counter() - step, 3)
+
+        timings["total_seconds"] = round(timings["upload_seconds"] + time.perf_counter() - started, 3)
+        _update_job(job_id, status="done", finished_at=_now(), timings=timings,
+                    sources={name: info['row_count'] for name, info in source_files.items()})
+        logging.info("Tâche %s terminée: %s", job_id, timings)
+    except Exception as e:
+        logging.error("Tâche %s en échec: %s", job_id, str(e))
+        _update_job(job_id, status="failed", error=str(e), finished_at=_now(), timings=timings)
+    finally:
+        store.cleanup()
+        shutil.rmtree(job_dir / "sources", ignore_errors=True)
+
+@app.post("/jobs", status_code=202)
+async def submit_job(mapping: UploadFile = File(..., description="Document JSON des mappings"),
+                     sources: List[UploadFile] = File(..., description="Fichiers sources Excel, nommés comme dans le mapping"),
+                     formats: str = Form("xlsx", description="Formats de sortie séparés par des virgules"),
+                     part_rows: int = Form(DEFAULT_PART_ROWS, gt=0)) -> Dict:
+    """Submit an import job; the sources are named after their file name without extension, as in the app"""
+    mappings = _parse_mapping_document(await mapping.read())
+    output_formats = [f.strip() for f in formats.split(",") if f.strip()]
+    unknown = [f for f in output_formats if f not in OUTPUT_FORMATS]
+    if not output_formats or unknown:
+        raise HTTPException(status_code=422, detail=f"Formats inconnus: {unknown}, formats disponibles: {list(OUTPUT_FORMATS)}")
+
+    stems = [Path(upload.filename or "").stem for upload in sources]
+    duplicates = sorted({stem for stem in stems if stems.count(stem) > 1})
+    if duplicates:
+        raise HTTPException(status_code=400, detail=f"Fichiers sources envoyés plusieurs fois: {duplicates}")
+    names = dict(zip(stems, sources))
+    missing = sorted(get_used_source_files(mappings) - set(names))
+    if missing:
+        raise HTTPException(status_code=422, detail=f"Fichiers sources manquants: {missing}")
+
+    job_id = uuid.uuid4().hex
+    sources_dir = JOBS_DIR / job_id / "sources"
+    sources_dir.mkdir(parents=True)
+    start = time.perf_counter()
+    source_paths = {}
+    for i, (name, upload) in enumerate(names.items()):
+        # Stored under the upload position: the client's file name is only used as source name
+        source_paths[name] = sources_dir / f"{i:03d}.xlsx"
+        await _save_upload(upload, source_paths[name])
+
+    job = {
+        "id": job_id,
+        "status": "queued",
+        "error": None,
+        "submitted_at": _now(),
+        "started_at": None,
+        "finished_at": None,
+        "sources": {name: None for name in source_paths},
+        "output_formats": output_formats,
+        "timings": {"upload_seconds": round(time.perf_counter() - start, 3)},
+        "mappings": mappings,
+        "part_rows": part_rows,
+        "source_paths": source_paths,
+        "submitted_clock": time.perf_counter()
+    }
+    with _jobs_lock:
+        _jobs[job_id] = job
+    _executor.submit(_run_job, job_id)
+    logging.info("Tâche %s soumise (%d fichiers sources)", job_id, len(source_paths))
+    return _job_view(job)
+
+@app.get("/jobs")
+def list_jobs() -> List[Dict]:
+    with _jobs_lock:
+        return [_job_view(job) for job in _jobs.values()]
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str) -> Dict:
+    return _job_view(_get_job(job_id))
+
+@app.get("/jobs/{job_id}/result")
+def download_result(job_id: str) -> FileResponse:
+    """Stream the generated archive from disk"""
+    job = _get_job(job_id)
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Tâche '{job_id}' non terminée (statut: {job['status']})")
+    return FileResponse(JOBS_DIR / job_id / ARCHIVE_NAME, media_type="application/zip", filename=ARCHIVE_NAME)
+
+@app.delete("/jobs/{job_id}", status_code=204)
+def delete_job(job_id: str) -> None:
+    job = _get_job(job_id)
+    if job["status"] in ("queued", "running"):
+        raise HTTPException(status_code=409, detail=f"Tâche '{job_id}' en cours")
+    with _jobs_lock:
+        _jobs.pop(job_id, None)
+    shutil.rmtree(JOBS_DIR / job_id, ignore_errors=True)
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host=os.environ.get("KIMAIKO_API_HOST", "127.0.0.1"), port=int(os.environ.get("KIMAIKO_API_PORT", "8000")))
@@ -1,8 +1,9 @@
 import streamlit as st
-from ui.demo_mode import render_demo_mode, init_demo_mode
-from ui.standard_mode import render_standard_mode, init_standard_mode
 from utils.demo_config import DEMO_DESCRIPTIONS
 
+# The modes are imported when entered: the welcome screen needs neither
+# pandas nor openpyxl
+
 # Configure Streamlit page
 st.set_page_config(
     page_title="Import Kimaiko",
@@ -40,6 +41,7 @@ def main():
             - Parfait pour comprendre le fonctionnement
             """)
             if st.button("📚 Démarrer la Démo", help="Utiliser des données d'exemple"):
+                from ui.demo_mode import init_demo_mode
                 st.session_state.mode = "demo"
                 init_demo_mode()
                 st.rerun()
@@ -53,6 +55,7 @@ def main():
             - Pour l'utilisation réelle
             """)
             if st.button("🔧 Mode Standard", help="Utiliser vos propres fichiers"):
+                from ui.standard_mode import init_standard_mode
                 st.session_state.mode = "standard"
                 init_standard_mode()
                 st.rerun()
@@ -69,9 +72,11 @@ def main():
         st.header(progress_text[st.session_state.step])
         
         if st.session_state.mode == "demo":
+            from ui.demo_mode import render_demo_mode
             st.info(DEMO_DESCRIPTIONS["demo_mode"])
             render_demo_mode()
         else:
+            from ui.standard_mode import render_standard_mode
             render_standard_mode()
 
 if __name__ == "__main__":
@@ -0,0 +1,70 @@
+"""Mesure le temps de démarrage : imports de chaque étape et chargement de la démo.
+
+Chaque mesure est faite dans un nouvel interpréteur, modules non chargés.
+
+Usage: python benchmarks/bench_startup.py [--runs 5]
+"""
+import argparse
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Code exécuté par étape ; chaque ligne mesure ce que l'étape ajoute à la précédente
+STAGES = [
+    ("accueil", "import streamlit; import utils.demo_config"),
+    ("mode démo", "import ui.demo_mode"),
+    ("mode standard", "import ui.standard_mode")
+]
+
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "openpyxl"]
+
+def run_child(code: str, cwd: Path) -> str:
+    """Exécute code dans un nouvel interpréteur et retourne sa sortie"""
+    result = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True, check=True)
+    return result.stdout
+
+def time_stage(setup: str, statement: str, runs: int) -> tuple[float, list]:
+    """Durée médiane de statement après setup, et modules lourds chargés à la fin"""
+    code = (
+        f"import sys, time\nsys.path.insert(0, {str(ROOT)!r})\n{setup}\n"
+        f"start = time.perf_counter()\n{statement}\n"
+        f"print(time.perf_counter() - start)\n"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    durations, loaded = [], ""
+    for _ in range(runs):
+        elapsed, loaded = run_child(code, ROOT).splitlines()[-2:]
+        durations.append(float(elapsed))
+    return statistics.median(durations), [m for m in loaded.split(",") if m]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'Étape':<28}{'Durée (s)':>12}  Modules lourds chargés")
+    setup = ""
+    for name, statement in STAGES:
+        elapsed, loaded = time_stage(setup, statement, args.runs)
+        print(f"{'import ' + name:<28}{elapsed:>12.3f}  {', '.join(loaded) or '-'}")
+        setup += statement + "\n"
+
+    # Démo sans cache (copie des classeurs), puis avec le cache écrit par le premier chargement
+    with tempfile.TemporaryDirectory() as demo_copy:
+        for filename in (ROOT / "demo_files").glob("*.xlsx"):
+            shutil.copy2(filename, demo_copy)
+        setup = f"import shutil\nfrom pathlib import Path\nfrom utils.file_operations import load_demo_files"
+        clear = f"shutil.rmtree(Path({demo_copy!r}) / '.cache', ignore_errors=True)"
+        load = f"load_demo_files(Path({demo_copy!r}))"
+        cold, _ = time_stage(f"{setup}\n{clear}", load, args.runs)
+        warm, _ = time_stage(setup, load, args.runs)
+    print(f"{'démo (classeurs xlsx)':<28}{cold:>12.3f}")
+    print(f"{'démo (cache binaire)':<28}{warm:>12.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Mesure le débit des transformations de colonnes (utils.transforms).
+
+Usage: python benchmarks/bench_transforms.py [--rows 1000000]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from utils.transforms import compile_transforms
+
+def build_columns(rows: int) -> dict:
+    """Génère des colonnes sources représentatives des extractions"""
+    rng = np.random.default_rng(42)
+    days = pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 2000, rows), unit="D")
+    amounts = rng.integers(0, 10_000_000, rows) / 100
+    return {
+        "texte": pd.Series(np.char.add("  code-", rng.integers(0, 50_000, rows).astype(str))),
+        "date": pd.Series(days.strftime("%d/%m/%Y")),
+        "montant": pd.Series([f"{a:,.2f}".replace(",", " ").replace(".", ",") for a in amounts]),
+        "telephone": pd.Series(np.char.add("+33 6 ", rng.integers(10_000_000, 99_999_999, rows).astype(str))),
+        "statut": pd.Series(rng.choice(["A", "I", "S"], rows))
+    }
+
+CASES = [
+    ("trim + upper", "texte", [{"op": "trim"}, {"op": "upper"}]),
+    ("date %d/%m/%Y", "date", [{"op": "date", "format": "%d/%m/%Y"}]),
+    ("number fr", "montant", [{"op": "number", "locale": "fr"}]),
+    ("regex_replace", "telephone", [{"op": "regex_replace", "pattern": r"[^0-9+]", "replacement": ""}]),
+    ("lookup", "statut", [{"op": "lookup", "table": {"A": "Actif", "I": "Inactif"}, "default": "Suspendu"}])
+]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    columns = build_columns(args.rows)
+    print(f"{'Transformation':<16}{'Durée (s)':>12}{'Lignes/s':>16}")
+    for name, column, specs in CASES:
+        transform = compile_transforms(specs)
+        start = time.perf_counter()
+        transform(columns[column])
+        elapsed = time.perf_counter() - start
+        print(f"{name:<16}{elapsed:>12.3f}{args.rows / elapsed:>16,.0f}")
+
+if __name__ == "__main__":
+    main()
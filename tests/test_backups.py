@@ -0,0 +1,19 @@
+import pandas as pd
+from utils.data_processing import backup_data, restore_backup
+
+def test_backup_round_trip_keeps_dtypes(tmp_path):
+    df = pd.DataFrame({
+        "Date": pd.to_datetime(["2024-01-15 10:30", "2024-02-01 00:00", None]),
+        "Echeance": pd.to_datetime(["2024-03-01", "2024-03-02", "2024-03-03"]).tz_localize("Europe/Paris"),
+        "Quantite": [1, 2, 3],
+        "Statut": pd.Categorical(["Actif", "Inactif", "Actif"]),
+        # Texte ressemblant à une date : reste du texte
+        "date_saisie": ["2024-01-15", "inconnue", "2024-01-17"]
+    })
+    backup_file = backup_data(df, "Factures", backup_dir=str(tmp_path))
+
+    restored = restore_backup(backup_file)
+    pd.testing.assert_frame_equal(restored, df)
+
+    chunks = list(restore_backup(backup_file, chunksize=2))
+    assert [str(dtype) for dtype in chunks[1].dtypes] == [str(dtype) for dtype in df.dtypes]
@@ -0,0 +1,28 @@
+import pandas as pd
+from utils.filters import compile_filters
+from utils.file_operations import optimize_dataframe
+
+def _source():
+    # Dates répétées : optimize_dataframe en fait une colonne catégorielle, comme à l'import
+    df = optimize_dataframe(pd.DataFrame({
+        "Date": ["2023-12-31", "2024-01-01", "2024-06-30", "2024-01-01", None, "2025-02-01"] * 2
+    }))
+    assert isinstance(df["Date"].dtype, pd.CategoricalDtype)
+    return df
+
+def test_ge_on_categorical_text_column():
+    mask = compile_filters([{"column": "Date", "op": "ge", "value": "2024-01-01"}])(_source())
+    assert mask.tolist() == [False, True, True, True, False, True] * 2
+
+def test_between_on_categorical_text_column():
+    mask = compile_filters([{"column": "Date", "op": "between", "value": ["2024-01-01", "2024-12-31"]}])(_source())
+    assert mask.tolist() == [False, True, True, True, False, False] * 2
+
+def test_eq_keeps_categorical_column():
+    mask = compile_filters([{"column": "Date", "op": "eq", "value": "2024-01-01"}])(_source())
+    assert mask.tolist() == [False, True, False, True, False, False] * 2
+
+def test_ne_drops_missing_values():
+    df = pd.DataFrame({"Code": ["A", None, "B"], "Montant": [1.0, float("nan"), 2.0]})
+    assert compile_filters([{"column": "Code", "op": "ne", "value": "A"}])(df).tolist() == [False, False, True]
+    assert compile_filters([{"column": "Montant", "op": "ne", "value": 1}])(df).tolist() == [False, False, True]
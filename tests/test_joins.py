@@ -0,0 +1,10 @@
+import numpy as np
+import pandas as pd
+from utils.file_operations import join_positions
+
+def test_join_int_keys_with_float_keys():
+    left = pd.DataFrame({"Numero": np.array([3, 1, 2, 4], dtype="int64")})
+    # Colonne d'entiers avec une cellule vide : lue en float64
+    right = pd.DataFrame({"Numero": [1.0, 2.0, np.nan, 3.0], "Libelle": ["a", "b", "c", "d"]})
+    join = {"source_file": "Libelles", "on": ["Numero"]}
+    assert join_positions(left, right, join, "Articles").tolist() == [3, 0, 1, -1]
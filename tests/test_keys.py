@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+from utils.keys import key_text
+from utils.file_operations import hash_key_columns, build_key_index, resolve_references
+from utils.interning import KeyPool
+from utils.uuids import new_uuids
+
+def test_key_text_writes_integral_floats_as_int():
+    assert key_text(pd.Series([1.0, np.nan, 2.5])).tolist() == ["1", None, "2.5"]
+
+def test_hash_key_columns_matches_int_and_float_columns():
+    # Une colonne d'entiers avec des cellules vides est lue comme flottante
+    ints = pd.DataFrame({"Site": ["A", "B"], "Numero": [1, 2]})
+    floats = pd.DataFrame({"Site": ["A", "B", "C"], "Numero": [1.0, 2.0, np.nan]})
+    int_hashes = hash_key_columns(ints, ["Site", "Numero"])
+    float_hashes = hash_key_columns(floats, ["Site", "Numero"])
+    assert int_hashes.tolist() == float_hashes[:2].tolist()
+    assert float_hashes.isna().tolist() == [False, False, True]
+
+def test_key_pool_reuses_codes_of_float_keys():
+    pool = KeyPool()
+    assert pool.encode(pd.Series([1, 2])).tolist() == [0, 1]
+    assert pool.encode(pd.Series([1.0, np.nan])).tolist() == [0, -1]
+    assert len(pool) == 2
+
+def test_resolve_float_references_to_int_keys():
+    pool = KeyPool()
+    ids = new_uuids(2)
+    key_index = build_key_index(pd.DataFrame({"Code": [10, 20]}), ["Code"], pd.Series(ids), pool)
+    resolved, unresolved = resolve_references(pd.Series([20.0, np.nan, 10.0, 30.0]), key_index, pool)
+    assert resolved.iloc[[0, 2]].tolist() == [ids[1], ids[0]]
+    assert resolved.iloc[[1, 3]].isna().all()
+    assert unresolved.to_dict() == {"30": 1}
@@ -1,10 +1,17 @@
 # UI package initialization
-from .demo_mode import render_demo_mode, init_demo_mode
-from .standard_mode import render_standard_mode, init_standard_mode
+# Exports are resolved on first access: each mode is imported when it is entered
+import importlib
 
-__all__ = [
-    'render_demo_mode',
-    'init_demo_mode',
-    'render_standard_mode',
-    'init_standard_mode'
-]
+_EXPORTS = {
+    'render_demo_mode': '.demo_mode',
+    'init_demo_mode': '.demo_mode',
+    'render_standard_mode': '.standard_mode',
+    'init_standard_mode': '.standard_mode'
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
@@ -0,0 +1,350 @@
+import json
+import streamlit as st
+import pandas as pd
+from utils.transforms import TRANSFORMS, compile_transforms
+from utils.filters import FILTERS, compile_filters, filter_columns
+from utils.preflight import check_reference_integrity, profile_model_keys
+from utils.file_operations import (DUPLICATE_POLICIES, JOIN_VALIDATIONS, get_source_mapping, get_key_columns,
+                                   get_model_joins, get_model_filters)
+from utils.snapshots import snapshot_source_files, list_snapshots, restore_source_files, SNAPSHOT_DIR
+from utils.projects import project_directory
+from utils.dry_run import dry_run, DRY_RUN_ROWS
+from utils.suggestions import suggest_mappings, suggest_references, apply_mapping_suggestions, apply_reference_suggestions
+
+def render_reference_check(mappings: dict, source_files: dict):
+    """Run the reference integrity pre-flight and display its report"""
+    if not st.button("🔍 Vérifier les références", help="Détecter les références orphelines avant la génération"):
+        return
+
+    with st.spinner("Analyse des références..."):
+        reports = check_reference_integrity(mappings, source_files)
+
+    if not reports:
+        st.info("Aucune colonne référence n'est configurée.")
+        return
+
+    errors = [r for r in reports if r['error']]
+    orphans = [r for r in reports if not r['error'] and r['orphan_values']]
+    if not errors and not orphans:
+        st.success("✅ Toutes les références sont résolues.")
+
+    for report in errors:
+        st.error(f"{report['model']}.{report['column']} : {report['error']}")
+
+    if orphans:
+        st.warning(f"⚠️ {len(orphans)} colonne(s) contiennent des références orphelines, elles seront laissées vides.")
+
+    st.dataframe(pd.DataFrame([{
+        "Modèle": r['model'],
+        "Colonne": r['column'],
+        "Modèle référencé": r['ref_model'],
+        "Clé": " + ".join(r['ref_key_cols'] or []),
+        "Valeurs distinctes": r['distinct_values'],
+        "Valeurs orphelines": r['orphan_values'],
+        "Occurrences orphelines": r['orphan_occurrences'],
+        "Exemples": ", ".join(map(str, r['samples']))
+    } for r in reports if not r['error']]))
+
+def render_key_profile(template_name: str, template_mapping: dict, source_files: dict):
+    """Display the key column profile of a model and its duplicate key policy"""
+    with st.expander("🔑 Clé du modèle et doublons"):
+        key_mapping = get_source_mapping(template_mapping)
+        if key_mapping is None:
+            st.info("Mappez au moins une colonne pour définir la clé du modèle.")
+            return
+
+        id_mapping = template_mapping.setdefault("ID", {"type": "uuid"})
+        source_columns = source_files[key_mapping["source_file"]]['columns']
+        key_cols = st.multiselect(
+            f"Colonnes clés dans {key_mapping['source_file']}",
+            options=source_columns,
+            default=[c for c in id_mapping.get("key_cols") or [key_mapping["source_col"]] if c in source_columns],
+            help="Sélectionnez plusieurs colonnes pour une clé composite (ex: société + numéro de facture)",
+            key=f"{template_name}_key_cols"
+        )
+        if len(key_cols) > 1:
+            id_mapping["key_cols"] = key_cols
+        else:
+            id_mapping.pop("key_cols", None)
+        st.write(f"Clé du modèle : **{' + '.join(get_key_columns(template_mapping))}**")
+
+        policies = list(DUPLICATE_POLICIES.keys())
+        id_mapping["on_duplicate"] = st.selectbox(
+            "En cas de clés dupliquées",
+            options=policies,
+            index=policies.index(id_mapping.get("on_duplicate", "keep")),
+            format_func=DUPLICATE_POLICIES.get,
+            key=f"{template_name}_on_duplicate"
+        )
+
+        if st.button("Analyser la clé", key=f"{template_name}_profile_key"):
+            with st.spinner("Analyse de la clé..."):
+                profile = profile_model_keys({template_name: template_mapping}, source_files)[template_name]
+            if profile['error']:
+                st.error(profile['error'])
+                return
+
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Clés vides", f"{profile['null_keys']:,}")
+            col2.metric("Clés dupliquées", f"{profile['duplicate_keys']:,}",
+                        help=f"{profile['duplicate_rows']:,} lignes en trop")
+            col3.metric("Quasi-doublons", f"{profile['near_duplicate_groups']:,}",
+                        help="Valeurs identiques à la casse ou aux espaces près")
+
+            if profile['duplicate_samples']:
+                st.write("Exemples de clés dupliquées :")
+                st.dataframe(pd.DataFrame(profile['duplicate_samples'], columns=["Clé", "Lignes"]))
+            if profile['near_duplicate_samples']:
+                st.write("Exemples de quasi-doublons :")
+                for group in profile['near_duplicate_samples']:
+                    st.markdown("- " + " / ".join(f"`{value}`" for value in group))
+
+def render_joins_editor(template_name: str, template_mapping: dict, source_files: dict):
+    """Declare, for each other source file of a model, the key columns its rows are joined on"""
+    key_mapping = get_source_mapping(template_mapping)
+    if key_mapping is None:
+        return
+    main_file = key_mapping["source_file"]
+    other_files = sorted({m["source_file"] for m in template_mapping.values()
+                          if isinstance(m, dict) and "source_file" in m} - {main_file})
+    if not other_files:
+        return
+
+    with st.expander("🔗 Jointures des fichiers sources"):
+        st.markdown(
+            f"Les lignes du modèle viennent de **{main_file}**. Les colonnes des autres fichiers sont "
+            "rapprochées sur des colonnes clés ; sans jointure, elles sont alignées par position."
+        )
+        id_mapping = template_mapping.setdefault("ID", {"type": "uuid"})
+        current = {join["source_file"]: join for join in get_model_joins(template_mapping)}
+        validations = list(JOIN_VALIDATIONS.keys())
+        joins = []
+        for name in other_files:
+            join = current.get(name, {})
+            col1, col2, col3 = st.columns(3)
+            on = col1.multiselect(
+                f"Colonnes de {main_file}",
+                options=source_files[main_file]['columns'],
+                default=[c for c in join.get("on", []) if c in source_files[main_file]['columns']],
+                key=f"{template_name}_{name}_join_on"
+            )
+            right_on = col2.multiselect(
+                f"Colonnes de {name}",
+                options=source_files[name]['columns'],
+                default=[c for c in join.get("right_on") or join.get("on", []) if c in source_files[name]['columns']],
+                key=f"{template_name}_{name}_join_right_on"
+            )
+            validate = col3.selectbox(
+                "Cardinalité",
+                options=validations,
+                index=validations.index(join.get("validate", "many_to_one")),
+                format_func=JOIN_VALIDATIONS.get,
+                key=f"{template_name}_{name}_join_validate"
+            )
+            if on and len(on) == len(right_on):
+                joins.append({"source_file": name, "on": on, "right_on": right_on, "validate": validate})
+            elif on or right_on:
+                st.warning(f"{name} : choisissez autant de colonnes de chaque côté")
+        if joins:
+            id_mapping["joins"] = joins
+        else:
+            id_mapping.pop("joins", None)
+
+def render_filters_editor(template_name: str, template_mapping: dict, source_files: dict):
+    """Edit the row filters of a model as one JSON document"""
+    key_mapping = get_source_mapping(template_mapping)
+    if key_mapping is None:
+        return
+
+    with st.expander("🔎 Filtre des lignes"):
+        st.markdown(
+            f"Seules les lignes de **{key_mapping['source_file']}** satisfaisant tous les filtres sont importées ; "
+            "les autres ne reçoivent pas d'UUID et ne peuvent pas être référencées. "
+            "Opérations disponibles : " + ", ".join(f"`{op}`" for op in FILTERS)
+        )
+        id_mapping = template_mapping.setdefault("ID", {"type": "uuid"})
+        current = get_model_filters(template_mapping)
+        text = st.text_area(
+            "Filtres (JSON)",
+            value=json.dumps(current, ensure_ascii=False, indent=2) if current else "[]",
+            placeholder='[{"column": "Statut", "op": "eq", "value": "Actif"}, {"column": "Date", "op": "ge", "value": "2024-01-01"}]',
+            key=f"{template_name}_filters"
+        )
+        try:
+            filters = json.loads(text or "[]")
+            if not isinstance(filters, list):
+                raise ValueError("Le document doit être une liste de filtres")
+            compile_filters(filters)
+            missing = [c for c in filter_columns(filters) if c not in source_files[key_mapping["source_file"]]['columns']]
+            if missing:
+                raise ValueError(f"Colonnes absentes de {key_mapping['source_file']}: {missing}")
+        except ValueError as e:
+            st.error(f"Filtres invalides : {str(e)}")
+            return
+
+        if filters:
+            id_mapping["filters"] = filters
+        else:
+            id_mapping.pop("filters", None)
+
+def render_transforms_editor(template_name: str, template_mapping: dict):
+    """Edit the declarative column transforms of a model as one JSON document"""
+    with st.expander("⚙️ Transformations des colonnes"):
+        st.markdown(
+            "Transformations appliquées à la colonne source entière, dans l'ordre. "
+            "Opérations disponibles : " + ", ".join(f"`{op}`" for op in TRANSFORMS)
+        )
+        current = {col: m["transforms"] for col, m in template_mapping.items()
+                   if isinstance(m, dict) and m.get("transforms")}
+        text = st.text_area(
+            "Transformations par colonne (JSON)",
+            value=json.dumps(current, ensure_ascii=False, indent=2) if current else "{}",
+            placeholder='{"Date": [{"op": "date", "format": "%d/%m/%Y"}], "Prix": [{"op": "number", "locale": "fr"}]}',
+            key=f"{template_name}_transforms"
+        )
+        try:
+            transforms = json.loads(text or "{}")
+            if not isinstance(transforms, dict):
+                raise ValueError("Le document doit associer chaque colonne à une liste de transformations")
+            for col, specs in transforms.items():
+                if not isinstance(template_mapping.get(col), dict) or "source_file" not in template_mapping[col]:
+                    raise ValueError(f"Colonne '{col}' non mappée")
+                compile_transforms(specs)
+        except ValueError as e:
+            st.error(f"Transformations invalides : {str(e)}")
+            return
+
+        for col, mapping in template_mapping.items():
+            if isinstance(mapping, dict) and "source_file" in mapping:
+                if transforms.get(col):
+                    mapping["transforms"] = transforms[col]
+                else:
+                    mapping.pop("transforms", None)
+
+def render_project_name(key: str) -> str:
+    """Project name input, shared by the steps through st.session_state.project_name.
+
+    Snapshots, checkpoints and delta state are kept per project (see utils.projects).
+    """
+    project = st.text_input(
+        "Nom du projet",
+        value=st.session_state.get('project_name', ''),
+        key=key,
+        help="Les instantanés, les modèles déjà générés et l'état des générations sont propres à ce projet : utilisez le même nom à chaque session"
+    ).strip()
+    st.session_state.project_name = project
+    return project
+
+def render_snapshot_controls(source_files: dict):
+    """Save the loaded sources as a snapshot of the project, or restore a previous one.
+
+    Returns the restored source files, or None if nothing was restored.
+    """
+    with st.expander("💾 Instantanés des données sources"):
+        project = render_project_name("project_name_sources")
+        if not project:
+            st.caption("Saisissez un nom de projet pour créer ou restaurer ses instantanés.")
+            return None
+        snapshot_dir = str(project_directory(SNAPSHOT_DIR, project))
+
+        if source_files and st.button("Créer un instantané", help="Sauvegarder les sources en Parquet compressé"):
+            with st.spinner("Création de l'instantané..."):
+                manifest_path = snapshot_source_files(source_files, snapshot_dir)
+            st.success(f"Instantané créé: {manifest_path}")
+
+        snapshots = list_snapshots(snapshot_dir, kind="sources")
+        if not snapshots:
+            st.caption(f"Aucun instantané disponible pour le projet {project}.")
+            return None
+
+        labels = {
+            s['path']: f"{s['created_at']} - {', '.join(s['files'])} "
+                       f"({sum(f['row_count'] for f in s['files'].values()):,} lignes)"
+            for s in snapshots
+        }
+        selected = st.selectbox("Instantané", list(labels), format_func=labels.get, key="snapshot_select")
+        if st.button("Restaurer l'instantané"):
+            with st.spinner("Restauration des données sources..."):
+                return restore_source_files(selected)
+    return None
+
+def render_mapping_suggestions(templates: dict, mappings: dict, source_files: dict):
+    """Suggest source columns by name and references by value overlap, and apply them on demand"""
+    with st.expander("💡 Suggestions de mapping"):
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Suggérer les colonnes", help="Rapprocher les colonnes des modèles des colonnes sources par leur nom"):
+                st.session_state.column_suggestions = suggest_mappings(templates, source_files)
+        with col2:
+            if st.button("Détecter les références", help="Comparer les valeurs des colonnes mappées aux clés des autres modèles"):
+                with st.spinner("Comparaison des valeurs..."):
+                    st.session_state.reference_suggestions = suggest_references(mappings, source_files)
+
+        column_suggestions = st.session_state.get('column_suggestions')
+        if column_suggestions:
+            st.dataframe(pd.DataFrame([{
+                "Modèle": model,
+                "Colonne": col,
+                "Suggestion": f"{s[0]['source_file']} › {s[0]['source_col']}",
+                "Score": s[0]['score'],
+                "Déjà mappée": "source_file" in (mappings.get(model, {}).get(col) or {})
+            } for model, model_suggestions in column_suggestions.items() for col, s in model_suggestions.items()]))
+            if st.button("Appliquer aux colonnes non mappées"):
+                applied = apply_mapping_suggestions(mappings, templates, column_suggestions)
+                st.session_state.column_suggestions = None
+                _reset_mapping_grids(templates)
+                st.success(f"{applied} colonne(s) mappée(s)")
+                st.rerun()
+
+        reference_suggestions = st.session_state.get('reference_suggestions')
+        if reference_suggestions is not None:
+            if not reference_suggestions:
+                st.info("Aucune référence probable détectée.")
+            else:
+                st.dataframe(pd.DataFrame([{
+                    "Modèle": s['model'],
+                    "Colonne": s['column'],
+                    "Modèle référencé": s['ref_model'],
+                    "Clé": s['ref_key'] or "Clé du modèle",
+                    "Valeurs trouvées": f"{s['containment']:.0%}",
+                    "Valeurs distinctes": s['distinct_values']
+                } for s in reference_suggestions]))
+                if st.button("Marquer comme références"):
+                    apply_reference_suggestions(mappings, reference_suggestions)
+                    st.session_state.reference_suggestions = None
+                    _reset_mapping_grids(templates)
+                    st.rerun()
+
+def _reset_mapping_grids(templates: dict):
+    """Drop the mapping grids' state so they are rebuilt from the updated mappings"""
+    for template_name in templates:
+        st.session_state.pop(f"{template_name}_grid_base", None)
+        st.session_state.pop(f"{template_name}_grid", None)
+
+def render_dry_run(mappings: dict, source_files: dict):
+    """Run the whole pipeline on a sample and preview each generated model inline"""
+    with st.expander("🧪 Essai à blanc sur un échantillon"):
+        sample_rows = st.number_input(
+            "Lignes par modèle",
+            min_value=1,
+            value=DRY_RUN_ROWS,
+            help="Les lignes référencées par l'échantillon (fournisseurs, articles...) sont ajoutées automatiquement",
+            key="dry_run_rows"
+        )
+        if not st.button("Lancer l'essai"):
+            return
+
+        try:
+            with st.spinner("Essai en cours..."):
+                result = dry_run(mappings, source_files, int(sample_rows))
+        except Exception as e:
+            st.error(f"Erreur lors de l'essai: {str(e)}")
+            return
+
+        st.caption(
+            f"Essai en {result['seconds']:.2f} s sur "
+            + ", ".join(f"{name} ({rows:,} lignes)" for name, rows in result['source_rows'].items())
+        )
+        for model_name, final_df in result['frames'].items():
+            st.markdown(f"**{model_name}** ({len(final_df):,} lignes)")
+            st.dataframe(final_df, hide_index=True)
@@ -2,6 +2,7 @@ import streamlit as st
 from pathlib import Path
 from utils.file_operations import load_demo_files, generate_kimaiko_files
 from utils.demo_config import DEFAULT_MAPPINGS, DEMO_DESCRIPTIONS
+from ui.components import render_reference_check
 
 def render_demo_mode():
     """Render the demo mode interface"""
@@ -24,7 +25,7 @@ def render_demo_mode():
         for name, info in st.session_state.source_files.items():
             with st.expander(f"📊 Données {name}"):
                 st.write("Aperçu des données:")
-                st.dataframe(info['data'].head())
+                st.dataframe(info['preview'])
                 st.write("Colonnes disponibles:")
                 for col in info['columns']:
                     st.markdown(f"- {col}")
@@ -50,10 +51,16 @@ def render_demo_mode():
                     if mapping.get('type') == 'uuid':
                         st.markdown(f"- **{col}** : Généré automatiquement (UUID)")
                     elif mapping.get('is_ref'):
-                        st.markdown(f"- **{col}** : {mapping['source_file']}.{mapping['source_col']} (avec UUID de {mapping['ref_model']})")
+                        st.markdown(f"- **{col}** : {mapping['source_file']}.{mapping['source_col']} (avec UUID de {mapping['ref_model']}, clé {mapping.get('ref_key') or 'du modèle'})")
+                    elif mapping.get('transforms'):
+                        ops = ", ".join(t['op'] for t in mapping['transforms'])
+                        st.markdown(f"- **{col}** : {mapping['source_file']}.{mapping['source_col']} (transformations : {ops})")
                     else:
                         st.markdown(f"- **{col}** : {mapping['source_file']}.{mapping['source_col']}")
         
+        # Pre-flight reference check
+        render_reference_check(st.session_state.mappings, st.session_state.source_files)
+        
         # File generation
         if st.button("✨ Générer et télécharger les résultats"):
             with st.spinner("Génération des fichiers en cours..."):
@@ -0,0 +1,153 @@
+import streamlit as st
+import pandas as pd
+from utils.file_operations import get_source_mapping
+
+# Separator between file and column in the "Source" cells
+SOURCE_SEPARATOR = " › "
+
+# Grid column headers
+GRID_COLUMNS = ["Colonne", "Source", "Référence", "Modèle référencé", "Clé référencée"]
+
+def get_source_signature(source_files: dict) -> tuple:
+    """Hashable summary of the loaded source files: their names and columns"""
+    return tuple((name, tuple(info['columns'])) for name, info in source_files.items())
+
+@st.cache_data(show_spinner=False)
+def get_source_options(source_signature: tuple) -> tuple[list, dict]:
+    """Build the "file › column" options once per set of source files, with their reverse lookup"""
+    lookup = {
+        f"{name}{SOURCE_SEPARATOR}{col}": (name, col)
+        for name, columns in source_signature
+        for col in columns
+    }
+    return list(lookup), lookup
+
+@st.cache_data(show_spinner=False)
+def get_ref_key_options(templates_signature: tuple, source_signature: tuple) -> list:
+    """All template and source columns that can serve as a referenced key"""
+    return sorted({str(col) for _, columns in templates_signature + source_signature for col in columns if col != "ID"})
+
+def is_valid_ref_key(ref_key: str, ref_model: str, templates: dict, mappings: dict, source_files: dict) -> bool:
+    """A referenced key is a template column of the referenced model or a column of its key source file"""
+    if ref_key in map(str, templates[ref_model]):
+        return True
+    key_mapping = get_source_mapping(mappings.get(ref_model, {}))
+    if key_mapping is None or key_mapping["source_file"] not in source_files:
+        return False
+    return ref_key in map(str, source_files[key_mapping["source_file"]]['columns'])
+
+def mapping_to_grid(columns: list, template_mapping: dict) -> pd.DataFrame:
+    """One grid row per template column, pre-filled from the current mapping"""
+    rows = []
+    for col in columns:
+        if col == "ID":
+            continue
+        mapping = template_mapping.get(col)
+        mapped = isinstance(mapping, dict) and "source_file" in mapping
+        rows.append({
+            "Colonne": col,
+            "Source": f"{mapping['source_file']}{SOURCE_SEPARATOR}{mapping['source_col']}" if mapped else None,
+            "Référence": bool(mapped and mapping.get("is_ref")),
+            "Modèle référencé": mapping.get("ref_model") if mapped else None,
+            "Clé référencée": mapping.get("ref_key") if mapped else None
+        })
+    return pd.DataFrame(rows, columns=GRID_COLUMNS)
+
+def apply_grid(grid: pd.DataFrame, columns: list, template_mapping: dict,
+               lookup: dict, templates: dict, mappings: dict, source_files: dict) -> list:
+    """
+    Write the edited grid back into the model mapping, in template column order.
+
+    Options set elsewhere (transforms, composite source columns, ID settings)
+    are kept. Returns the problems found in the grid.
+    """
+    errors = []
+    updated = {"ID": template_mapping.get("ID", {"type": "uuid"})}
+    for row in grid.itertuples(index=False, name=None):
+        col, source, is_ref, ref_model, ref_key = row
+        if pd.isna(source) or source not in lookup:
+            continue
+        mapping = template_mapping.get(col)
+        mapping = dict(mapping) if isinstance(mapping, dict) else {}
+        mapping["source_file"], mapping["source_col"] = lookup[source]
+        mapping["is_ref"] = bool(is_ref)
+
+        if mapping["is_ref"]:
+            if pd.isna(ref_model) or ref_model not in templates:
+                errors.append(f"{col} : choisissez le modèle référencé")
+                mapping["is_ref"] = False
+            else:
+                mapping["ref_model"] = ref_model
+                if pd.isna(ref_key):
+                    ref_key = None
+                elif not is_valid_ref_key(ref_key, ref_model, templates, mappings, source_files):
+                    errors.append(f"{col} : '{ref_key}' n'est pas une colonne de {ref_model}, clé du modèle utilisée")
+                    ref_key = None
+                mapping["ref_key"] = ref_key
+        if not mapping["is_ref"]:
+            for option in ("ref_model", "ref_key", "source_cols"):
+                mapping.pop(option, None)
+        updated[col] = mapping
+
+    # Rebuilt in place: the first mapped column stays the model's key column
+    template_mapping.clear()
+    template_mapping.update({col: updated[col] for col in ["ID"] + list(columns) if col in updated})
+    return errors
+
+@st.fragment
+def render_mapping_grid(template_name: str, columns: list, template_mapping: dict,
+                        source_files: dict, templates: dict, mappings: dict):
+    """
+    Edit a model's mapping as a single grid.
+
+    Running as a fragment, an edit only reruns this grid instead of the
+    whole page, and the option lists are memoized per set of source files.
+    """
+    source_signature = get_source_signature(source_files)
+    source_options, lookup = get_source_options(source_signature)
+    ref_key_options = get_ref_key_options(tuple((name, tuple(cols)) for name, cols in templates.items()), source_signature)
+
+    # The grid's base data only changes with the source files, edits are kept by the widget
+    base_key = f"{template_name}_grid_base"
+    if st.session_state.get(base_key, (None,))[0] != source_signature:
+        st.session_state[base_key] = (source_signature, mapping_to_grid(columns, template_mapping))
+
+    grid = st.data_editor(
+        st.session_state[base_key][1],
+        column_config={
+            "Colonne": st.column_config.TextColumn("Colonne", disabled=True),
+            "Source": st.column_config.SelectboxColumn(
+                "Source", options=source_options, help="Fichier source et colonne"
+            ),
+            "Référence": st.column_config.CheckboxColumn("Référence"),
+            "Modèle référencé": st.column_config.SelectboxColumn(
+                "Modèle référencé", options=list(templates.keys())
+            ),
+            "Clé référencée": st.column_config.SelectboxColumn(
+                "Clé référencée", options=ref_key_options,
+                help="Colonne du modèle référencé, ou de son fichier source, utilisée pour la correspondance (vide : clé du modèle)"
+            )
+        },
+        hide_index=True,
+        num_rows="fixed",
+        use_container_width=True,
+        key=f"{template_name}_grid"
+    )
+
+    for error in apply_grid(grid, columns, template_mapping, lookup, templates, mappings, source_files):
+        st.warning(error)
+
+    # Composite key: one source column per key column of the referenced model
+    for col, mapping in template_mapping.items():
+        if not isinstance(mapping, dict) or not mapping.get("is_ref") or mapping.get("ref_key") is not None:
+            continue
+        ref_key_cols = mappings.get(mapping["ref_model"], {}).get("ID", {}).get("key_cols") or []
+        if len(ref_key_cols) > 1:
+            source_columns = source_files[mapping["source_file"]]['columns']
+            mapping["source_cols"] = st.multiselect(
+                f"{col} : colonnes sources ({' + '.join(ref_key_cols)})",
+                options=source_columns,
+                default=[c for c in mapping.get("source_cols") or [mapping["source_col"]] if c in source_columns],
+                max_selections=len(ref_key_cols),
+                key=f"{template_name}_{col}_source_cols"
+            )
@@ -2,7 +2,16 @@ import streamlit as st
 import pandas as pd
 from pathlib import Path
 import logging
-from utils.file_operations import generate_kimaiko_files, optimize_dataframe
+from utils.file_operations import (generate_kimaiko_files, open_source_file, spill_source_files, OUTPUT_FORMATS,
+                                   DEFAULT_PART_ROWS, EXCEL_MAX_ROWS)
+from utils.snapshots import SNAPSHOT_DIR
+from utils.projects import project_directory
+from utils.checkpoints import CHECKPOINT_DIR
+from utils.deltas import DELTA_STATE_DIR
+from utils.frame_store import FrameStore
+from ui.components import (render_project_name, render_reference_check, render_key_profile, render_joins_editor, render_filters_editor,
+                           render_transforms_editor, render_snapshot_controls, render_mapping_suggestions, render_dry_run)
+from ui.mapping_editor import render_mapping_grid
 
 # Configure logging
 logging.basicConfig(
@@ -10,6 +19,24 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+def format_row_count(info: dict) -> str:
+    """Format the row count of a source file, flagging estimates"""
+    if info.get('row_count') is None:
+        return "inconnu (chargement en cours)"
+    if info.get('row_count_exact', True):
+        return f"{info['row_count']:,}"
+    return f"~{info['row_count']:,} (estimation)"
+
+def render_source_preview(name: str, info: dict):
+    """Display the preview of a source file"""
+    with st.expander(f"📊 Données {name}"):
+        st.write(f"Nombre total de lignes: {format_row_count(info)}")
+        st.write("Aperçu des données (5 premières lignes):")
+        st.dataframe(info['preview'])
+        st.write("Colonnes disponibles:")
+        for col in info['columns']:
+            st.markdown(f"- {col}")
+
 def render_standard_mode():
     """Render the standard mode interface"""
     if st.session_state.step == 1:
@@ -83,25 +110,14 @@ def render_standard_mode():
                     for i, file in enumerate(uploaded_files):
                         name = Path(file.name).stem
                         try:
-                            df = pd.read_excel(file)
-                            df = optimize_dataframe(df)  # Optimize memory usage
-                            
-                            row_count = len(df)
-                            st.session_state.source_files[name] = {
-                                'columns': df.columns.tolist(),
-                                'data': df,
-                                'row_count': row_count
-                            }
+                            # Only the header and the first rows are parsed here,
+                            # the full load continues in the background
+                            source_info = open_source_file(file, store=st.session_state.frame_store)
+                            st.session_state.source_files[name] = source_info
                             
                             progress_bar.progress((i + 1) / len(uploaded_files))
                             
-                            with st.expander(f"📊 Données {name}"):
-                                st.write(f"Nombre total de lignes: {row_count:,}")
-                                st.write("Aperçu des données (5 premières lignes):")
-                                st.dataframe(df.head())
-                                st.write("Colonnes disponibles:")
-                                for col in df.columns:
-                                    st.markdown(f"- {col}")
+                            render_source_preview(name, source_info)
                         except Exception as e:
                             st.error(f"Erreur lors du chargement de {name}: {str(e)}")
                             logging.error(f"Erreur lors du chargement de {name}: {str(e)}")
@@ -111,14 +127,19 @@ def render_standard_mode():
             else:
                 # Display existing file information
                 for name, info in st.session_state.source_files.items():
-                    with st.expander(f"📊 Données {name}"):
-                        st.write(f"Nombre total de lignes: {info['row_count']:,}")
-                        st.write("Aperçu des données (5 premières lignes):")
-                        st.dataframe(info['data'].head())
-                        st.write("Colonnes disponibles:")
-                        for col in info['columns']:
-                            st.markdown(f"- {col}")
-            
+                    render_source_preview(name, info)
+        elif st.session_state.get('source_files'):
+            # Sources restored from a snapshot
+            for name, info in st.session_state.source_files.items():
+                render_source_preview(name, info)
+        
+        restored = render_snapshot_controls(st.session_state.get('source_files', {}))
+        if restored is not None:
+            st.session_state.source_files = spill_source_files(restored, st.session_state.frame_store)
+            st.session_state.uploaded_source_files = set(restored)
+            st.rerun()
+        
+        if st.session_state.get('source_files'):
             col1, col2 = st.columns(2)
             with col1:
                 if st.button("⬅️ Retour aux modèles"):
@@ -137,6 +158,8 @@ def render_standard_mode():
         if 'mappings' not in st.session_state:
             st.session_state.mappings = {}
             
+        render_mapping_suggestions(st.session_state.kimaiko_templates, st.session_state.mappings, st.session_state.source_files)
+        
         # Nouvelle version avec tabs et grille
         tabs = st.tabs(list(st.session_state.kimaiko_templates.keys()))
         
@@ -147,64 +170,86 @@ def render_standard_mode():
                 
                 template_mapping = st.session_state.mappings[template_name]
                 
-                # Création d'une grille de 3 colonnes pour un affichage compact
-                for i in range(0, len(columns), 3):
-                    cols = st.columns(3)
-                    for j in range(3):
-                        if i + j < len(columns) and columns[i + j] != "ID":
-                            col = columns[i + j]
-                            with cols[j]:
-                                st.markdown(f"**{col}**")
-                                source_file = st.selectbox(
-                                    "Fichier source",
-                                    options=list(st.session_state.source_files.keys()),
-                                    key=f"{template_name}_{col}_file"
-                                )
-                                
-                                if source_file:
-                                    source_columns = st.session_state.source_files[source_file]['columns']
-                                    source_col = st.selectbox(
-                                        "Colonne source",
-                                        options=source_columns,
-                                        key=f"{template_name}_{col}_column"
-                                    )
-                                    
-                                    is_ref = st.checkbox(
-                                        "Référence",
-                                        key=f"{template_name}_{col}_is_ref"
-                                    )
-                                    
-                                    if is_ref:
-                                        ref_model = st.selectbox(
-                                            "Modèle référencé",
-                                            options=list(st.session_state.kimaiko_templates.keys()),
-                                            key=f"{template_name}_{col}_ref_model"
-                                        )
-                                        template_mapping[col] = {
-                                            "source_file": source_file,
-                                            "source_col": source_col,
-                                            "is_ref": is_ref,
-                                            "ref_model": ref_model
-                                        }
-                                    else:
-                                        template_mapping[col] = {
-                                            "source_file": source_file,
-                                            "source_col": source_col,
-                                            "is_ref": is_ref
-                                        }
+                render_mapping_grid(
+                    template_name,
+                    columns,
+                    template_mapping,
+                    st.session_state.source_files,
+                    st.session_state.kimaiko_templates,
+                    st.session_state.mappings
+                )
+                
+                render_key_profile(template_name, template_mapping, st.session_state.source_files)
+                render_joins_editor(template_name, template_mapping, st.session_state.source_files)
+                render_filters_editor(template_name, template_mapping, st.session_state.source_files)
+                render_transforms_editor(template_name, template_mapping)
 
+        # Sample run with inline previews
+        render_dry_run(st.session_state.mappings, st.session_state.source_files)
+        
+        # Pre-flight reference check
+        render_reference_check(st.session_state.mappings, st.session_state.source_files)
+        
+        output_formats = st.multiselect(
+            "Formats de sortie",
+            options=list(OUTPUT_FORMATS.keys()),
+            default=["xlsx"],
+            format_func=OUTPUT_FORMATS.get,
+            key="output_formats"
+        )
+        part_rows = st.number_input(
+            "Lignes par fichier",
+            min_value=1_000,
+            value=DEFAULT_PART_ROWS,
+            step=100_000,
+            help=f"Les modèles plus grands sont découpés en parties numérotées (au plus {EXCEL_MAX_ROWS:,} lignes par fichier Excel)"
+        )
+        resume = st.checkbox(
+            "Reprendre les modèles déjà générés",
+            help=f"Chaque modèle terminé est conservé dans {CHECKPOINT_DIR}/<projet>/ : une génération interrompue reprend au premier modèle incomplet, et seuls les modèles modifiés (et ceux qui les référencent) sont régénérés"
+        )
+        delta = st.checkbox(
+            "Générer uniquement les changements",
+            help="Les UUID restent stables d'une génération à l'autre et seules les lignes ajoutées, "
+                 "modifiées ou supprimées depuis la génération précédente sont écrites (Modèle_ajouts, Modèle_modifications, Modèle_suppressions)"
+        )
+        delta_state_dir = None
+        if delta:
+            delta_state_dir = st.text_input(
+                "Répertoire de l'état des générations",
+                value=DELTA_STATE_DIR,
+                key="delta_state_dir",
+                help="UUID stables et empreintes des lignes, rangés par projet et par configuration de modèle"
+            ).strip()
+        snapshot_outputs = st.checkbox(
+            "Créer un instantané des fichiers générés",
+            help=f"Sauvegarde Parquet compressée dans {SNAPSHOT_DIR}/<projet>/, restaurable sans relire les fichiers"
+        )
+        project = render_project_name("project_name_generation") if resume or delta or snapshot_outputs else None
+        
         # Generate files
-        if st.button("✨ Générer et télécharger les résultats"):
+        if st.button("✨ Générer et télécharger les résultats",
+                     disabled=not output_formats or ((resume or delta or snapshot_outputs) and not project)
+                     or (delta and not delta_state_dir)):
             try:
                 with st.spinner("Génération des fichiers en cours... Cette opération peut prendre quelques minutes pour les grands fichiers."):
                     logging.info("Début de la génération des fichiers")
                     logging.info(f"Mappings configurés: {st.session_state.mappings}")
                     
-                    # Calcul des statistiques avant la génération
-                    total_rows = sum(info['row_count'] for info in st.session_state.source_files.values())
-                    
                     # Génération des fichiers sans les statistiques
-                    zip_data = generate_kimaiko_files(st.session_state.mappings, st.session_state.source_files)
+                    zip_data = generate_kimaiko_files(
+                        st.session_state.mappings,
+                        st.session_state.source_files,
+                        output_formats,
+                        snapshot_dir=str(project_directory(SNAPSHOT_DIR, project)) if snapshot_outputs else None,
+                        part_rows=int(part_rows),
+                        checkpoint_dir=str(project_directory(CHECKPOINT_DIR, project)) if resume else None,
+                        delta_state_dir=delta_state_dir,
+                        delta_project=project
+                    )
+                    
+                    # Les sources utilisées sont maintenant entièrement chargées
+                    total_rows = sum(info['row_count'] or 0 for info in st.session_state.source_files.values())
                     
                     st.success("✅ Fichiers générés avec succès!")
                     
@@ -249,4 +294,7 @@ def render_standard_mode():
 
 def init_standard_mode():
     """Initialize standard mode"""
+    if 'frame_store' not in st.session_state:
+        # Source frames are spilled here; the files are removed with the session
+        st.session_state.frame_store = FrameStore()
     st.session_state.step = 1
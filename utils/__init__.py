@@ -1,13 +1,21 @@
 # Utils package initialization
-from .data_processing import generate_uuid, create_uuid_mapping
-from .file_operations import load_demo_files, generate_kimaiko_files
-from .demo_config import DEFAULT_MAPPINGS, DEMO_DESCRIPTIONS
+# Exports are resolved on first access: importing a light module such as
+# utils.demo_config does not load pandas through the heavier ones
+import importlib
 
-__all__ = [
-    'generate_uuid',
-    'create_uuid_mapping',
-    'load_demo_files',
-    'generate_kimaiko_files',
-    'DEFAULT_MAPPINGS',
-    'DEMO_DESCRIPTIONS'
-]
+_EXPORTS = {
+    'generate_uuid': '.data_processing',
+    'create_uuid_mapping': '.data_processing',
+    'load_demo_files': '.file_operations',
+    'generate_kimaiko_files': '.file_operations',
+    'check_reference_integrity': '.preflight',
+    'DEFAULT_MAPPINGS': '.demo_config',
+    'DEMO_DESCRIPTIONS': '.demo_config'
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
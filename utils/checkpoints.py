@@ -0,0 +1,110 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional
+import pandas as pd
+from .file_operations import get_source_data, get_model_dependencies
+from .scheduling import strongly_connected_components
+from .snapshots import frame_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Répertoire des points de contrôle, un dossier par projet (voir project_directory)
+CHECKPOINT_DIR = "checkpoints"
+
+# À incrémenter quand le format des modèles générés change
+CHECKPOINT_VERSION = 3
+
+def get_checkpoint_keys(mappings: Dict, source_files: Dict, processing_order: List[str]) -> Dict[str, str]:
+    """
+    Calcule la clé de point de contrôle de chaque modèle.
+
+    La clé combine le mapping du modèle, l'empreinte de ses fichiers sources
+    et les clés des modèles qu'il référence : modifier un modèle invalide
+    aussi tous les modèles qui en dépendent, dont les UUID de référence
+    changent. Les modèles en références circulaires partagent une même clé,
+    calculée sur l'ensemble de leur composante.
+
+    Args:
+        mappings: Configuration des mappings
+        source_files: Fichiers sources chargés
+        processing_order: Modèles à traiter
+
+    Returns:
+        Dict[str, str]: Clé SHA-256 par modèle
+    """
+    dependencies = get_model_dependencies(mappings)
+    fingerprints = {}
+    keys = {}
+    # Composantes fortement connexes : les modèles référencés d'abord
+    for component in strongly_connected_components(dependencies):
+        files = sorted({m["source_file"] for model in component for m in mappings[model].values()
+                        if isinstance(m, dict) and "source_file" in m})
+        for name in files:
+            if name not in fingerprints and name in source_files:
+                fingerprints[name] = frame_fingerprint(get_source_data(source_files, name).rename(columns=str))
+        external = sorted({ref_model for model in component for ref_model in dependencies[model]
+                           if ref_model not in component})
+        document = {
+            "version": CHECKPOINT_VERSION,
+            "mappings": {model: mappings[model] for model in component},
+            "sources": {name: fingerprints.get(name) for name in files},
+            "dependencies": {ref_model: keys.get(ref_model) for ref_model in external}
+        }
+        key = hashlib.sha256(json.dumps(document, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        keys.update({model: key for model in component})
+    return {model: keys[model] for model in processing_order}
+
+def _checkpoint_path(checkpoint_dir: str, model: str, key: str) -> Path:
+    return Path(checkpoint_dir) / model / key
+
+def load_checkpoint(checkpoint_dir: str, model: str, key: str) -> Optional[Dict]:
+    """
+    Charge le point de contrôle d'un modèle, s'il existe pour cette clé.
+
+    Returns:
+        Optional[Dict]: uuid_map, key_labels et stats du modèle (la table
+        générée est lue par load_checkpoint_frame), ou None
+    """
+    path = _checkpoint_path(checkpoint_dir, model, key)
+    if not (path / "complete").exists():
+        return None
+    with open(path / "state.pkl", "rb") as f:
+        return pickle.load(f)
+
+def load_checkpoint_frame(checkpoint_dir: str, model: str, key: str) -> pd.DataFrame:
+    """Relit la table générée d'un modèle depuis son point de contrôle"""
+    return pd.read_pickle(_checkpoint_path(checkpoint_dir, model, key) / "frame.pkl")
+
+def save_checkpoint(checkpoint_dir: str, model: str, key: str, final_df: pd.DataFrame,
+                    uuid_map: Dict, key_labels: Optional[pd.Series], stats: Dict) -> None:
+    """
+    Enregistre la table générée et la table UUID d'un modèle terminé.
+
+    Le fichier "complete" n'est créé qu'à la fin de l'écriture : un point de
+    contrôle interrompu est ignoré. Seul le point de contrôle précédemment
+    enregistré pour le modèle dans ce répertoire de projet (fichier
+    "current") est supprimé ; ceux des autres projets ne sont jamais touchés.
+    """
+    path = _checkpoint_path(checkpoint_dir, model, key)
+    path.mkdir(parents=True, exist_ok=True)
+    final_df.to_pickle(path / "frame.pkl")
+    with open(path / "state.pkl", "wb") as f:
+        pickle.dump({'uuid_map': uuid_map, 'key_labels': key_labels, 'stats': stats}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    (path / "complete").touch()
+
+    current = path.parent / "current"
+    previous = current.read_text().strip() if current.exists() else None
+    current.write_text(key)
+    if previous and previous != key:
+        shutil.rmtree(path.parent / previous, ignore_errors=True)
+    logger.info(f"Point de contrôle enregistré pour {model} ({key[:12]})")
+
+def clear_checkpoints(checkpoint_dir: str) -> None:
+    """Supprime tous les points de contrôle"""
+    if os.path.exists(checkpoint_dir):
+        shutil.rmtree(checkpoint_dir, ignore_errors=True)
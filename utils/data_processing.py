@@ -1,10 +1,14 @@
 import uuid
-from typing import Dict, List, Set, Any
+import gzip
+from typing import Dict, Iterator, List, Optional, Set, Any
 import pandas as pd
 import logging
 import json
 import os
+import re
 from datetime import datetime
+from .transforms import compile_transforms
+from .scheduling import schedule_models
 
 logger = logging.getLogger(__name__)
 
@@ -101,16 +105,69 @@ def get_mapping_stats(mapping: Dict[str, str], values) -> Dict[str, int]:
         "na_values": na_values
     }
 
-def apply_mapping(data: Dict, mapping: Dict) -> Dict:
+def to_frame(data) -> pd.DataFrame:
     """
-    Applique les règles de mapping aux données
+    Convertit les données d'un modèle en DataFrame.
+
+    Args:
+        data: DataFrame, liste d'enregistrements, dict de colonnes ou
+            enregistrement unique (dict de valeurs scalaires)
+
+    Returns:
+        pd.DataFrame: Données en colonnes
+    """
+    if data is None:
+        return pd.DataFrame()
+    if isinstance(data, pd.DataFrame):
+        return data
+    if isinstance(data, dict) and not any(pd.api.types.is_list_like(v) for v in data.values()):
+        return pd.DataFrame([data])
+    return pd.DataFrame(data)
+
+def map_column(frame: pd.DataFrame, field: str, config) -> pd.Series:
+    """
+    Calcule une colonne de sortie sur toutes les lignes à la fois.
+
+    Args:
+        frame: Données source
+        field: Nom du champ de sortie
+        config: Nom de la colonne source, ou dict avec "source" (ou
+            "source_col"), "transforms" (voir utils.transforms) et/ou
+            "transform" (fonction appliquée valeur par valeur)
+
+    Returns:
+        pd.Series: Colonne transformée, vide (NA) si la source est absente
+    """
+    if isinstance(config, dict):
+        source_field = config.get('source', config.get('source_col', field))
+    else:
+        source_field = config
+        config = {}
+
+    if source_field in frame.columns:
+        values = frame[source_field]
+    else:
+        values = pd.Series(None, index=frame.index, dtype=object)
+
+    if config.get('transforms'):
+        values = compile_transforms(config['transforms'])(values)
+    if 'transform' in config:
+        try:
+            values = values.map(config['transform'])
+        except Exception as e:
+            logger.error(f"Erreur de transformation pour le champ {field}: {str(e)}")
+    return values
+
+def apply_mapping(data, mapping: Dict) -> pd.DataFrame:
+    """
+    Applique les règles de mapping aux données, colonne par colonne
     
     Args:
-        data: Données source à transformer
+        data: Données source à transformer (voir to_frame)
         mapping: Règles de mapping à appliquer
         
     Returns:
-        Dict: Données transformées selon le mapping
+        pd.DataFrame: Données transformées selon le mapping
         
     Raises:
         ValueError: Si data ou mapping sont None
@@ -118,47 +175,38 @@ def apply_mapping(data: Dict, mapping: Dict) -> Dict:
     if data is None or mapping is None:
         raise ValueError("Les paramètres data et mapping ne peuvent pas être None")
         
-    processed = {}
     try:
-        for field, config in mapping.items():
-            if isinstance(config, dict):
-                source_field = config.get('source', field)
-                # Ajout de la gestion des transformations
-                value = data.get(source_field)
-                if 'transform' in config:
-                    try:
-                        value = config['transform'](value)
-                    except Exception as e:
-                        logger.error(f"Erreur de transformation pour le champ {field}: {str(e)}")
-                processed[field] = value
-            else:
-                source_field = config
-                processed[field] = data.get(source_field)
-        return processed
+        frame = to_frame(data)
+        return pd.DataFrame(
+            {field: map_column(frame, field, config) for field, config in mapping.items()},
+            index=frame.index
+        )
     except Exception as e:
         logger.error(f"Erreur lors du mapping: {str(e)}")
         raise
 
-def process_model(model, source_data, mappings):
+def process_model(model, source_data, mappings, output_dir: str = "output", format: str = "both"):
     """
     Traite un modèle spécifique selon les mappings définis
     
     Args:
         model: Nom du modèle à traiter
-        source_data: Données source
+        source_data: Données source par modèle (DataFrame ou voir to_frame)
         mappings: Configuration des mappings
+        output_dir: Répertoire de sortie
+        format: Format de sortie (voir save_processed_data)
     """
     try:
         logger.info(f"\nTraitement du modèle: {model}")
-        # Logique de traitement du modèle
-        model_data = source_data.get(model, {})
+        model_data = to_frame(source_data.get(model))
         model_mapping = mappings.get(model, {})
         
-        # Traitement des données selon le mapping
+        # Traitement des données selon le mapping, sur le DataFrame entier
         processed_data = apply_mapping(model_data, model_mapping)
+        logger.info(f"{len(processed_data)} lignes traitées pour {model}")
         
         # Sauvegarde ou autre traitement
-        save_processed_data(model, processed_data)
+        save_processed_data(model, processed_data, output_dir=output_dir, format=format)
         
     except Exception as e:
         logger.error(f"Erreur lors du traitement du modèle {model}: {str(e)}")
@@ -190,7 +238,7 @@ def generate_kimaiko_files(source_data, mappings, output_dir):
         
         # Procéder au traitement dans l'ordre déterminé
         for model in order_analysis['processing_order']:
-            process_model(model, source_data, mappings)
+            process_model(model, source_data, mappings, output_dir=output_dir)
             
     except Exception as e:
         logger.error(f"Erreur lors de la génération des fichiers: {str(e)}")
@@ -200,6 +248,9 @@ def suggest_processing_order(mappings: Dict) -> Dict:
     """
     Analyse les dépendances entre modèles et suggère un ordre de traitement.
     
+    Les références circulaires sont acceptées : les modèles d'un cycle sont
+    traités ensemble (voir utils.scheduling.schedule_models).
+    
     Args:
         mappings: Dictionnaire des configurations de mapping
         
@@ -208,7 +259,9 @@ def suggest_processing_order(mappings: Dict) -> Dict:
         - success: bool
         - processing_order: Liste ordonnée des modèles
         - dependencies: Dict des dépendances par modèle
-        - error: Message d'erreur (si success=False)
+        - cycles: Groupes de modèles en références circulaires
+        - levels: Modèles de chaque niveau
+        - widths: Nombre de modèles traitables en parallèle à chaque niveau
     """
     dependencies = {}
     
@@ -221,44 +274,157 @@ def suggest_processing_order(mappings: Dict) -> Dict:
                 depends_on.add(field_config['reference']['model'])
         dependencies[model] = {'depends_on': depends_on}
     
-    # Créer l'ordre de traitement (modèles sans dépendances d'abord)
-    processing_order = []
-    remaining = set(mappings.keys())
-    
-    while remaining:
-        # Trouver les modèles qui n'ont plus de dépendances non traitées
-        ready = {model for model in remaining 
-                if not dependencies[model]['depends_on'] - set(processing_order)}
-        
-        if not ready:
-            return {
-                'success': False,
-                'error': 'Dépendances circulaires détectées',
-                'dependencies': dependencies
-            }
-        
-        processing_order.extend(sorted(ready))  # Tri pour ordre consistant
-        remaining -= ready
-    
+    schedule = schedule_models({model: deps['depends_on'] for model, deps in dependencies.items()})
     return {
         'success': True,
-        'processing_order': processing_order,
-        'dependencies': dependencies
+        'processing_order': schedule['processing_order'],
+        'dependencies': dependencies,
+        'cycles': schedule['cycles'],
+        'levels': schedule['levels'],
+        'widths': schedule['widths']
     }
 
 class ProcessingError(Exception):
     """Exception personnalisée pour les erreurs de traitement"""
     pass
 
-def save_processed_data(model: str, data: Dict, output_dir: str = "output", format: str = "both") -> None:
+# Nombre de lignes sérialisées à la fois lors de l'écriture en flux
+WRITE_CHUNK_SIZE = 50_000
+
+# Niveau de compression gzip des fichiers JSON Lines (.jsonl.gz)
+GZIP_LEVEL = 6
+
+def write_json_stream(df: pd.DataFrame, path: str, chunk_size: int = WRITE_CHUNK_SIZE) -> None:
+    """
+    Écrit un DataFrame en tableau JSON d'enregistrements, par blocs.
+
+    Seul un bloc de lignes est sérialisé en mémoire à la fois, au lieu du
+    document complet construit par json.dump(indent=2).
+
+    Args:
+        df: Données à écrire
+        path: Fichier JSON de sortie
+        chunk_size: Nombre de lignes par bloc
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for start in range(0, len(df), chunk_size):
+            chunk = df.iloc[start:start + chunk_size].to_json(
+                orient='records', force_ascii=False, date_format='iso'
+            )
+            if start:
+                f.write(',\n')
+            # Contenu du tableau JSON du bloc, sans ses crochets
+            f.write(chunk[1:-1])
+        f.write(']\n')
+
+def _open_text(path: str, mode: str):
+    """Ouvre un fichier texte UTF-8, compressé en gzip si son nom se termine par .gz"""
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', compresslevel=GZIP_LEVEL)
+    return open(path, mode, encoding='utf-8')
+
+def write_jsonl(data, path: str, chunk_size: int = WRITE_CHUNK_SIZE) -> int:
+    """
+    Écrit des données au format JSON Lines (un enregistrement par ligne), en flux.
+
+    Le fichier est compressé en gzip si son nom se termine par .gz.
+
+    Args:
+        data: DataFrame, ou itérable de DataFrames écrits les uns après les autres
+        path: Fichier de sortie
+        chunk_size: Nombre de lignes sérialisées à la fois
+
+    Returns:
+        int: Nombre de lignes écrites
+    """
+    frames = [data] if isinstance(data, pd.DataFrame) else data
+    rows = 0
+    with _open_text(path, 'w') as f:
+        for frame in frames:
+            for start in range(0, len(frame), chunk_size):
+                chunk = frame.iloc[start:start + chunk_size]
+                text = chunk.to_json(orient='records', lines=True, force_ascii=False, date_format='iso')
+                # Selon la version de pandas, la dernière ligne n'a pas de saut de ligne
+                f.write(text if text.endswith('\n') else text + '\n')
+                rows += len(chunk)
+    return rows
+
+def jsonl_schema_path(path: str) -> str:
+    """Chemin du schéma (types des colonnes) enregistré à côté d'un fichier JSON Lines"""
+    return re.sub(r"\.jsonl(\.gz)?$", "", str(path)) + ".schema.json"
+
+def write_jsonl_schema(df: pd.DataFrame, path: str) -> str:
+    """
+    Enregistre le type de chaque colonne d'un DataFrame écrit en JSON Lines.
+
+    JSON ne conserve que des textes et des nombres : le schéma permet à
+    read_jsonl de restituer les dates, les catégories et les entiers.
+
+    Args:
+        df: Données écrites dans path
+        path: Fichier JSON Lines
+
+    Returns:
+        str: Chemin du schéma (voir jsonl_schema_path)
+    """
+    schema_path = jsonl_schema_path(path)
+    with open(schema_path, 'w', encoding='utf-8') as f:
+        json.dump({str(col): str(dtype) for col, dtype in df.dtypes.items()}, f, ensure_ascii=False, indent=2)
+    return schema_path
+
+def _apply_schema(chunk: pd.DataFrame, schema: Dict[str, str]) -> pd.DataFrame:
+    """Convertit les colonnes d'un bloc lu aux types du schéma"""
+    for col, dtype in schema.items():
+        if col not in chunk.columns:
+            continue
+        try:
+            dtype = pd.api.types.pandas_dtype(dtype)
+            values = chunk[col]
+            if isinstance(dtype, pd.DatetimeTZDtype):
+                # Les dates avec fuseau sont écrites en UTC
+                values = pd.to_datetime(values, utc=True).dt.tz_convert(dtype.tz)
+            if values.dtype != dtype:
+                values = values.astype(dtype)
+            chunk[col] = values
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Colonne {col} conservée en {chunk[col].dtype}, conversion en {dtype} impossible: {str(e)}")
+    return chunk
+
+def read_jsonl(path: str, chunksize: int = WRITE_CHUNK_SIZE, schema: Optional[Dict[str, str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Lit un fichier JSON Lines (éventuellement .gz) par blocs.
+
+    Args:
+        path: Fichier à lire
+        chunksize: Nombre de lignes par bloc
+        schema: Type de chaque colonne (voir write_jsonl_schema) ; les
+            colonnes de dates sont relues comme dates et les autres converties
+            à leur type d'origine
+
+    Returns:
+        Iterator[pd.DataFrame]: Blocs successifs du fichier
+    """
+    options = {}
+    if schema is not None:
+        # Seules les colonnes de dates du schéma sont converties, pas celles nommées "date" par exemple
+        options = {
+            'convert_dates': [col for col, dtype in schema.items() if dtype.startswith('datetime64')],
+            'keep_default_dates': False
+        }
+    with pd.read_json(path, lines=True, chunksize=chunksize, compression='infer', dtype=False, **options) as reader:
+        for chunk in reader:
+            yield chunk if schema is None else _apply_schema(chunk, schema)
+
+def save_processed_data(model: str, data, output_dir: str = "output", format: str = "both") -> None:
     """
     Sauvegarde les données traitées en JSON et/ou Excel
     
     Args:
         model: Nom du modèle
-        data: Données à sauvegarder
+        data: Données à sauvegarder (DataFrame ou voir to_frame)
         output_dir: Répertoire de sortie
-        format: Format de sortie ('json', 'excel', ou 'both')
+        format: Format de sortie ('json', 'jsonl', 'jsonl.gz', 'excel', ou 'both')
     """
     # Créer le répertoire de sortie avec timestamp
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -266,24 +432,23 @@ def save_processed_data(model: str, data: Dict, output_dir: str = "output", form
     os.makedirs(output_path, exist_ok=True)
     
     try:
+        df = to_frame(data)
+
         if format.lower() in ['json', 'both']:
-            # Sauvegarde JSON
+            # Sauvegarde JSON en flux
             json_path = os.path.join(output_path, f"{model}.json")
-            with open(json_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            write_json_stream(df, json_path)
             logger.info(f"Données JSON sauvegardées dans {json_path}")
             
+        if format.lower() in ['jsonl', 'jsonl.gz']:
+            # Sauvegarde JSON Lines en flux, compressée pour jsonl.gz
+            jsonl_path = os.path.join(output_path, f"{model}.{format.lower()}")
+            write_jsonl(df, jsonl_path)
+            logger.info(f"Données JSON Lines sauvegardées dans {jsonl_path}")
+            
         if format.lower() in ['excel', 'both']:
             # Sauvegarde Excel
             excel_path = os.path.join(output_path, f"{model}.xlsx")
-            # Conversion en DataFrame (ajustez selon votre structure de données)
-            if isinstance(data, dict):
-                df = pd.DataFrame([data])
-            elif isinstance(data, list):
-                df = pd.DataFrame(data)
-            else:
-                df = pd.DataFrame(data)
-            
             df.to_excel(excel_path, index=False)
             logger.info(f"Données Excel sauvegardées dans {excel_path}")
             
@@ -319,23 +484,52 @@ def validate_mapping_config(mappings: Dict) -> bool:
         logger.error(f"Configuration invalide: {str(e)}")
         return False
 
-def backup_data(data: Dict, model: str, backup_dir: str = "backups") -> None:
+def backup_data(data, model: str, backup_dir: str = "backups", compress: bool = True) -> str:
     """
-    Crée une sauvegarde des données avant traitement
+    Crée une sauvegarde des données avant traitement, au format JSON Lines
     
     Args:
-        data: Données à sauvegarder
+        data: Données à sauvegarder (DataFrame ou voir to_frame)
         model: Nom du modèle
         backup_dir: Répertoire de sauvegarde
+        compress: Compresser la sauvegarde en gzip
+
+    Returns:
+        str: Chemin du fichier de sauvegarde (voir restore_backup), accompagné
+        de son schéma (voir write_jsonl_schema)
     """
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     backup_path = os.path.join(backup_dir, model, timestamp)
     os.makedirs(backup_path, exist_ok=True)
     
-    backup_file = os.path.join(backup_path, f"{model}_backup.json")
-    with open(backup_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-    logger.info(f"Backup créé dans {backup_file}")
+    extension = "jsonl.gz" if compress else "jsonl"
+    backup_file = os.path.join(backup_path, f"{model}_backup.{extension}")
+    df = to_frame(data)
+    rows = write_jsonl(df, backup_file)
+    write_jsonl_schema(df, backup_file)
+    logger.info(f"Backup créé dans {backup_file} ({rows} lignes)")
+    return backup_file
+
+def restore_backup(backup_file: str, chunksize: Optional[int] = None):
+    """
+    Relit une sauvegarde créée par backup_data, avec les types de colonnes
+    de son schéma s'il existe
+    
+    Args:
+        backup_file: Chemin du fichier de sauvegarde
+        chunksize: Si fourni, retourne un itérateur de DataFrames de cette taille
+        
+    Returns:
+        pd.DataFrame, ou itérateur de DataFrames si chunksize est fourni
+    """
+    schema = None
+    if os.path.exists(jsonl_schema_path(backup_file)):
+        with open(jsonl_schema_path(backup_file), encoding='utf-8') as f:
+            schema = json.load(f)
+    if chunksize:
+        return read_jsonl(backup_file, chunksize, schema)
+    chunks = list(read_jsonl(backup_file, schema=schema))
+    return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
 
 def validate_data_structure(data: Dict, expected_fields: Set[str]) -> bool:
     """
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from .uuids import format_uuid_columns, parse_uuids
+from .projects import project_directory
+
+logger = logging.getLogger(__name__)
+
+# Répertoire proposé par défaut pour l'état des générations delta
+DELTA_STATE_DIR = "delta_state"
+
+# Suffixe des fichiers de chaque type de changement (Modèle_ajouts.xlsx...)
+DELTA_KINDS = {
+    "inserted": "ajouts",
+    "updated": "modifications",
+    "deleted": "suppressions"
+}
+
+def row_fingerprints(final_df: pd.DataFrame) -> np.ndarray:
+    """
+    Calcule l'empreinte 64 bits de chaque ligne d'un modèle généré, ID compris.
+
+    Le hachage est vectorisé colonne par colonne (pandas.util.hash_pandas_object) ;
+    les colonnes catégorielles sont hachées sur leurs valeurs, pas sur leurs codes.
+    Les UUID sont hachés sous leur forme texte, telle qu'écrite dans les fichiers.
+    """
+    return pd.util.hash_pandas_object(format_uuid_columns(final_df), index=False).to_numpy()
+
+def delta_state_path(state_dir: str, project: str, model: str, model_mappings: Dict, key_cols: List[str]) -> Path:
+    """
+    Chemin de l'état delta d'un modèle, propre à un projet et à sa configuration.
+
+    L'état est rangé dans un dossier par projet, sous un nom combinant le
+    modèle et l'empreinte de sa configuration cible (colonnes du modèle et
+    colonnes clés) : deux projets, ou deux modèles de même nom configurés
+    différemment, ne partagent jamais leurs UUID ni leurs empreintes.
+
+    Args:
+        state_dir: Répertoire choisi pour l'état des générations delta
+        project: Nom du projet saisi par l'utilisateur
+        model: Nom du modèle
+        model_mappings: Mapping du modèle
+        key_cols: Colonnes clés du modèle (voir get_key_columns)
+
+    Returns:
+        Path: Fichier d'état du modèle
+    """
+    config = {
+        "project": project,
+        "model": model,
+        "columns": sorted(str(col) for col in model_mappings),
+        "key_cols": [str(col) for col in key_cols]
+    }
+    digest = hashlib.sha256(json.dumps(config, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return project_directory(state_dir, project) / f"{model}-{digest}.pkl"
+
+def load_delta_state(path: Path) -> Optional[Dict]:
+    """
+    Charge l'état d'un modèle à la dernière génération delta.
+
+    Returns:
+        Optional[Dict]: uuid_map (UUID binaires indexés par valeur clé), ids
+        et fingerprints (ID et empreinte de chaque ligne générée), ou None au
+        premier passage
+    """
+    if not path.exists():
+        return None
+    with open(path, "rb") as f:
+        state = pickle.load(f)
+    if isinstance(state['uuid_map'], dict):
+        # État enregistré avec des UUID texte : converti pour garder les mêmes UUID
+        state['uuid_map'] = pd.Series(parse_uuids(list(state['uuid_map'].values())),
+                                      index=pd.Index(list(state['uuid_map'].keys())))
+        state['ids'] = parse_uuids(state['ids'])
+    return state
+
+def save_delta_state(path: Path, uuid_map: pd.Series, ids, fingerprints: np.ndarray) -> None:
+    """Enregistre l'état d'un modèle (voir delta_state_path) : ses UUID stables et l'empreinte de ses lignes"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(".tmp")
+    with open(temp_path, "wb") as f:
+        pickle.dump({'uuid_map': uuid_map, 'ids': ids, 'fingerprints': fingerprints}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+
+def compute_delta(final_df: pd.DataFrame, fingerprints: np.ndarray, previous: Optional[Dict]) -> Dict[str, pd.DataFrame]:
+    """
+    Compare un modèle généré à son état précédent.
+
+    Une ligne dont l'empreinte existait est inchangée ; sinon elle est
+    ajoutée si son ID est nouveau et modifiée sinon. Les ID disparus sont
+    supprimés.
+
+    Args:
+        final_df: Modèle généré
+        fingerprints: Empreinte de chaque ligne (voir row_fingerprints)
+        previous: État précédent du modèle (voir load_delta_state)
+
+    Returns:
+        Dict[str, pd.DataFrame]: Lignes ajoutées et modifiées, et ID des
+        lignes supprimées, par type de changement (voir DELTA_KINDS)
+    """
+    if previous is None:
+        return {"inserted": final_df, "updated": final_df.iloc[:0], "deleted": final_df[["ID"]].iloc[:0]}
+
+    unchanged = pd.Series(fingerprints).isin(previous['fingerprints']).to_numpy()
+    known = final_df["ID"].isin(previous['ids']).to_numpy()
+    deleted = pd.Index(previous['ids']).difference(pd.Index(final_df["ID"].array), sort=False)
+    return {
+        "inserted": final_df[~known],
+        "updated": final_df[known & ~unchanged],
+        "deleted": pd.DataFrame({"ID": deleted.array})
+    }
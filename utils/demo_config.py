@@ -22,7 +22,11 @@ DEFAULT_MAPPINGS = {
     "Factures": {
         "ID": {"type": "uuid"},
         "Numero": {"source_file": "Ancien Factures", "source_col": "NumeroFacture"},
-        "Date": {"source_file": "Ancien Factures", "source_col": "DateFacture"},
+        "Date": {
+            "source_file": "Ancien Factures",
+            "source_col": "DateFacture",
+            "transforms": [{"op": "date", "format": "%Y-%m-%d"}]
+        },
         "ID_Fournisseur": {
             "source_file": "Ancien Factures",
             "source_col": "CodeFournisseur",
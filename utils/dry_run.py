@@ -0,0 +1,171 @@
+import logging
+import time
+from typing import Dict, List
+import numpy as np
+import pandas as pd
+from .transforms import compile_transforms
+from .keys import key_text
+from .preflight import count_reference_values
+from .uuids import format_uuid_columns
+from .file_operations import (get_source_data, get_source_mapping, get_ref_key_columns,
+                              get_reference_source_columns, hash_key_columns, get_processing_order,
+                              get_used_source_files, pin_source_files, build_uuid_mappings,
+                              iter_model_frames, get_model_joins, join_positions, filter_model_rows,
+                              PREVIEW_ROWS)
+
+logger = logging.getLogger(__name__)
+
+# Nombre de lignes échantillonnées par modèle pour l'aperçu
+DRY_RUN_ROWS = 50
+
+def _model_files(model_mappings: Dict) -> set:
+    """Fichiers sources lus par un modèle : ses lignes y sont alignées par index"""
+    return {m["source_file"] for m in model_mappings.values() if isinstance(m, dict) and "source_file" in m}
+
+def _stratified_labels(df: pd.DataFrame, sample_rows: int) -> pd.Index:
+    """Lignes réparties régulièrement sur tout le fichier (début, milieu et fin)"""
+    if len(df) <= sample_rows:
+        return df.index
+    positions = np.unique(np.linspace(0, len(df) - 1, sample_rows).astype(np.int64))
+    return df.index[positions]
+
+def _referenced_labels(mapping: Dict, source_df: pd.DataFrame, labels: pd.Index,
+                       key_df: pd.DataFrame, key_cols: List[str], key_text_cache: Dict) -> pd.Index:
+    """Lignes du modèle référencé dont la clé est citée par les lignes échantillonnées"""
+    source_cols = get_reference_source_columns(mapping, key_cols)
+    rows = source_df.loc[source_df.index.intersection(labels)]
+    if len(key_cols) > 1:
+        referenced = hash_key_columns(rows, source_cols).dropna().unique()
+        key_values = hash_key_columns(key_df, key_cols)
+    else:
+        values = rows[source_cols[0]]
+        if mapping.get("transforms"):
+            values = compile_transforms(mapping["transforms"])(values)
+        referenced = count_reference_values(values).index
+        # Conversion en texte de la colonne clé, faite une seule fois par exécution
+        cache_key = (id(key_df), key_cols[0])
+        if cache_key not in key_text_cache:
+            key_text_cache[cache_key] = key_text(key_df[key_cols[0]])
+        key_values = key_text_cache[cache_key]
+    return key_df.index[key_values.isin(referenced).to_numpy()]
+
+def sample_source_files(mappings: Dict, source_files: Dict, sample_rows: int = DRY_RUN_ROWS) -> Dict:
+    """
+    Échantillonne les fichiers sources en conservant la fermeture référentielle.
+
+    Chaque modèle part de sample_rows lignes réparties sur tout son fichier.
+    Les modèles sont ensuite parcourus des modèles qui référencent vers les
+    modèles référencés : les lignes échantillonnées ajoutent à l'échantillon
+    du modèle référencé les lignes dont elles citent la clé (les factures
+    retenues apportent leurs fournisseurs et leurs articles).
+
+    Args:
+        mappings: Configuration des mappings
+        source_files: Fichiers sources chargés
+        sample_rows: Nombre de lignes de départ par modèle
+
+    Returns:
+        Dict: Fichiers sources réduits aux lignes échantillonnées, au format
+        de st.session_state.source_files
+    """
+    frames = {name: get_source_data(source_files, name) for name in get_used_source_files(mappings)}
+    selected = {name: pd.Index([], dtype=df.index.dtype) for name, df in frames.items()}
+
+    for model, model_mappings in mappings.items():
+        key_mapping = get_source_mapping(model_mappings)
+        if key_mapping is not None:
+            name = key_mapping["source_file"]
+            # L'échantillon part des lignes conservées par les filtres du modèle
+            rows = filter_model_rows(frames[name], model_mappings, model, name)
+            selected[name] = selected[name].union(_stratified_labels(rows, sample_rows))
+
+    key_text_cache = {}
+    order = get_processing_order(mappings)
+    # Une passe suffit sans fichier partagé ni cycle ; les passes suivantes complètent les fichiers
+    # partagés et suivent les références circulaires (chaîne employé -> manager -> manager...)
+    changed = True
+    while changed:
+        changed = False
+        for model in reversed(order):
+            model_mappings = mappings[model]
+            key_mapping = get_source_mapping(model_mappings)
+            if key_mapping is None:
+                continue
+            labels = selected[key_mapping["source_file"]]
+
+            # Les fichiers joints apportent les lignes correspondant aux clés échantillonnées,
+            # les colonnes venant d'autres fichiers sont alignées sur les mêmes lignes
+            joins = {join["source_file"]: join for join in get_model_joins(model_mappings)}
+            main_df = frames[key_mapping["source_file"]]
+            for name in _model_files(model_mappings) | set(joins):
+                if name in joins:
+                    positions = join_positions(main_df.loc[labels], frames[name], joins[name], model)
+                    rows = frames[name].index[positions[positions >= 0]]
+                else:
+                    rows = labels.intersection(frames[name].index)
+                union = selected[name].union(rows)
+                changed |= len(union) != len(selected[name])
+                selected[name] = union
+
+            for mapping in model_mappings.values():
+                if not isinstance(mapping, dict) or not mapping.get("is_ref"):
+                    continue
+                ref_model = mapping["ref_model"]
+                ref_key_mapping = get_source_mapping(mappings.get(ref_model, {}))
+                if ref_key_mapping is None:
+                    continue
+                key_cols = get_ref_key_columns(mappings, ref_model, mapping.get("ref_key"))
+                ref_name = ref_key_mapping["source_file"]
+                referenced = _referenced_labels(mapping, frames[mapping["source_file"]], labels,
+                                                frames[ref_name], key_cols, key_text_cache)
+                union = selected[ref_name].union(referenced)
+                changed |= len(union) != len(selected[ref_name])
+                selected[ref_name] = union
+
+    sampled = {}
+    for name, labels in selected.items():
+        df = frames[name].loc[labels.sort_values()]
+        # Les catégories inutilisées de l'échantillon sont retirées
+        for col in df.columns[df.dtypes == "category"]:
+            df[col] = df[col].cat.remove_unused_categories()
+        sampled[name] = {
+            'columns': df.columns.tolist(),
+            'data': df,
+            'preview': df.head(PREVIEW_ROWS),
+            'row_count': len(df),
+            'row_count_exact': True
+        }
+    return sampled
+
+def dry_run(mappings: Dict, source_files: Dict, sample_rows: int = DRY_RUN_ROWS) -> Dict:
+    """
+    Exécute tout le pipeline de génération sur un échantillon, sans rien écrire.
+
+    Args:
+        mappings: Configuration des mappings
+        source_files: Fichiers sources chargés
+        sample_rows: Nombre de lignes de départ par modèle (voir sample_source_files)
+
+    Returns:
+        Dict contenant:
+        - frames: Modèle généré par nom de modèle
+        - source_rows: Nombre de lignes échantillonnées par fichier source
+        - seconds: Durée de l'exécution
+    """
+    start = time.perf_counter()
+    source_files = pin_source_files(source_files, get_used_source_files(mappings))
+    sampled = sample_source_files(mappings, source_files, sample_rows)
+
+    processing_order = get_processing_order(mappings)
+    uuid_mappings, _ = build_uuid_mappings(mappings, sampled, processing_order)
+    # Les UUID sont affichés sous leur forme texte, comme dans les fichiers générés
+    frames = {model_name: format_uuid_columns(final_df) for model_name, final_df, _ in
+              iter_model_frames(mappings, sampled, processing_order, uuid_mappings)}
+
+    seconds = time.perf_counter() - start
+    logger.info("Essai à blanc sur %s : %.2f s", {name: info['row_count'] for name, info in sampled.items()}, seconds)
+    return {
+        'frames': frames,
+        'source_rows': {name: info['row_count'] for name, info in sampled.items()},
+        'seconds': seconds
+    }
@@ -1,64 +1,228 @@
 import pandas as pd
+import numpy as np
 from pathlib import Path
 import zipfile
 import tempfile
 import os
-from typing import Dict, Optional
+import io
+import json
+import pickle
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import multiprocessing
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Union
 import gc
 import logging
 import traceback
-from .data_processing import generate_uuid, create_uuid_mapping, verify_mapping_integrity, get_mapping_stats
+from .data_processing import map_column, write_jsonl
+from .transforms import compile_transforms
+from .filters import compile_filters, filter_columns
+from .interning import KeyPool, dense_positions
+from .keys import key_text
+from .uuids import (create_uuid_table, lookup_uuids, reuse_uuids, verify_uuid_table, uuid_table_stats,
+                    format_uuids, format_uuid_columns)
+from .frame_store import FrameStore, SpilledFrame
+from .sketches import sketch_frame
+from .reference_store import write_reference_store, REFERENCE_STORE_NAME
+from .scheduling import schedule_models
+from .deltas import row_fingerprints, compute_delta, delta_state_path, load_delta_state, save_delta_state, DELTA_KINDS
+
+# Number of rows parsed for the step 2 preview
+PREVIEW_ROWS = 5
+
+# Full source loads run here so the user can start mapping while large
+# workbooks are still being parsed
+_source_loader = ThreadPoolExecutor(max_workers=2, thread_name_prefix="kimaiko-source")
+
+# Demonstration templates and source files
+DEMO_TEMPLATE_FILES = {
+    "Fournisseurs": "fournisseurs.xlsx",
+    "Articles": "articles.xlsx",
+    "Factures": "factures.xlsx"
+}
+DEMO_SOURCE_FILES = {
+    "Ancien Fournisseurs": "old_suppliers.xlsx",
+    "Ancien Articles": "old_products.xlsx",
+    "Ancien Factures": "old_invoices.xlsx"
+}
+
+# Parsed demo files, pickled next to the workbooks
+DEMO_CACHE = Path(".cache") / "demo_files.pkl"
+
+def _demo_signature(demo_dir: Path) -> tuple:
+    """Pandas version and size/mtime of each demo workbook: the cache is rebuilt when any changes"""
+    files = sorted({**DEMO_TEMPLATE_FILES, **DEMO_SOURCE_FILES}.values())
+    return (pd.__version__,) + tuple(
+        (filename, (demo_dir / filename).stat().st_size, (demo_dir / filename).stat().st_mtime_ns)
+        for filename in files
+    )
+
+def _read_demo_cache(cache_path: Path, signature: tuple) -> Optional[tuple[Dict, Dict]]:
+    try:
+        with open(cache_path, "rb") as f:
+            cached = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.warning("Cache de démonstration illisible (%s), fichiers relus", e)
+        return None
+    if cached.get('signature') != signature:
+        return None
+    return cached['templates'], cached['source_files']
+
+def _write_demo_cache(cache_path: Path, signature: tuple, kimaiko_templates: Dict, source_files: Dict) -> None:
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cache_path.with_suffix(".tmp")
+        with open(temp_path, "wb") as f:
+            pickle.dump({'signature': signature, 'templates': kimaiko_templates, 'source_files': source_files},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        # Read-only demo directory: the workbooks are parsed on every start
+        logging.warning("Cache de démonstration non écrit (%s)", e)
 
 def load_demo_files(demo_dir: Path) -> tuple[Dict, Dict]:
-    """Load demonstration files and return templates and source files"""
-    kimaiko_templates = {}
-    source_files = {}
-    
+    """
+    Load demonstration files and return templates and source files.
+
+    The workbooks are parsed once; later loads read the pickled result from
+    demo_dir/.cache until a workbook or the pandas version changes.
+    """
     try:
-        # Load Kimaiko templates
-        kimaiko_files = {
-            "Fournisseurs": "fournisseurs.xlsx",
-            "Articles": "articles.xlsx",
-            "Factures": "factures.xlsx"
+        demo_dir = Path(demo_dir)
+        signature = _demo_signature(demo_dir)
+        cached = _read_demo_cache(demo_dir / DEMO_CACHE, signature)
+        if cached is not None:
+            return cached
+
+        # Load Kimaiko templates: only their header row is needed
+        kimaiko_templates = {
+            name: pd.read_excel(demo_dir / filename, nrows=0).columns.tolist()
+            for name, filename in DEMO_TEMPLATE_FILES.items()
         }
         
-        for name, filename in kimaiko_files.items():
-            df = None
-            try:
-                df = pd.read_excel(demo_dir / filename)
-                kimaiko_templates[name] = df.columns.tolist()
-            finally:
-                del df  # Free memory even if error occurs
-                gc.collect()
-        
         # Load source files
-        source_files_map = {
-            "Ancien Fournisseurs": "old_suppliers.xlsx",
-            "Ancien Articles": "old_products.xlsx",
-            "Ancien Factures": "old_invoices.xlsx"
-        }
-        
-        for name, filename in source_files_map.items():
-            df = None
-            try:
-                df = pd.read_excel(demo_dir / filename)
-                source_files[name] = {
-                    'columns': df.columns.tolist(),
-                    'data': df
-                }
-            finally:
-                if df is not None:
-                    del df
-                gc.collect()
+        source_files = {}
+        for name, filename in DEMO_SOURCE_FILES.items():
+            df = pd.read_excel(demo_dir / filename)
+            source_files[name] = {
+                'columns': df.columns.tolist(),
+                'data': df,
+                'preview': df.head(PREVIEW_ROWS),
+                'row_count': len(df),
+                'row_count_exact': True,
+                'sketches': sketch_frame(df)
+            }
         
+        _write_demo_cache(demo_dir / DEMO_CACHE, signature, kimaiko_templates, source_files)
         return kimaiko_templates, source_files
     except Exception as e:
         raise Exception(f"Erreur lors du chargement des fichiers: {str(e)}")
+
+def _approximate_row_count(content: bytes) -> Optional[int]:
+    """Read the row count declared in the first sheet's dimension, without parsing the rows"""
+    from openpyxl import load_workbook
+    workbook = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    try:
+        max_row = workbook.worksheets[0].max_row
+        return max(max_row - 1, 0) if max_row is not None else None
     finally:
-        gc.collect()
+        workbook.close()
+
+def _load_full_source(content: bytes, store: Optional[FrameStore] = None) -> tuple[Union[pd.DataFrame, SpilledFrame], Dict]:
+    """
+    Parse a whole source workbook with optimized dtypes and sketch its columns.
+
+    The frame is spilled to the store if given. Column sketches (see
+    utils.sketches) are small and computed here once, while the frame is
+    still in memory, for the mapping suggestions.
+    """
+    df = optimize_dataframe(pd.read_excel(io.BytesIO(content)))
+    sketches = sketch_frame(df)
+    if store is not None:
+        spilled = store.spill(df)
+        if spilled is not None:
+            return spilled, sketches
+    return df, sketches
+
+def open_source_file(file, preview_rows: int = PREVIEW_ROWS, store: Optional[FrameStore] = None) -> Dict:
+    """
+    Open a source workbook lazily: only the header and the first rows are parsed.
+
+    The full, typed load is submitted in the background and resolved by
+    get_source_data when the frame is actually needed. With a store, the
+    loaded frame is spilled to a memory-mapped file instead of staying on
+    the heap.
+    """
+    content = file.getvalue() if hasattr(file, 'getvalue') else Path(file).read_bytes()
+    preview = pd.read_excel(io.BytesIO(content), nrows=preview_rows)
+    return {
+        'columns': preview.columns.tolist(),
+        'preview': preview,
+        'row_count': _approximate_row_count(content),
+        'row_count_exact': False,
+        'data': None,
+        'spilled': None,
+        'future': _source_loader.submit(_load_full_source, content, store)
+    }
+
+def spill_source_files(source_files: Dict, store: FrameStore) -> Dict:
+    """Move the in-memory frames of source files (e.g. restored from a snapshot) to the store"""
+    for name, info in source_files.items():
+        if info.get('data') is not None:
+            spilled = store.spill(info['data'])
+            if spilled is not None:
+                info['spilled'] = spilled
+                info['data'] = None
+    return source_files
+
+def resolve_source(source_files: Dict, name: str) -> Dict:
+    """Wait for the background load of a source file and record its exact row count"""
+    info = source_files[name]
+    if info.get('data') is None and info.get('spilled') is None:
+        future = info.get('future')
+        if future is None:
+            raise ValueError(f"Aucune donnée chargée pour le fichier source '{name}'")
+        try:
+            result, info['sketches'] = future.result()
+        except Exception as e:
+            raise ValueError(f"Erreur lors du chargement de '{name}': {str(e)}") from e
+        if isinstance(result, SpilledFrame):
+            info['spilled'] = result
+            info['row_count'] = result.row_count
+        else:
+            info['data'] = result
+            info['row_count'] = len(result)
+        info['future'] = None
+        info['row_count_exact'] = True
+    return info
+
+def pin_source_files(source_files: Dict, names) -> Dict:
+    """
+    Return a per-run view of the given source files.
+
+    Background loads are resolved first, then spilled frames are mapped back
+    once and kept in the view, so a whole generation reads each file a
+    single time; they are released with the view.
+    """
+    return {name: dict(resolve_source(source_files, name), pinned=True)
+            for name in names if name in source_files}
+
+def get_source_data(source_files: Dict, name: str) -> pd.DataFrame:
+    """Return the full DataFrame of a source file, waiting for its background load if needed"""
+    info = resolve_source(source_files, name)
+    if info.get('data') is not None:
+        return info['data']
+    data = info['spilled'].load()
+    if info.get('pinned'):
+        info['data'] = data
+    return data
 
 def optimize_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     """Optimize DataFrame memory usage"""
+    if not len(df):
+        return df
     try:
         for col in df.columns:
             if df[col].dtype == 'object':
@@ -75,15 +239,255 @@ def optimize_dataframe(df: pd.DataFrame) -> pd.DataFrame:
     except Exception as e:
         raise Exception(f"Erreur lors de l'optimisation du DataFrame: {str(e)}")
 
+def get_source_mapping(model_mappings: Dict) -> Optional[Dict]:
+    """Return the first mapping with a source file: it holds the model's key column"""
+    return next((m for m in model_mappings.values()
+                 if isinstance(m, dict) and "source_file" in m), None)
+
+def get_key_columns(model_mappings: Dict) -> List[str]:
+    """
+    Return the source columns identifying a model's rows.
+
+    A composite key is declared with "key_cols" on the model's ID mapping;
+    otherwise the column of the first mapping with a source file is the key.
+    """
+    id_mapping = model_mappings.get("ID")
+    if isinstance(id_mapping, dict) and id_mapping.get("key_cols"):
+        return list(id_mapping["key_cols"])
+    source_mapping = get_source_mapping(model_mappings)
+    return [source_mapping["source_col"]] if source_mapping else []
+
+def hash_key_columns(df: pd.DataFrame, key_cols: List[str]) -> pd.Series:
+    """
+    Combine several key columns into one fixed-width uint64 hash per row.
+
+    Values are hashed as key text (see utils.keys.key_text), so the same key
+    read as int in one file and as float in another (integer column with
+    blanks) gives the same hash. Rows with a missing part get NA.
+    """
+    parts = df[key_cols]
+    hashes = pd.util.hash_pandas_object(pd.DataFrame({i: key_text(parts[col]) for i, col in enumerate(key_cols)}),
+                                        index=False)
+    return hashes.astype('UInt64').mask(parts.isna().any(axis=1))
+
+def get_key_values(df: pd.DataFrame, key_cols: List[str]) -> pd.Series:
+    """Return the key of each row: the column itself, or a row hash for a composite key"""
+    if len(key_cols) == 1:
+        return df[key_cols[0]]
+    return hash_key_columns(df, key_cols)
+
+def format_key_labels(df: pd.DataFrame, key_cols: List[str]) -> pd.Series:
+    """Return a readable label of each row key, parts of composite keys joined by " | \""""
+    labels = key_text(df[key_cols[0]])
+    for col in key_cols[1:]:
+        labels = labels + " | " + key_text(df[col])
+    return labels.mask(df[key_cols].isna().any(axis=1))
+
+def _check_columns(df: pd.DataFrame, columns: List[str], source_file: str) -> None:
+    """Raise if a source file misses one of the given columns"""
+    for col in columns:
+        if col not in df.columns:
+            logging.error(f"Colonne source '{col}' non trouvée dans {source_file}")
+            logging.error(f"Colonnes disponibles: {df.columns.tolist()}")
+            raise ValueError(f"Colonne source '{col}' non trouvée")
+
+# Policies for rows sharing the same key, set with "on_duplicate" on the model's ID mapping:
+# keep every row (same ID repeated), keep the first or last row, or reject the model
+DUPLICATE_POLICIES = {
+    "keep": "Conserver toutes les lignes (ID répété)",
+    "first": "Conserver la première ligne",
+    "last": "Conserver la dernière ligne",
+    "reject": "Refuser le modèle"
+}
+
+def get_duplicate_policy(model_mappings: Dict) -> str:
+    """Return the duplicate key policy declared on the model's ID mapping"""
+    id_mapping = model_mappings.get("ID")
+    policy = id_mapping.get("on_duplicate", "keep") if isinstance(id_mapping, dict) else "keep"
+    if policy not in DUPLICATE_POLICIES:
+        raise ValueError(f"Politique de doublons inconnue: '{policy}'")
+    return policy
+
+def apply_duplicate_policy(source_df: pd.DataFrame, key_cols: List[str], policy: str, model_name: str) -> pd.DataFrame:
+    """Apply a duplicate key policy to the rows of a model's source"""
+    key_values = get_key_values(source_df, key_cols)
+    duplicated = key_values.duplicated(keep=False) & key_values.notna()
+    if not duplicated.any():
+        return source_df
+
+    duplicate_keys = format_key_labels(source_df[duplicated.to_numpy()], key_cols).unique()
+    if policy == "reject":
+        raise ValueError(f"{len(duplicate_keys)} clés dupliquées dans {key_cols} pour le modèle {model_name}, "
+                         f"ex: {list(duplicate_keys[:5])}")
+    if policy == "keep":
+        logging.warning(f"{len(duplicate_keys)} clés dupliquées dans {key_cols} pour le modèle {model_name}: "
+                        f"plusieurs lignes partageront le même ID")
+        return source_df
+
+    # Rows without key are never collapsed together
+    dropped = key_values.duplicated(keep=policy) & key_values.notna()
+    logging.info(f"{int(dropped.sum())} lignes en double ignorées pour le modèle {model_name} (politique '{policy}')")
+    return source_df[~dropped.to_numpy()]
+
+def get_model_filters(model_mappings: Dict) -> List[Dict]:
+    """Return the row filters declared with "filters" on the model's ID mapping (see utils.filters)"""
+    id_mapping = model_mappings.get("ID")
+    return list(id_mapping.get("filters") or []) if isinstance(id_mapping, dict) else []
+
+def filter_model_rows(source_df: pd.DataFrame, model_mappings: Dict, model_name: str, source_file: str) -> pd.DataFrame:
+    """
+    Keep the rows of a model's source that pass its filters.
+
+    The mask only reads the filtered columns; rows left out never get a
+    UUID, are not indexed for references and are not written.
+    """
+    filters = get_model_filters(model_mappings)
+    if not filters:
+        return source_df
+    _check_columns(source_df, filter_columns(filters), source_file)
+    mask = compile_filters(filters)(source_df)
+    if mask.all():
+        return source_df
+    logging.info("Modèle %s : %d lignes sur %d conservées par les filtres", model_name, int(mask.sum()), len(mask))
+    return source_df[mask]
+
+def get_model_source(source_files: Dict, model_name: str, model_mappings: Dict) -> pd.DataFrame:
+    """
+    Return the rows of a model's main source file kept by its filters.
+
+    In a per-run view (see pin_source_files) the filtered rows are computed
+    once per model and filter set, then shared by the UUID, reference and
+    model passes.
+    """
+    source_file = get_source_mapping(model_mappings)["source_file"]
+    if source_file not in source_files:
+        raise ValueError(f"Fichier source '{source_file}' non trouvé")
+    filters = get_model_filters(model_mappings)
+    if not filters:
+        return get_source_data(source_files, source_file)
+    info = source_files[source_file]
+    cache_key = json.dumps(filters, sort_keys=True, default=str)
+    if info.get('pinned') and cache_key in info.setdefault('filtered', {}):
+        return info['filtered'][cache_key]
+    source_df = filter_model_rows(get_source_data(source_files, source_file), model_mappings, model_name, source_file)
+    if info.get('pinned'):
+        info['filtered'][cache_key] = source_df
+    return source_df
+
+# Join cardinalities, set with "validate" on each join of the model's ID mapping (as in pandas.merge)
+JOIN_VALIDATIONS = {
+    "many_to_one": "Plusieurs lignes du modèle par ligne du fichier joint",
+    "one_to_one": "Une ligne du modèle par ligne du fichier joint"
+}
+
+def get_model_joins(model_mappings: Dict) -> List[Dict]:
+    """
+    Return the joins declared with "joins" on the model's ID mapping.
+
+    Each join reads columns from another source file, matching its rows on
+    key columns: {"source_file": ..., "on": [model file columns],
+    "right_on": [joined file columns, default "on"], "validate": ...}.
+    """
+    id_mapping = model_mappings.get("ID")
+    return list(id_mapping.get("joins") or []) if isinstance(id_mapping, dict) else []
+
+def join_positions(left_df: pd.DataFrame, right_df: pd.DataFrame, join: Dict, model_name: str) -> np.ndarray:
+    """
+    Hash join: position in right_df of the row matching each row of left_df, -1 without match.
+
+    Keys are hashed as key text (see hash_key_columns): an integer key column
+    matches the same column read as float because of blank cells. The
+    joined file's keys must be unique, and
+    with "one_to_one" the model's keys as well.
+    """
+    left_cols = list(join["on"])
+    right_cols = list(join.get("right_on") or join["on"])
+    validate = join.get("validate", "many_to_one")
+    if validate not in JOIN_VALIDATIONS:
+        raise ValueError(f"Validation de jointure inconnue: '{validate}'")
+    if len(left_cols) != len(right_cols):
+        raise ValueError(f"La jointure du modèle {model_name} avec {join['source_file']} doit avoir "
+                         f"autant de colonnes de chaque côté ({left_cols} / {right_cols})")
+
+    sides = [(right_df, right_cols, join['source_file'])]
+    if validate == "one_to_one":
+        sides.append((left_df, left_cols, model_name))
+    for df, cols, side in sides:
+        keys = hash_key_columns(df, cols)
+        duplicated = (keys.duplicated(keep=False) & keys.notna()).to_numpy()
+        if duplicated.any():
+            duplicate_keys = format_key_labels(df[duplicated], cols).unique()
+            raise ValueError(f"{len(duplicate_keys)} clés dupliquées dans {cols} ({side}) : la jointure du modèle "
+                             f"{model_name} avec {join['source_file']} est {validate}, ex: {list(duplicate_keys[:5])}")
+
+    right_keys = hash_key_columns(right_df, right_cols)
+    matchable = right_keys.notna().to_numpy()
+    right_index = pd.Index(right_keys[matchable].to_numpy(dtype='uint64'))
+    left_keys = hash_key_columns(left_df, left_cols)
+    found = right_index.get_indexer(left_keys.to_numpy(dtype='uint64', na_value=0))
+    found[left_keys.isna().to_numpy()] = -1
+    positions = np.where(found >= 0, np.flatnonzero(matchable)[found], -1)
+
+    unmatched = int((positions < 0).sum())
+    if unmatched:
+        logging.warning("%d lignes du modèle %s sans correspondance dans %s (colonnes vides)",
+                        unmatched, model_name, join['source_file'])
+    return positions
+
+def plan_model_joins(model_name: str, model_mappings: Dict, source_files: Dict, rows: pd.Index) -> Dict[str, np.ndarray]:
+    """
+    Plan once per model the joins of its other source files.
+
+    Args:
+        rows: Labels of the model's rows in its main source file
+
+    Returns:
+        Dict[str, np.ndarray]: For each joined file, the position of the row
+        matching each model row (-1 without match), see align_joined_rows
+    """
+    key_mapping = get_source_mapping(model_mappings)
+    if key_mapping is None:
+        return {}
+    main_file = key_mapping["source_file"]
+    plan = {}
+    for join in get_model_joins(model_mappings):
+        name = join["source_file"]
+        if name == main_file or name not in source_files:
+            raise ValueError(f"Fichier joint '{name}' invalide pour le modèle {model_name}")
+        left_df = get_source_data(source_files, main_file)
+        right_df = get_source_data(source_files, name)
+        _check_columns(left_df, list(join["on"]), main_file)
+        _check_columns(right_df, list(join.get("right_on") or join["on"]), name)
+        plan[name] = join_positions(left_df.loc[rows], right_df, join, model_name)
+
+    positional = {m["source_file"] for m in model_mappings.values()
+                  if isinstance(m, dict) and "source_file" in m} - set(plan) - {main_file}
+    if positional:
+        logging.warning("Modèle %s : colonnes de %s alignées par position, sans jointure déclarée",
+                        model_name, sorted(positional))
+    return plan
+
+def align_joined_rows(source_df: pd.DataFrame, positions: np.ndarray, index: pd.Index) -> pd.DataFrame:
+    """Reorder the rows of a joined file on the model rows (see plan_model_joins), NA without match"""
+    matched = positions >= 0
+    if not len(source_df):
+        return pd.DataFrame(index=index, columns=source_df.columns)
+    aligned = source_df.iloc[np.where(matched, positions, 0)].set_axis(index, axis=0)
+    if not matched.all():
+        aligned = aligned.where(pd.Series(matched, index=index), axis=0)
+    return aligned
+
 def process_model_data(model_name: str, model_mappings: Dict, source_files: Dict, 
-                       existing_uuid_map: Optional[Dict[str, str]] = None) -> tuple[pd.DataFrame, Dict[str, str], Dict[str, int]]:
-    """Process data for a single model, with proper memory management"""
+                       existing_uuid_map: Optional[pd.Series] = None) -> tuple[pd.DataFrame, pd.Series, Dict[str, int]]:
+    """Process data for a single model, with proper memory management
+
+    UUIDs stay binary (see utils.uuids) until the output files are written.
+    """
     source_df = None
     final_df = None
     try:
         # Find the first mapping with a source file
-        source_mapping = next((m for m in model_mappings.values() 
-                               if isinstance(m, dict) and "source_file" in m), None)
+        source_mapping = get_source_mapping(model_mappings)
         if not source_mapping:
             logging.error(f"Aucun mapping source trouvé pour le modèle {model_name}")
             logging.error(f"Mappings disponibles: {model_mappings}")
@@ -97,45 +501,47 @@ def process_model_data(model_name: str, model_mappings: Dict, source_files: Dict
             logging.error(f"Fichiers sources disponibles: {list(source_files.keys())}")
             raise ValueError(f"Fichier source '{source_mapping['source_file']}' non trouvé")
 
-        source_df = source_files[source_mapping["source_file"]]["data"].copy()
+        # Rows left out by the model's filters are dropped before any processing
+        source_df = get_model_source(source_files, model_name, model_mappings).copy()
         source_df = optimize_dataframe(source_df)
 
         logging.info(f"Colonnes source disponibles: {source_df.columns.tolist()}")
 
         # Create and verify UUID mapping
-        key_col = source_mapping["source_col"]
-        if key_col not in source_df.columns:
-            logging.error(f"Colonne source '{key_col}' non trouvée dans {source_mapping['source_file']}")
-            logging.error(f"Colonnes disponibles: {source_df.columns.tolist()}")
-            raise ValueError(f"Colonne source '{key_col}' non trouvée")
+        key_cols = get_key_columns(model_mappings)
+        _check_columns(source_df, key_cols, source_mapping['source_file'])
 
-        values = source_df[key_col].values
+        source_df = apply_duplicate_policy(source_df, key_cols, get_duplicate_policy(model_mappings), model_name)
+        key_values = get_key_values(source_df, key_cols)
+        values = key_values.values
 
         # Utiliser le mapping UUID existant si fourni
-        if existing_uuid_map:
+        if existing_uuid_map is not None:
             uuid_map = existing_uuid_map
         else:
-            uuid_map = create_uuid_mapping(values)
+            uuid_map = create_uuid_table(values)
 
         # Assign UUIDs to final_df['ID'] using the uuid_map
-        final_df = pd.DataFrame(index=range(len(source_df)))
-        final_df["ID"] = source_df[key_col].map(uuid_map)
+        # The source index is kept so that columns assigned later stay aligned
+        # with the rows retained by the duplicate policy
+        final_df = pd.DataFrame(index=source_df.index)
+        final_df["ID"] = lookup_uuids(uuid_map, key_values)
 
         # Vérifier s'il y a des valeurs non mappées
         if final_df["ID"].isna().any():
-            missing_values = source_df[final_df["ID"].isna()][key_col].unique()
+            missing_values = format_key_labels(source_df[final_df["ID"].isna()], key_cols).unique()
             logging.error(f"Les valeurs suivantes n'ont pas pu être mappées : {missing_values}")
             raise ValueError(f"Certains UUID n'ont pas pu être mappés pour le modèle {model_name}")
 
         # Verify mapping integrity
-        if not verify_mapping_integrity(uuid_map, values):
+        if not verify_uuid_table(uuid_map, values):
             logging.error(f"Échec de la vérification d'intégrité du mapping UUID pour {model_name}")
-            logging.error(f"Valeurs uniques: {len(set(values))}")
-            logging.error(f"UUIDs uniques: {len(set(uuid_map.values()))}")
+            logging.error(f"Valeurs uniques: {key_values.nunique()}")
+            logging.error(f"UUIDs uniques: {uuid_map.nunique()}")
             raise ValueError(f"Échec de la vérification d'intégrité du mapping UUID pour {model_name}")
 
         # Get mapping statistics
-        mapping_stats = get_mapping_stats(uuid_map, values)
+        mapping_stats = uuid_table_stats(uuid_map, values)
         logging.info(f"Statistiques de mapping pour {model_name}: {mapping_stats}")
 
         return final_df, uuid_map, mapping_stats
@@ -149,13 +555,141 @@ def process_model_data(model_name: str, model_mappings: Dict, source_files: Dict
             del source_df
         gc.collect()
 
-def map_multi_references(value: str, uuid_map: Dict[str, str]) -> str:
+def get_ref_key_columns(mappings: Dict, ref_model: str, ref_key: Optional[Union[str, List[str]]] = None) -> List[str]:
+    """
+    Resolve the source columns a reference looks up in the referenced model.
+
+    ref_key may name a column of the referenced model's template (its source
+    column is used) or directly a column of the model's source file, or be a
+    list of such names for a composite key. Without ref_key, the model's key
+    columns are used.
+    """
+    if ref_model not in mappings:
+        raise ValueError(f"Modèle référencé '{ref_model}' non configuré")
+    key_mapping = get_source_mapping(mappings[ref_model])
+    if key_mapping is None:
+        raise ValueError(f"Aucun mapping source trouvé pour le modèle {ref_model}")
+    if not ref_key:
+        return get_key_columns(mappings[ref_model])
+
+    key_cols = []
+    for key in (ref_key if isinstance(ref_key, (list, tuple)) else [ref_key]):
+        template_mapping = mappings[ref_model].get(key)
+        if isinstance(template_mapping, dict) and "source_file" in template_mapping:
+            if template_mapping["source_file"] != key_mapping["source_file"]:
+                raise ValueError(f"La clé de référence '{key}' du modèle {ref_model} doit provenir "
+                                 f"du fichier '{key_mapping['source_file']}'")
+            key_cols.append(template_mapping["source_col"])
+        else:
+            key_cols.append(key)
+    return key_cols
+
+def get_ref_key_id(ref_key: Optional[Union[str, List[str]]]) -> Optional[Union[str, tuple]]:
+    """Return a hashable form of a declared ref_key, used to look up its key index"""
+    return tuple(ref_key) if isinstance(ref_key, (list, tuple)) else ref_key
+
+def get_reference_source_columns(mapping: Dict, key_cols: List[str]) -> List[str]:
+    """
+    Return the referencing source columns of a reference.
+
+    A reference to a composite key lists its columns in "source_cols", in the
+    order of the referenced key columns.
+    """
+    if len(key_cols) == 1:
+        return [mapping["source_col"]]
+    source_cols = list(mapping.get("source_cols") or [])
+    if len(source_cols) != len(key_cols):
+        raise ValueError(f"La référence vers {mapping['ref_model']} doit déclarer {len(key_cols)} colonnes "
+                         f"sources (source_cols) pour la clé composite {key_cols}")
+    return source_cols
+
+def collect_ref_keys(mappings: Dict) -> Dict[str, Dict[Optional[Union[str, tuple]], tuple]]:
+    """Collect, for each referenced model, the declared ref_key values and their source columns"""
+    ref_keys = {}
+    for model_mappings in mappings.values():
+        for mapping in model_mappings.values():
+            if isinstance(mapping, dict) and mapping.get("is_ref"):
+                ref_model = mapping["ref_model"]
+                key_cols = get_ref_key_columns(mappings, ref_model, mapping.get("ref_key"))
+                # Fail early on composite references missing their source columns
+                get_reference_source_columns(mapping, key_cols)
+                ref_keys.setdefault(ref_model, {})[get_ref_key_id(mapping.get("ref_key"))] = tuple(key_cols)
+    return ref_keys
+
+def build_key_index(source_df: pd.DataFrame, key_cols: List[str], ids: pd.Series, pool: KeyPool) -> pd.Series:
+    """
+    Build the index of one key: key -> row UUID (binary, see utils.uuids).
+
+    Single keys are interned as text in the run's key pool, like the
+    references split by map_multi_references: the index holds the UUID of
+    each pool code, at the code's position. Composite keys are indexed by
+    their uint64 row hash (see is_composite_index). When an alternate key is
+    not unique, its first row wins.
+    """
+    if len(key_cols) == 1:
+        codes = pool.encode(source_df[key_cols[0]])
+        codes[ids.isna().to_numpy()] = -1
+        return pd.Series(ids.array.take(pool.dense_index(codes), allow_fill=True))
+    else:
+        key_values = hash_key_columns(source_df, key_cols)
+        index = pd.Series(ids.array, index=key_values.to_numpy(dtype='uint64', na_value=0))
+        index = index[key_values.notna().to_numpy() & ids.notna().to_numpy()]
+        return index[~index.index.duplicated(keep='first')]
+
+def is_composite_index(key_index: pd.Series) -> bool:
+    """Whether a key index is keyed by composite row hashes rather than by pool codes"""
+    return pd.api.types.is_unsigned_integer_dtype(key_index.index.dtype)
+
+def build_key_indexes(mappings: Dict, source_files: Dict, uuid_mappings: Dict[str, pd.Series],
+                      pool: KeyPool) -> Dict[str, Dict]:
+    """
+    Build, once per run, the key indexes every reference resolves against.
+
+    Single keys are interned in pool, shared by all the indexes and
+    references of the run.
+
+    Returns key_indexes[ref_model][ref_key] (see get_ref_key_id); ref_key
+    values resolving to the same source columns share one index.
+    """
+    key_indexes = {}
+    for ref_model, ref_keys in collect_ref_keys(mappings).items():
+        if ref_model not in uuid_mappings:
+            raise ValueError(f"Mapping UUID non trouvé pour le modèle référencé {ref_model}")
+        key_mapping = get_source_mapping(mappings[ref_model])
+        # Only the rows kept by the referenced model's filters can be referenced
+        source_df = get_model_source(source_files, ref_model, mappings[ref_model])
+        model_key_cols = get_key_columns(mappings[ref_model])
+        _check_columns(source_df, model_key_cols, key_mapping["source_file"])
+        ids = lookup_uuids(uuid_mappings[ref_model], get_key_values(source_df, model_key_cols))
+
+        indexes_by_columns = {}
+        key_indexes[ref_model] = {}
+        for ref_key, key_cols in ref_keys.items():
+            if key_cols not in indexes_by_columns:
+                _check_columns(source_df, list(key_cols), key_mapping["source_file"])
+                indexes_by_columns[key_cols] = build_key_index(source_df, list(key_cols), ids, pool)
+                logging.info(f"Index de clés {ref_model}.{list(key_cols)}: "
+                             f"{int(indexes_by_columns[key_cols].notna().sum())} valeurs")
+            key_indexes[ref_model][ref_key] = indexes_by_columns[key_cols]
+    return key_indexes
+
+def map_composite_references(hashes: pd.Series, key_index: pd.Series) -> pd.Series:
+    """Map composite key row hashes to the referenced UUIDs, NA when not found"""
+    positions = key_index.index.get_indexer(hashes.to_numpy(dtype='uint64', na_value=0))
+    positions[hashes.isna().to_numpy()] = -1
+    return pd.Series(key_index.array.take(positions, allow_fill=True), index=hashes.index)
+
+# Unresolved references quoted in the per-column summary
+UNRESOLVED_SAMPLES = 5
+
+def map_multi_references(value: str, uuid_map: Dict[str, str], unresolved: Optional[Counter] = None) -> str:
     """
     Map multiple references separated by commas to their corresponding UUIDs.
     
     Args:
         value: String containing one or more references separated by ", "
         uuid_map: Dictionary mapping original values to UUIDs
+        unresolved: Counter receiving the references not found in uuid_map
         
     Returns:
         String of mapped UUIDs separated by ", " or empty string if no valid mappings
@@ -173,71 +707,141 @@ def map_multi_references(value: str, uuid_map: Dict[str, str]) -> str:
             uuid = uuid_map.get(ref)
             if uuid:
                 mapped_refs.append(uuid)
-            else:
-                logging.warning(f"Référence non trouvée dans le mapping: '{ref}'")
-                logging.debug(f"Valeurs disponibles dans le mapping: {list(uuid_map.keys())[:5]}...")
+            elif unresolved is not None:
+                unresolved[ref] += 1
         
         return ", ".join(mapped_refs) if mapped_refs else ''
     except Exception as e:
-        logging.error(f"Erreur lors du mapping de la référence '{value}': {str(e)}")
+        logging.error("Erreur lors du mapping de la référence %r: %s", value, e)
         return ''
 
-def process_model_references(final_df: pd.DataFrame, model_mappings: Dict, source_files: Dict, uuid_mappings: Dict) -> None:
-    """Process references for a single model, with proper memory management"""
+def _index_positions(key_index: pd.Series, codes: np.ndarray) -> np.ndarray:
+    """Position in a single key index of each pool code, -1 when the key is not in the index"""
+    positions = dense_positions(len(key_index), codes)
+    valid = positions >= 0
+    valid[valid] = key_index.notna().to_numpy()[positions[valid]]
+    return np.where(valid, positions, -1)
+
+def resolve_references(values: pd.Series, key_index: pd.Series, pool: KeyPool) -> tuple:
+    """
+    Map a column of references to UUIDs, resolving each distinct value once.
+
+    Distinct references are coded with the run's key pool, then mapped to
+    the UUIDs of the key index (see build_key_index) by integer indexing.
+    Cells holding a single reference are resolved in one vectorized pass
+    and stay binary (see utils.uuids). Only the distinct cells listing
+    several references go through map_multi_references; such a column is
+    returned as text, its UUIDs being joined in the cells.
+
+    Returns:
+        (UUIDs aligned on values, occurrences of each unresolved reference
+        as a Series sorted from the most frequent)
+    """
+    codes, uniques = pd.factorize(values)
+    text = key_text(pd.Series(np.asarray(uniques)))
+    occurrences = np.bincount(codes[codes >= 0], minlength=len(text))
+
+    multi = text.str.contains(", ", regex=False).to_numpy()
+    single = text[~multi].str.strip()
+    # Missing values (code -1) take the trailing -1 position, which resolves to NA
+    positions = np.full(len(text) + 1, -1, dtype=np.intp)
+    positions[single.index] = _index_positions(key_index, pool.lookup(single))
+
+    missing = positions[single.index] < 0
+    unresolved = Counter()
+    for ref, count in zip(single[missing], occurrences[single.index[missing]]):
+        unresolved[ref] += int(count)
+
+    if multi.any():
+        # Only the references listed in multi-valued cells are formatted for them
+        refs = text[multi].str.split(", ").explode().str.strip().unique()
+        ref_positions = _index_positions(key_index, pool.lookup(refs))
+        found = ref_positions >= 0
+        lookup = dict(zip(refs[found], format_uuids(key_index.array.take(ref_positions[found]))))
+        resolved = format_uuids(key_index.array.take(positions, allow_fill=True))
+        for i in np.flatnonzero(multi):
+            refs = Counter()
+            resolved[i] = map_multi_references(text[i], lookup, refs)
+            for ref, count in refs.items():
+                unresolved[ref] += count * int(occurrences[i])
+        ids = resolved[codes]
+    else:
+        ids = key_index.array.take(positions[codes], allow_fill=True)
+
+    unresolved = pd.Series(unresolved, dtype='int64').sort_values(ascending=False, kind='stable')
+    return pd.Series(ids, index=values.index), unresolved
+
+def log_unresolved_references(col: str, ref_model: str, unresolved: pd.Series, total: int) -> None:
+    """Log one summary per reference column: counts and a bounded sample of the unresolved references"""
+    mapped = total - int(unresolved.sum())
+    logging.info("Références %s -> %s: %d/%d résolues", col, ref_model, mapped, total)
+    if len(unresolved):
+        logging.warning(
+            "Références non résolues pour %s -> %s: %d occurrences, %d valeurs distinctes (ex: %s)",
+            col, ref_model, int(unresolved.sum()), len(unresolved),
+            unresolved.head(UNRESOLVED_SAMPLES).to_dict()
+        )
+
+def process_model_references(final_df: pd.DataFrame, model_mappings: Dict, source_files: Dict, key_indexes: Dict,
+                             joins: Optional[Dict[str, np.ndarray]] = None, pool: Optional[KeyPool] = None) -> None:
+    """
+    Process references for a single model against the shared key indexes
+    and the key pool they were built with (see build_key_indexes).
+
+    Columns of joined files are aligned with the planned joins (see
+    plan_model_joins), the others by row.
+    """
     source_df = None
     try:
         for col, mapping in model_mappings.items():
             if col == "ID" or not isinstance(mapping, dict) or "source_file" not in mapping:
                 continue
             
-            logging.info(f"Traitement de la colonne {col}")
-            logging.info(f"Mapping: {mapping}")
+            logging.debug("Traitement de la colonne %s: %s", col, mapping)
             
             if mapping["source_file"] not in source_files:
                 logging.error(f"Fichier source '{mapping['source_file']}' non trouvé")
                 logging.error(f"Fichiers sources disponibles: {list(source_files.keys())}")
                 raise ValueError(f"Fichier source '{mapping['source_file']}' non trouvé")
                 
-            source_df = source_files[mapping["source_file"]]["data"].copy()
+            source_df = get_source_data(source_files, mapping["source_file"])
+            used_cols = list(dict.fromkeys([mapping["source_col"]] + list(mapping.get("source_cols") or [])))
+            _check_columns(source_df, used_cols, mapping["source_file"])
+            # Only the used columns of the model's rows are copied
+            if joins and mapping["source_file"] in joins:
+                source_df = align_joined_rows(source_df[used_cols], joins[mapping["source_file"]], final_df.index)
+            else:
+                source_df = source_df.loc[source_df.index.intersection(final_df.index, sort=False), used_cols].copy()
             source_df = optimize_dataframe(source_df)
             
-            if mapping["source_col"] not in source_df.columns:
-                logging.error(f"Colonne source '{mapping['source_col']}' non trouvée dans {mapping['source_file']}")
-                logging.error(f"Colonnes disponibles: {source_df.columns.tolist()}")
-                raise ValueError(f"Colonne source '{mapping['source_col']}' non trouvée")
-            
             if mapping.get("is_ref"):
                 ref_model = mapping["ref_model"]
-                if ref_model not in uuid_mappings:
-                    logging.error(f"Mapping UUID non trouvé pour le modèle référencé {ref_model}")
-                    logging.error(f"Mappings UUID disponibles: {list(uuid_mappings.keys())}")
+                ref_key = get_ref_key_id(mapping.get("ref_key"))
+                if ref_key not in key_indexes.get(ref_model, {}):
+                    logging.error(f"Index de clés non trouvé pour le modèle référencé {ref_model} (clé: {ref_key})")
+                    logging.error(f"Index disponibles: {list(key_indexes.keys())}")
                     raise ValueError(f"Mapping UUID non trouvé pour le modèle référencé {ref_model}")
+                key_index = key_indexes[ref_model][ref_key]
+                logging.debug("Mapping de références pour %s vers %s (clé: %s, %d valeurs indexées)",
+                              col, ref_model, ref_key or "clé du modèle", len(key_index))
                 
-                # Log des informations de mapping pour le débogage
-                logging.info(f"Mapping de références pour {col} vers {ref_model}")
-                logging.info(f"Nombre de valeurs dans uuid_mappings[{ref_model}]: {len(uuid_mappings[ref_model])}")
-                logging.debug(f"Exemple de valeurs dans le mapping: {dict(list(uuid_mappings[ref_model].items())[:3])}")
-                
-                source_values = source_df[mapping["source_col"]]
-                # Log des valeurs source pour le débogage
-                logging.debug(f"Exemple de valeurs source: {source_values.head().tolist()}")
-                
-                final_df[col] = source_values.apply(lambda x: map_multi_references(x, uuid_mappings[ref_model]))
+                source_values = source_df[mapping["source_col"]].reindex(final_df.index)
+                if mapping.get("transforms"):
+                    # Normalisation des clés (trim, upper...) avant résolution
+                    source_values = compile_transforms(mapping["transforms"])(source_values)
                 
-                # Vérification des valeurs non mappées
-                unmapped = source_values[final_df[col] == '']
-                if not unmapped.empty:
-                    logging.warning(f"Valeurs non mappées pour {col}: {unmapped.unique().tolist()[:5]}")
+                if is_composite_index(key_index):
+                    # Composite key: the referencing columns are hashed together
+                    hashes = hash_key_columns(source_df, list(mapping["source_cols"])).reindex(final_df.index)
+                    final_df[col] = map_composite_references(hashes, key_index)
+                    labels = format_key_labels(source_df, list(mapping["source_cols"])).reindex(final_df.index)
+                    unresolved = labels[final_df[col].isna().to_numpy() & hashes.notna().to_numpy()].value_counts()
+                else:
+                    final_df[col], unresolved = resolve_references(source_values, key_index, pool)
                 
-                # Log reference mapping statistics
-                total_refs = len(source_values)
-                mapped_refs = sum(final_df[col] != '')
-                logging.info(f"Statistiques de référence pour {col}:")
-                logging.info(f"Total références: {total_refs}")
-                logging.info(f"Références mappées: {mapped_refs}")
-                logging.info(f"Références non mappées: {total_refs - mapped_refs}")
+                log_unresolved_references(col, ref_model, unresolved, int(source_values.notna().sum()))
             else:
-                final_df[col] = source_df[mapping["source_col"]]
+                final_df[col] = map_column(source_df, col, mapping).reindex(final_df.index)
             
             del source_df
             source_df = None
@@ -252,39 +856,223 @@ def process_model_references(final_df: pd.DataFrame, model_mappings: Dict, sourc
             del source_df
         gc.collect()
 
-def generate_kimaiko_files(mappings: Dict, source_files: Dict) -> bytes:
-    """Generate Kimaiko format files with UUID handling and package them in a zip"""
+# Output formats of the generated model files
+OUTPUT_FORMATS = {
+    "xlsx": "Excel (.xlsx)",
+    "jsonl.gz": "JSON Lines compressé (.jsonl.gz)",
+    "jsonl": "JSON Lines (.jsonl)"
+}
+
+# Excel sheet limit (1,048,576 rows), header row excluded
+EXCEL_MAX_ROWS = 1_048_575
+
+# Default number of rows per output file before a model is split into parts
+DEFAULT_PART_ROWS = 500_000
+
+# Parts are written by separate processes: openpyxl is pure Python and holds the GIL
+OUTPUT_WORKERS = min(4, os.cpu_count() or 1)
+
+def get_part_paths(model_name: str, output_format: str, row_count: int, part_rows: int) -> List[tuple]:
+    """Return (file name, start, stop) for each part of a model output"""
+    if output_format == "xlsx":
+        part_rows = min(part_rows, EXCEL_MAX_ROWS)
+    if row_count <= part_rows:
+        return [(f"{model_name}.{output_format}", 0, row_count)]
+    starts = range(0, row_count, part_rows)
+    return [(f"{model_name}_part{i + 1:03d}.{output_format}", start, min(start + part_rows, row_count))
+            for i, start in enumerate(starts)]
+
+def _write_output_file(df: pd.DataFrame, output_path: Path, output_format: str) -> int:
+    """Write one output file (a whole model or one of its parts), UUIDs formatted as text"""
+    logging.info(f"Sauvegarde du fichier: {output_path}")
+    df = format_uuid_columns(df)
+    if output_format == "xlsx":
+        df.to_excel(
+            output_path,
+            index=False,
+            engine='openpyxl'
+        )
+    else:
+        # JSON Lines is streamed block by block
+        write_jsonl(df, str(output_path))
+    logging.info(f"Fichier sauvegardé avec succès: {output_path.name}")
+    return len(df)
+
+def write_model_output(final_df: pd.DataFrame, output_dir: Path, model_name: str, output_formats=("xlsx",),
+                       part_rows: int = DEFAULT_PART_ROWS) -> List[Dict]:
+    """
+    Write a generated model in each requested output format.
+
+    Models larger than part_rows (and always past Excel's row limit for
+    xlsx) are split into numbered part files written in parallel.
+    Returns one entry per written file: model, format, file, part and rows.
+    """
+    jobs = []
+    for output_format in output_formats:
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Format de sortie inconnu: '{output_format}'")
+        parts = get_part_paths(model_name, output_format, len(final_df), part_rows)
+        for part, (file_name, start, stop) in enumerate(parts, start=1):
+            jobs.append({
+                'model': model_name,
+                'format': output_format,
+                'file': file_name,
+                'part': part if len(parts) > 1 else None,
+                'rows': stop - start,
+                'slice': (start, stop)
+            })
+
+    # Worker processes are only worth starting for split models
+    if OUTPUT_WORKERS == 1 or not any(job['part'] for job in jobs):
+        for job in jobs:
+            start, stop = job.pop('slice')
+            _write_output_file(final_df.iloc[start:stop], output_dir / job['file'], job['format'])
+        return jobs
+
+    # Spawned workers: forking a multi-threaded server process is unsafe
+    with ProcessPoolExecutor(max_workers=min(OUTPUT_WORKERS, len(jobs)),
+                             mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = []
+        for job in jobs:
+            start, stop = job.pop('slice')
+            futures.append(executor.submit(_write_output_file, final_df.iloc[start:stop],
+                                           output_dir / job['file'], job['format']))
+        for future in futures:
+            future.result()
+    return jobs
+
+def get_model_dependencies(mappings: Dict) -> Dict[str, set]:
+    """Models referenced by each model (a model referencing itself depends on itself)"""
+    return {
+        model: {m['ref_model'] for m in model_mappings.values() if isinstance(m, dict) and m.get('is_ref')}
+        for model, model_mappings in mappings.items()
+    }
+
+def get_processing_order(mappings: Dict) -> List[str]:
+    """
+    Sort models so that every referenced model comes before the models referencing it.
+
+    Mutually referencing models and self-references are allowed: all UUIDs
+    are generated before any reference is resolved (see
+    utils.scheduling.schedule_models).
+    """
+    schedule = schedule_models(get_model_dependencies(mappings))
+    logging.info("Ordre de traitement: %s (modèles par niveau: %s)", schedule['processing_order'], schedule['widths'])
+    if schedule['cycles']:
+        logging.info("Modèles en références circulaires: %s", schedule['cycles'])
+    return schedule['processing_order']
+
+def get_used_source_files(mappings: Dict) -> set:
+    """Names of the source files referenced by the mappings, joined files included"""
+    return {m["source_file"] for model_mappings in mappings.values()
+            for m in list(model_mappings.values()) + get_model_joins(model_mappings)
+            if isinstance(m, dict) and "source_file" in m}
+
+def build_uuid_mappings(mappings: Dict, source_files: Dict, processing_order: List[str],
+                        stable_uuid_mappings: Optional[Dict[str, Dict]] = None) -> tuple[Dict, Dict]:
+    """
+    First pass: generate the UUIDs of every model.
+
+    Keys found in stable_uuid_mappings (the UUID maps of a previous
+    generation, see utils.deltas) keep their UUID; only new keys get one.
+
+    Returns the UUID map of each model (binary UUIDs indexed by key, see
+    utils.uuids) and, for composite keys, the readable label of each key
+    for the references file.
+    """
+    uuid_mappings = {}
+    key_labels = {}
+    for model_name in processing_order:
+        source_mapping = get_source_mapping(mappings[model_name])
+        if source_mapping:
+            source_df = get_model_source(source_files, model_name, mappings[model_name])
+            key_cols = get_key_columns(mappings[model_name])
+            _check_columns(source_df, key_cols, source_mapping["source_file"])
+            values = get_key_values(source_df, key_cols).values
+            if len(key_cols) > 1:
+                # Readable composite keys for the references file
+                labels = pd.Series(format_key_labels(source_df, key_cols).to_numpy(), index=values)
+                key_labels[model_name] = labels[~labels.index.duplicated()]
+            uuid_map = create_uuid_table(values)
+            stable = (stable_uuid_mappings or {}).get(model_name)
+            if stable is not None:
+                uuid_map = reuse_uuids(uuid_map, stable)
+            uuid_mappings[model_name] = uuid_map
+    return uuid_mappings, key_labels
+
+def iter_model_frames(mappings: Dict, source_files: Dict, processing_order: List[str],
+                      uuid_mappings: Dict) -> Iterator[tuple[str, pd.DataFrame, Dict]]:
+    """
+    Second pass: build each model with consistent UUIDs and resolved references.
+
+    Yields (model_name, final_df, stats) in processing order, one model at a
+    time, so callers can write or display a model before the next is built.
+    """
+    # Index de clés partagés par toutes les références, construits une seule fois
+    # sur un dictionnaire de clés commun à l'exécution
+    pool = KeyPool()
+    key_indexes = build_key_indexes(mappings, source_files, uuid_mappings, pool)
+    logging.info("Dictionnaire de clés: %d clés distinctes", len(pool))
+    
+    for model_name in processing_order:
+        logging.info(f"\nTraitement du modèle: {model_name}")
+        try:
+            final_df, _, stats = process_model_data(
+                model_name, 
+                mappings[model_name], 
+                source_files,
+                existing_uuid_map=uuid_mappings[model_name]  # Utiliser le mapping existant
+            )
+            if final_df is None:
+                continue
+            
+            joins = plan_model_joins(model_name, mappings[model_name], source_files, final_df.index)
+            process_model_references(
+                final_df, 
+                mappings[model_name], 
+                source_files, 
+                key_indexes,
+                joins,
+                pool
+            )
+            final_df = optimize_dataframe(final_df)
+        except Exception as e:
+            logging.error(f"Erreur lors du traitement du modèle {model_name}")
+            logging.error(f"Message d'erreur: {str(e)}")
+            logging.error(f"Traceback: {traceback.format_exc()}")
+            raise Exception(f"'{model_name}': {str(e)}")
+        yield model_name, final_df, stats
+
+def generate_kimaiko_files(mappings: Dict, source_files: Dict, output_formats=("xlsx",),
+                           snapshot_dir: Optional[str] = None, part_rows: int = DEFAULT_PART_ROWS,
+                           checkpoint_dir: Optional[str] = None, delta_state_dir: Optional[str] = None,
+                           delta_project: Optional[str] = None) -> bytes:
+    """Generate Kimaiko format files with UUID handling and package them in a zip.
+
+    If snapshot_dir is given, each generated model is also snapshotted there
+    as compressed Parquet (see utils.snapshots). Models larger than
+    part_rows are split into part files (see write_model_output).
+
+    If checkpoint_dir is given, each model is checkpointed there as soon as
+    it is built, and models whose mapping, sources and referenced models
+    are unchanged are resumed from their checkpoint (see utils.checkpoints).
+
+    If delta_state_dir is given, keys keep their UUID from one generation to
+    the next and only the rows inserted, updated or deleted since the
+    previous generation are written, one file per model and kind of change
+    (see utils.deltas). The state is kept per delta_project and model
+    configuration, and updated once the archive is built.
+    """
+    if delta_state_dir and not delta_project:
+        raise ValueError("Un nom de projet est requis pour la génération des changements")
     temp_dir = None
+    output_snapshots = {}
+    output_files = []
     try:
         logging.info("Début de la génération des fichiers Kimaiko")
         
-        # Créer un dictionnaire global pour stocker tous les mappings UUID
-        global_uuid_mappings = {}
-        
         # Analyser les dépendances pour déterminer l'ordre de traitement
-        processing_order = []
-        remaining_models = set(mappings.keys())
-        dependencies = {model: set() for model in mappings.keys()}
-        
-        # Construire le graphe de dépendances
-        for model, model_mappings in mappings.items():
-            for field_mapping in model_mappings.values():
-                if isinstance(field_mapping, dict) and field_mapping.get('is_ref'):
-                    dependencies[model].add(field_mapping['ref_model'])
-        
-        # Tri topologique
-        while remaining_models:
-            available = [m for m in remaining_models 
-                       if not dependencies[m].intersection(remaining_models)]
-            
-            if not available:
-                raise ValueError("Dépendances circulaires détectées")
-            
-            for model in sorted(available):
-                processing_order.append(model)
-                remaining_models.remove(model)
-        
-        logging.info(f"Ordre de traitement: {processing_order}")
+        processing_order = get_processing_order(mappings)
         
         temp_dir = tempfile.mkdtemp()
         result_dir = Path(temp_dir) / "import_kimaiko"
@@ -292,101 +1080,107 @@ def generate_kimaiko_files(mappings: Dict, source_files: Dict) -> bytes:
         os.makedirs(result_dir / "fichiers_kimaiko")
         os.makedirs(result_dir / "references")
         
-        # Store generated UUIDs and mapping statistics
-        uuid_mappings = {}
+        # Map spilled sources back once for the whole run
+        source_files = pin_source_files(source_files, get_used_source_files(mappings))
+        
+        # Store mapping statistics
         mapping_stats = {}
         
+        # Modèles repris des points de contrôle d'une exécution précédente
+        resumed = {}
+        if checkpoint_dir:
+            # Imported here: utils.checkpoints depends on this module
+            from .checkpoints import get_checkpoint_keys, load_checkpoint, load_checkpoint_frame, save_checkpoint
+            checkpoint_keys = get_checkpoint_keys(mappings, source_files, processing_order)
+            for model_name in processing_order:
+                checkpoint = load_checkpoint(checkpoint_dir, model_name, checkpoint_keys[model_name])
+                if checkpoint is not None:
+                    resumed[model_name] = checkpoint
+                    logging.info(f"Modèle {model_name} repris du point de contrôle")
+        remaining_order = [m for m in processing_order if m not in resumed]
+        
+        # État de la génération delta précédente : UUID stables et empreintes des lignes
+        delta_states = {}
+        delta_counts = {}
+        new_delta_states = {}
+        delta_paths = {}
+        if delta_state_dir:
+            delta_paths = {m: delta_state_path(delta_state_dir, delta_project, m, mappings[m], get_key_columns(mappings[m]))
+                           for m in processing_order}
+            delta_states = {m: load_delta_state(path) for m, path in delta_paths.items()}
+        stable_uuid_mappings = {m: state['uuid_map'] for m, state in delta_states.items() if state is not None}
+        
         # Première passe : générer tous les UUIDs
-        for model_name in processing_order:
-            source_mapping = next((m for m in mappings[model_name].values() 
-                                if isinstance(m, dict) and "source_file" in m), None)
-            if source_mapping:
-                source_df = source_files[source_mapping["source_file"]]["data"]
-                key_col = source_mapping["source_col"]
-                values = source_df[key_col].values
-                if model_name not in global_uuid_mappings:
-                    global_uuid_mappings[model_name] = create_uuid_mapping(values)
-                    # Stocker aussi dans uuid_mappings pour la génération du fichier de références
-                    uuid_mappings[model_name] = global_uuid_mappings[model_name]
+        new_uuid_mappings, key_labels = build_uuid_mappings(mappings, source_files, remaining_order, stable_uuid_mappings)
+        for model_name, checkpoint in resumed.items():
+            new_uuid_mappings[model_name] = checkpoint['uuid_map']
+            if checkpoint['key_labels'] is not None:
+                key_labels[model_name] = checkpoint['key_labels']
+        global_uuid_mappings = {m: new_uuid_mappings[m] for m in processing_order if m in new_uuid_mappings}
+        
+        def model_frames():
+            """Resumed models first, then the remaining ones, checkpointed as soon as they are built"""
+            for model_name, checkpoint in resumed.items():
+                yield model_name, load_checkpoint_frame(checkpoint_dir, model_name, checkpoint_keys[model_name]), checkpoint['stats']
+            for model_name, final_df, stats in iter_model_frames(mappings, source_files, remaining_order, global_uuid_mappings):
+                if checkpoint_dir:
+                    save_checkpoint(checkpoint_dir, model_name, checkpoint_keys[model_name], final_df,
+                                    global_uuid_mappings[model_name], key_labels.get(model_name), stats)
+                yield model_name, final_df, stats
         
         # Deuxième passe : traiter les fichiers avec les UUIDs cohérents
-        for model_name in processing_order:
-            logging.info(f"\nTraitement du modèle: {model_name}")
-            final_df = None
+        for model_name, final_df, stats in model_frames():
             try:
-                final_df, _, stats = process_model_data(
-                    model_name, 
-                    mappings[model_name], 
-                    source_files,
-                    existing_uuid_map=global_uuid_mappings[model_name]  # Utiliser le mapping existant
-                )
+                mapping_stats[model_name] = stats
                 
-                if final_df is not None:
-                    mapping_stats[model_name] = stats
-                    
-                    # Utiliser global_uuid_mappings au lieu de uuid_mappings
-                    process_model_references(
-                        final_df, 
-                        mappings[model_name], 
-                        source_files, 
-                        global_uuid_mappings
-                    )
-                    
+                if delta_state_dir:
+                    # Only the rows changed since the previous generation are written
+                    fingerprints = row_fingerprints(final_df)
+                    changes = compute_delta(final_df, fingerprints, delta_states.get(model_name))
+                    for kind, changed_df in changes.items():
+                        if len(changed_df):
+                            output_files.extend(write_model_output(
+                                changed_df, result_dir / "fichiers_kimaiko", f"{model_name}_{DELTA_KINDS[kind]}",
+                                output_formats, part_rows
+                            ))
+                    delta_counts[model_name] = {kind: len(changed_df) for kind, changed_df in changes.items()}
+                    new_delta_states[model_name] = (final_df["ID"].array, fingerprints)
+                    logging.info(f"Changements pour {model_name}: {delta_counts[model_name]}")
+                else:
                     # Save optimized DataFrame
-                    final_df = optimize_dataframe(final_df)
-                    output_path = result_dir / "fichiers_kimaiko" / f"{model_name}.xlsx"
-                    logging.info(f"Sauvegarde du fichier: {output_path}")
-                    final_df.to_excel(
-                        output_path,
-                        index=False,
-                        engine='openpyxl'
-                    )
-                    logging.info(f"Fichier sauvegardé avec succès: {model_name}.xlsx")
+                    output_files.extend(write_model_output(
+                        final_df, result_dir / "fichiers_kimaiko", model_name, output_formats, part_rows
+                    ))
+                if snapshot_dir:
+                    # Imported here: utils.snapshots depends on this module
+                    from .snapshots import snapshot_entry
+                    output_snapshots[model_name] = snapshot_entry(format_uuid_columns(final_df), snapshot_dir)
             except Exception as e:
-                logging.error(f"Erreur lors du traitement du modèle {model_name}")
+                logging.error(f"Erreur lors de l'écriture du modèle {model_name}")
                 logging.error(f"Message d'erreur: {str(e)}")
                 logging.error(f"Traceback: {traceback.format_exc()}")
                 raise Exception(f"'{model_name}': {str(e)}")
             finally:
-                if final_df is not None:
-                    del final_df
+                del final_df
                 gc.collect()
         
-        # Create UUID mapping file without statistics
-        mapping_df = None
+        # UUID cross-reference, queryable by original value or by UUID
         try:
-            mapping_dfs = []
-            for model_name, mapping in global_uuid_mappings.items():
-                if not mapping:
-                    logging.warning(f"Mapping vide pour le modèle {model_name}")
-                    continue
-                    
-                df = pd.DataFrame(list(mapping.items()), columns=['Valeur Originale', 'UUID'])
-                df['Modèle'] = model_name
-                mapping_dfs.append(df)
-            
-            if mapping_dfs:
-                mapping_df = pd.concat(mapping_dfs, ignore_index=True)
-                mapping_df = optimize_dataframe(mapping_df)
-                
-                output_path = result_dir / "references" / "references_uuid.xlsx"
-                mapping_df.to_excel(
-                    output_path,
-                    index=False,
-                    engine='openpyxl'
-                )
-                logging.info(f"Fichier de références sauvegardé: {output_path}")
+            if any(len(uuid_map) for uuid_map in global_uuid_mappings.values()):
+                write_reference_store(result_dir / "references" / REFERENCE_STORE_NAME,
+                                      global_uuid_mappings, key_labels, output_files, mapping_stats)
             else:
                 logging.error("Aucune donnée de mapping à sauvegarder")
         except Exception as e:
-            logging.error("Erreur lors de la création du fichier de mapping UUID")
+            logging.error("Erreur lors de la création de la table de correspondance UUID")
             logging.error(f"Message d'erreur: {str(e)}")
             logging.error(f"Traceback: {traceback.format_exc()}")
             raise
-        finally:
-            if mapping_df is not None:
-                del mapping_df
-            gc.collect()
+        
+        if output_snapshots:
+            from .snapshots import write_manifest
+            manifest_path = write_manifest("outputs", output_snapshots, snapshot_dir)
+            logging.info(f"Instantané des fichiers générés: {manifest_path}")
         
         # Create README
         readme_content = """# Import Kimaiko - Fichiers Générés
@@ -395,16 +1189,21 @@ def generate_kimaiko_files(mappings: Dict, source_files: Dict) -> bytes:
 
 ### 📁 fichiers_kimaiko/
 Contient les fichiers prêts à être importés dans Kimaiko.
+- .xlsx : un classeur Excel par modèle
+- .jsonl / .jsonl.gz : un enregistrement JSON par ligne (JSON Lines), compressé en gzip pour .jsonl.gz
+- Les modèles volumineux sont découpés en parties numérotées (`Modèle_part001.xlsx`, `Modèle_part002.xlsx`...) à importer toutes
 
 ### 📁 references/
-- references_uuid.xlsx : Table de correspondance entre les valeurs originales et les UUID générés
-  - Inclut des statistiques sur les mappings pour chaque modèle
-  - Montre le nombre total de valeurs, uniques, mappées et NA
+- references_uuid.sqlite : Table de correspondance entre les valeurs originales et les UUID générés (base SQLite indexée)
+  - Table "uuids" : modèle, valeur originale et UUID, indexée par valeur originale et par UUID
+  - Table "files" : liste des fichiers générés et de leurs parties, avec leur nombre de lignes
+  - Table "stats" : nombre total de valeurs, uniques, mappées et NA pour chaque modèle
 
 ## Comment utiliser ces fichiers
 
 1. Les fichiers dans le dossier `fichiers_kimaiko` sont prêts à être importés dans Kimaiko
-2. Le fichier `references_uuid.xlsx` vous permet de retrouver les correspondances entre les anciennes et nouvelles références
+2. La base `references_uuid.sqlite` vous permet de retrouver les correspondances entre les anciennes et nouvelles références :
+   `python -m utils.reference_store references_uuid.sqlite --value <valeur>` ou `--uuid <uuid>` (ou tout client SQLite)
 3. Importez les fichiers dans l'ordre de leurs dépendances (d'abord les fichiers référencés, puis les fichiers qui les référencent)
 
 ## Notes importantes
@@ -412,7 +1211,22 @@ Contient les fichiers prêts à être importés dans Kimaiko.
 - Les références multiples dans une cellule (séparées par ", ") sont correctement gérées
 - Les références manquantes sont remplacées par des valeurs vides
 - Les fichiers ont été optimisés pour gérer de grands volumes de données
-- Les statistiques de mapping sont incluses dans references_uuid.xlsx"""
+- Les statistiques de mapping sont incluses dans references_uuid.sqlite"""
+        
+        readme_content += "\n\n## Fichiers générés\n\n" + "\n".join(
+            f"- fichiers_kimaiko/{f['file']} : {f['model']}"
+            + (f" (partie {f['part']})" if f['part'] else "")
+            + f", {f['rows']:,} lignes"
+            for f in output_files
+        )
+        
+        if delta_state_dir:
+            readme_content += "\n\n## Changements depuis la génération précédente\n\n" + "\n".join(
+                f"- {model_name} : {counts['inserted']:,} ajouts, {counts['updated']:,} modifications, "
+                f"{counts['deleted']:,} suppressions"
+                + (" (première génération : toutes les lignes sont des ajouts)" if delta_states.get(model_name) is None else "")
+                for model_name, counts in delta_counts.items()
+            ) + "\n\nLes fichiers `_suppressions` ne contiennent que l'ID des lignes à supprimer."
         
         with open(result_dir / "README.md", "w", encoding="utf-8") as f:
             f.write(readme_content)
@@ -426,6 +1240,10 @@ Contient les fichiers prêts à être importés dans Kimaiko.
                     arc_name = file_path.relative_to(result_dir)
                     zipf.write(file_path, arc_name)
         
+        # The next delta generation compares against this one
+        for model_name, (ids, fingerprints) in new_delta_states.items():
+            save_delta_state(delta_paths[model_name], global_uuid_mappings[model_name], ids, fingerprints)
+        
         logging.info("Génération des fichiers terminée avec succès")
         
         # Read ZIP content for download
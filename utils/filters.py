@@ -0,0 +1,135 @@
+import re
+from typing import Callable, Dict, List
+import numpy as np
+import pandas as pd
+from .transforms import compile_transforms
+
+# Constructeurs de prédicats : spécification -> masque booléen sur une colonne entière
+FILTERS: Dict[str, Callable[[Dict], Callable[[pd.Series], np.ndarray]]] = {}
+
+def register_filter(name: str):
+    """Enregistre un constructeur de prédicat sous le nom utilisé dans "op" """
+    def decorator(builder):
+        FILTERS[name] = builder
+        return builder
+    return decorator
+
+def _comparable(values: pd.Series, value):
+    """Convertit la valeur de comparaison au type de la colonne (dates, nombres)"""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return pd.Timestamp(value)
+    if pd.api.types.is_numeric_dtype(values) and isinstance(value, str):
+        return float(value)
+    return value
+
+def _ordered(values: pd.Series) -> pd.Series:
+    """Colonne comparable par ordre : une catégorie non ordonnée (voir optimize_dataframe) reprend le type de ses valeurs"""
+    if isinstance(values.dtype, pd.CategoricalDtype) and not values.cat.ordered:
+        return values.astype(values.cat.categories.dtype)
+    return values
+
+def _mask(result) -> np.ndarray:
+    """Masque numpy, les valeurs manquantes ne passant jamais le filtre"""
+    return np.asarray(pd.Series(result).fillna(False), dtype=bool)
+
+def _comparison(method: str):
+    def builder(spec: Dict) -> Callable[[pd.Series], np.ndarray]:
+        value = spec["value"]
+        ordered = method not in ("eq", "ne")
+
+        def predicate(values: pd.Series) -> np.ndarray:
+            if ordered:
+                values = _ordered(values)
+            mask = _mask(getattr(values, method)(_comparable(values, value)))
+            if method == "ne":
+                # NaN != valeur est vrai : les valeurs manquantes sont écartées comme pour les autres opérateurs
+                mask &= values.notna().to_numpy()
+            return mask
+        return predicate
+    return builder
+
+for _op, _method in {"eq": "eq", "ne": "ne", "gt": "gt", "ge": "ge", "lt": "lt", "le": "le"}.items():
+    register_filter(_op)(_comparison(_method))
+
+@register_filter("between")
+def _between(spec: Dict) -> Callable[[pd.Series], np.ndarray]:
+    low, high = spec["value"]
+
+    def predicate(values: pd.Series) -> np.ndarray:
+        values = _ordered(values)
+        return _mask(values.between(_comparable(values, low), _comparable(values, high)))
+    return predicate
+
+@register_filter("in")
+def _in(spec: Dict) -> Callable[[pd.Series], np.ndarray]:
+    allowed = list(spec["value"])
+    return lambda values: values.isin(allowed).to_numpy()
+
+@register_filter("not_in")
+def _not_in(spec: Dict) -> Callable[[pd.Series], np.ndarray]:
+    excluded = list(spec["value"])
+    return lambda values: ~values.isin(excluded).to_numpy()
+
+@register_filter("notna")
+def _notna(spec: Dict) -> Callable[[pd.Series], np.ndarray]:
+    return lambda values: values.notna().to_numpy()
+
+@register_filter("isna")
+def _isna(spec: Dict) -> Callable[[pd.Series], np.ndarray]:
+    return lambda values: values.isna().to_numpy()
+
+@register_filter("regex")
+def _regex(spec: Dict) -> Callable[[pd.Series], np.ndarray]:
+    pattern = re.compile(spec["value"])
+    return lambda values: _mask(values.astype("string").str.contains(pattern, regex=True))
+
+def filter_columns(specs: List[Dict]) -> List[str]:
+    """Colonnes sources lues par une liste de filtres, dans l'ordre"""
+    return list(dict.fromkeys(spec["column"] for spec in specs or [] if isinstance(spec, dict) and "column" in spec))
+
+def compile_filters(specs: List[Dict]) -> Callable[[pd.DataFrame], np.ndarray]:
+    """
+    Compile une liste déclarative de filtres en un masque de lignes.
+
+    Chaque spécification est un dict avec "column", "op" et "value" ; une
+    ligne est conservée si elle satisfait tous les filtres. Les valeurs
+    manquantes ne passent que "isna" et "not_in" :
+    - {"column": "Statut", "op": "eq", "value": "Actif"} (ou ne, gt, ge, lt, le)
+    - {"column": "Date", "op": "ge", "value": "2024-01-01"}
+    - {"column": "Montant", "op": "between", "value": [0, 1000]}
+    - {"column": "Pays", "op": "in", "value": ["FR", "BE"]} (ou not_in)
+    - {"column": "Email", "op": "notna"} (ou isna)
+    - {"column": "Code", "op": "regex", "value": "^FOUR"}
+
+    Une clé "transforms" optionnelle (voir utils.transforms) normalise la
+    colonne avant comparaison, par exemple une date saisie en texte.
+
+    Args:
+        specs: Filtres à appliquer
+
+    Returns:
+        Callable: Fonction calculant le masque booléen des lignes conservées
+
+    Raises:
+        ValueError: Si un filtre est inconnu ou mal configuré
+    """
+    steps = []
+    for spec in specs or []:
+        op = spec.get("op") if isinstance(spec, dict) else None
+        if op not in FILTERS or "column" not in spec:
+            raise ValueError(f"Filtre inconnu: {spec!r} (disponibles: {', '.join(FILTERS)})")
+        try:
+            steps.append((spec["column"], FILTERS[op](spec), compile_transforms(spec.get("transforms"))))
+        except (KeyError, TypeError, re.error) as e:
+            raise ValueError(f"Filtre '{op}' sur '{spec['column']}' mal configuré: {str(e)}") from e
+
+    def apply(df: pd.DataFrame) -> np.ndarray:
+        mask = np.ones(len(df), dtype=bool)
+        for column, predicate, transform in steps:
+            # Chaque filtre ne porte que sur les lignes encore conservées
+            rows = np.flatnonzero(mask)
+            if not len(rows):
+                break
+            mask[rows] = predicate(transform(df[column].iloc[rows]))
+        return mask
+    return apply
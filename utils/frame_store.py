@@ -0,0 +1,86 @@
+import logging
+import shutil
+import tempfile
+import uuid
+import weakref
+from pathlib import Path
+from typing import List, Optional
+import pandas as pd
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+class SpilledFrame:
+    """
+    Référence légère vers un DataFrame écrit au format Arrow IPC.
+
+    Seuls le chemin et les métadonnées restent dans le tas Python : les
+    données sont relues par mappage mémoire à chaque appel de load().
+    """
+
+    def __init__(self, store: "FrameStore", path: Path, columns: List, row_count: int):
+        # La référence au magasin le garde en vie tant que la référence existe
+        self.store = store
+        self.path = path
+        self.columns = columns
+        self.row_count = row_count
+
+    def load(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Remappe le fichier Arrow et le convertit en DataFrame.
+
+        Args:
+            columns: Colonnes à charger (toutes par défaut)
+
+        Returns:
+            pd.DataFrame: Données, avec leurs types d'origine (catégories incluses)
+        """
+        table = pa.ipc.open_file(pa.memory_map(str(self.path))).read_all()
+        if columns is not None:
+            table = table.select([str(col) for col in columns])
+        df = table.to_pandas()
+        # Arrow ne conserve que des noms texte : restauration des noms d'origine (en-têtes numériques)
+        original_names = {str(col): col for col in self.columns}
+        df.columns = [original_names[col] for col in df.columns]
+        return df
+
+class FrameStore:
+    """
+    Répertoire temporaire propre à une session, contenant ses DataFrames déchargés.
+
+    Le répertoire est supprimé dès que le magasin n'est plus référencé (fin
+    de la session Streamlit qui le conserve dans st.session_state) ou à
+    l'arrêt du serveur.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.directory = Path(tempfile.mkdtemp(prefix="kimaiko-session-", dir=root))
+        self._finalizer = weakref.finalize(self, shutil.rmtree, str(self.directory), True)
+
+    def spill(self, df: pd.DataFrame) -> Optional[SpilledFrame]:
+        """
+        Écrit un DataFrame dans le magasin.
+
+        Args:
+            df: Données à décharger
+
+        Returns:
+            Optional[SpilledFrame]: Référence vers les données, ou None si
+            elles ne sont pas représentables en Arrow (colonnes de types
+            mélangés) et doivent rester en mémoire
+        """
+        try:
+            table = pa.Table.from_pandas(df.rename(columns=str))
+        except (pa.ArrowException, ValueError) as e:
+            logger.warning(f"Données conservées en mémoire, conversion Arrow impossible: {str(e)}")
+            return None
+
+        path = self.directory / f"{uuid.uuid4().hex}.arrow"
+        with pa.OSFile(str(path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        return SpilledFrame(self, path, df.columns.tolist(), len(df))
+
+    def cleanup(self):
+        """Supprime immédiatement le répertoire du magasin"""
+        self._finalizer()
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+from .keys import key_text
+
+class KeyPool:
+    """
+    Dictionnaire d'internement des clés d'une exécution : texte -> code entier.
+
+    Chaque clé distincte (code fournisseur, code article...) est stockée une
+    seule fois, quel que soit le nombre de modèles et de colonnes qui la
+    citent. Les index de clés des modèles référencés et les colonnes de
+    références partagent ces codes : la résolution d'une référence devient
+    une indexation entière (voir dense_positions).
+    """
+
+    def __init__(self):
+        # Index pandas : sa table de hachage est construite une fois par lot de clés ajoutées
+        self._keys = pd.Index([], dtype=object)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def encode(self, values: pd.Series, insert: bool = True) -> np.ndarray:
+        """
+        Code de chaque valeur, comparée sous forme de texte (voir key_text).
+
+        Seules les valeurs distinctes sont converties et recherchées dans le
+        dictionnaire ; le résultat est redistribué par indexation entière.
+
+        Args:
+            values: Valeurs à coder
+            insert: Ajoute au dictionnaire les valeurs inconnues (sinon leur code est -1)
+
+        Returns:
+            np.ndarray: Codes int64 alignés sur values, -1 pour les valeurs manquantes
+        """
+        codes, uniques = pd.factorize(values)
+        # Deux valeurs distinctes peuvent avoir le même texte (1, 1.0 et "1")
+        text_codes, texts = pd.factorize(key_text(uniques).to_numpy(dtype=object))
+        unique_codes = self._keys.get_indexer(texts).astype(np.int64)
+        unknown = unique_codes < 0
+        if insert and unknown.any():
+            unique_codes[unknown] = np.arange(len(self._keys), len(self._keys) + int(unknown.sum()))
+            self._keys = self._keys.append(pd.Index(texts[unknown], dtype=object))
+        # Les valeurs manquantes (code -1) prennent le -1 final
+        return np.append(unique_codes[text_codes], -1)[codes]
+
+    def lookup(self, texts) -> np.ndarray:
+        """Code de textes déjà convertis (références découpées), -1 pour une clé inconnue"""
+        return self._keys.get_indexer(pd.Index(texts, dtype=object)).astype(np.int64)
+
+    def dense_index(self, codes: np.ndarray) -> np.ndarray:
+        """
+        Table code -> position de la première ligne portant ce code (-1 sinon).
+
+        Args:
+            codes: Codes des lignes (voir encode), -1 pour les lignes sans clé
+
+        Returns:
+            np.ndarray: Position par code, de la taille actuelle du dictionnaire
+        """
+        positions = np.full(len(self), -1, dtype=np.intp)
+        rows = np.flatnonzero(codes >= 0)
+        rows = rows[~pd.Series(codes[rows]).duplicated().to_numpy()]
+        positions[codes[rows]] = rows
+        return positions
+
+def dense_positions(table_size: int, codes: np.ndarray) -> np.ndarray:
+    """Codes utilisables dans une table dense de table_size codes : les autres deviennent -1"""
+    return np.where((codes >= 0) & (codes < table_size), codes, -1)
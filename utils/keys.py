@@ -0,0 +1,46 @@
+import numpy as np
+import pandas as pd
+
+# Au-delà, un flottant ne représente plus exactement tous les entiers
+_MAX_EXACT_INT = 2 ** 53
+
+def _integral_text(value):
+    """Texte d'une valeur clé, un flottant entier (1.0) étant écrit comme l'entier"""
+    if isinstance(value, (float, np.floating)) and value.is_integer() and abs(value) < _MAX_EXACT_INT:
+        return str(int(value))
+    return str(value)
+
+def _unique_key_text(uniques: pd.Series) -> pd.Series:
+    """Texte de valeurs distinctes non manquantes (voir key_text)"""
+    if pd.api.types.is_float_dtype(uniques):
+        text = uniques.astype(str)
+        integral = ((uniques % 1 == 0) & (uniques.abs() < _MAX_EXACT_INT)).to_numpy()
+        text[integral] = uniques[integral].astype("int64").astype(str)
+        return text
+    if uniques.dtype == object:
+        return uniques.map(_integral_text)
+    return uniques.astype(str)
+
+def key_text(values) -> pd.Series:
+    """
+    Convertit des valeurs clés en texte comparable d'un fichier à l'autre.
+
+    Une colonne d'entiers avec des cellules vides est lue comme flottante
+    (1.0) : les flottants entiers sont donc écrits comme l'entier ("1"),
+    pour que la même clé donne le même texte quel que soit le type de la
+    colonne. Seules les valeurs distinctes sont converties.
+
+    Args:
+        values: Valeurs clés (colonne, index ou tableau)
+
+    Returns:
+        pd.Series: Textes (objets str), alignés sur values s'il s'agit d'une
+        Series, NA pour les valeurs manquantes
+    """
+    index = values.index if isinstance(values, pd.Series) else None
+    codes, uniques = pd.factorize(values)
+    # Les catégories sont converties selon le type de leurs valeurs
+    uniques = pd.Series(np.asarray(uniques))
+    text = _unique_key_text(uniques).to_numpy(dtype=object)
+    # Les valeurs manquantes (code -1) prennent le None final
+    return pd.Series(np.append(text, None)[codes], index=index, dtype=object)
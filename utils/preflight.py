@@ -0,0 +1,254 @@
+import logging
+from typing import Dict, List
+import pandas as pd
+from .keys import key_text
+from .transforms import compile_transforms
+from .file_operations import (get_source_data, get_source_mapping, get_key_columns, get_ref_key_columns,
+                              get_reference_source_columns, hash_key_columns, format_key_labels,
+                              filter_model_rows, get_used_source_files, pin_source_files)
+
+logger = logging.getLogger(__name__)
+
+# Séparateur des références multiples dans une cellule (voir map_multi_references)
+MULTI_REFERENCE_SEPARATOR = ", "
+
+def count_reference_values(values: pd.Series) -> pd.Series:
+    """
+    Compte les valeurs référencées distinctes d'une colonne source.
+
+    Les cellules contenant plusieurs références (séparées par ", ") sont
+    découpées. Le travail est fait sur les valeurs distinctes et non ligne
+    par ligne, ce qui reste rapide sur des millions de lignes.
+
+    Args:
+        values: Colonne source contenant les références
+
+    Returns:
+        pd.Series: Nombre d'occurrences indexé par valeur référencée (texte)
+    """
+    counts = values.value_counts(dropna=True, sort=False)
+    counts = counts[counts > 0]
+    if counts.empty:
+        return pd.Series(dtype='int64')
+
+    values_str = pd.Index(key_text(counts.index))
+    is_multi = values_str.str.contains(MULTI_REFERENCE_SEPARATOR, regex=False)
+    parts = pd.DataFrame({'value': values_str, 'count': counts.to_numpy()})
+    if is_multi.any():
+        # Seules les cellules à références multiples sont découpées
+        split = parts[is_multi].assign(value=lambda df: df['value'].str.split(MULTI_REFERENCE_SEPARATOR))
+        parts = pd.concat([parts[~is_multi], split.explode('value')], ignore_index=True)
+    parts['value'] = parts['value'].str.strip()
+    return parts.groupby('value', sort=False)['count'].sum()
+
+def get_key_index(df: pd.DataFrame, key_cols: List[str]) -> pd.Index:
+    """
+    Construit l'ensemble des clés distinctes d'un modèle référencé.
+
+    Args:
+        df: DataFrame source du modèle référencé
+        key_cols: Colonnes clés (plusieurs pour une clé composite)
+
+    Returns:
+        pd.Index: Clés distinctes, converties en texte (voir key_text), ou empreintes de
+        ligne pour une clé composite
+    """
+    if len(key_cols) > 1:
+        return pd.Index(hash_key_columns(df, key_cols).dropna().unique())
+    return pd.Index(key_text(df[key_cols[0]]).dropna().unique())
+
+def check_reference_integrity(mappings: Dict, source_files: Dict, sample_size: int = 5) -> List[Dict]:
+    """
+    Analyse avant génération les références orphelines de chaque colonne is_ref.
+
+    Pour chaque référence, les valeurs distinctes de la colonne source sont
+    comparées (anti-jointure par hachage) à l'ensemble des clés du modèle
+    référencé.
+
+    Args:
+        mappings: Configuration des mappings
+        source_files: Fichiers sources chargés
+        sample_size: Nombre maximum d'exemples de valeurs orphelines
+
+    Returns:
+        List[Dict]: Un rapport par colonne référence avec :
+        - model, column, ref_model: la relation analysée
+        - ref_key_cols: Colonnes sources du modèle référencé utilisées comme clé (ref_key)
+        - distinct_values: Nombre de valeurs référencées distinctes
+        - orphan_values: Nombre de valeurs distinctes sans correspondance
+        - orphan_occurrences: Nombre d'occurrences de ces valeurs
+        - samples: Exemples de valeurs orphelines
+        - error: Message d'erreur si la relation n'a pas pu être analysée
+    """
+    reports = []
+    key_indexes = {}
+    source_files = _pin_sources(mappings, source_files)
+
+    for model, model_mappings in mappings.items():
+        for col, mapping in model_mappings.items():
+            if not isinstance(mapping, dict) or not mapping.get("is_ref"):
+                continue
+
+            ref_model = mapping.get("ref_model")
+            report = {
+                'model': model,
+                'column': col,
+                'ref_model': ref_model,
+                'ref_key_cols': None,
+                'distinct_values': 0,
+                'orphan_values': 0,
+                'orphan_occurrences': 0,
+                'samples': [],
+                'error': None
+            }
+            reports.append(report)
+
+            try:
+                key_cols = get_ref_key_columns(mappings, ref_model, mapping.get("ref_key"))
+                source_cols = get_reference_source_columns(mapping, key_cols)
+                report['ref_key_cols'] = key_cols
+                index_key = (ref_model, tuple(key_cols))
+                if index_key not in key_indexes:
+                    key_mapping = get_source_mapping(mappings[ref_model])
+                    key_df = _get_source_frame(source_files, key_mapping["source_file"], key_cols)
+                    # Les lignes écartées par les filtres du modèle référencé ne peuvent être référencées
+                    key_df = filter_model_rows(key_df, mappings[ref_model], ref_model, key_mapping["source_file"])
+                    key_indexes[index_key] = get_key_index(key_df, key_cols)
+
+                source_df = _get_source_frame(source_files, mapping["source_file"], source_cols)
+                if mapping["source_file"] == get_source_mapping(model_mappings)["source_file"]:
+                    source_df = filter_model_rows(source_df, model_mappings, model, mapping["source_file"])
+                if len(key_cols) == 1:
+                    values = source_df[source_cols[0]]
+                    if mapping.get("transforms"):
+                        values = compile_transforms(mapping["transforms"])(values)
+                    counts = count_reference_values(values)
+                else:
+                    # Clé composite : comparaison des empreintes de ligne
+                    hashes = hash_key_columns(source_df, source_cols)
+                    counts = hashes.value_counts(dropna=True, sort=False)
+                orphans = counts[~counts.index.isin(key_indexes[index_key])]
+
+                report['distinct_values'] = len(counts)
+                report['orphan_values'] = len(orphans)
+                report['orphan_occurrences'] = int(orphans.sum())
+                if len(key_cols) == 1:
+                    report['samples'] = orphans.index[:sample_size].tolist()
+                else:
+                    sample_rows = source_df[hashes.isin(orphans.index[:sample_size]).to_numpy()]
+                    report['samples'] = format_key_labels(sample_rows, source_cols).unique()[:sample_size].tolist()
+            except Exception as e:
+                report['error'] = str(e)
+
+            if report['error']:
+                logger.warning("Référence %s.%s non analysable: %s", model, col, report['error'])
+            elif report['orphan_values']:
+                logger.warning("Référence %s.%s -> %s: %d valeurs orphelines (%d occurrences), ex: %s",
+                               model, col, ref_model, report['orphan_values'],
+                               report['orphan_occurrences'], report['samples'])
+
+    return reports
+
+def _pin_sources(mappings: Dict, source_files: Dict) -> Dict:
+    """
+    Vue des fichiers sources utilisés, chacun relu une seule fois pour toute l'analyse
+    (voir pin_source_files) ; un fichier dont le chargement a échoué reste
+    tel quel et son erreur est signalée par l'analyse qui le lit.
+    """
+    pinned = dict(source_files)
+    for name in get_used_source_files(mappings):
+        try:
+            pinned.update(pin_source_files(source_files, [name]))
+        except ValueError:
+            pass
+    return pinned
+
+def _get_source_frame(source_files: Dict, source_file: str, columns: List[str]) -> pd.DataFrame:
+    """Retourne le DataFrame d'un fichier source après vérification des colonnes"""
+    if source_file not in source_files:
+        raise ValueError(f"Fichier source '{source_file}' non trouvé")
+    source_df = get_source_data(source_files, source_file)
+    for col in columns:
+        if col not in source_df.columns:
+            raise ValueError(f"Colonne source '{col}' non trouvée dans {source_file}")
+    return source_df
+
+def profile_key_column(values: pd.Series, sample_size: int = 5) -> Dict:
+    """
+    Profile la colonne clé d'un modèle : doublons, clés vides et quasi-doublons.
+
+    Les quasi-doublons sont des valeurs distinctes qui deviennent identiques
+    une fois les espaces supprimés et la casse ignorée ("SUP001 " / "sup001").
+    Tous les calculs sont faits sur les valeurs distinctes, sans boucle par ligne.
+
+    Args:
+        values: Colonne clé du modèle
+        sample_size: Nombre maximum d'exemples par catégorie
+
+    Returns:
+        Dict contenant:
+        - total_rows: Nombre de lignes
+        - null_keys: Nombre de lignes sans clé
+        - distinct_keys: Nombre de clés distinctes
+        - duplicate_keys: Nombre de clés présentes sur plusieurs lignes
+        - duplicate_rows: Nombre de lignes en trop (qui recevraient un ID déjà attribué)
+        - duplicate_samples: Exemples de clés dupliquées avec leur nombre de lignes
+        - near_duplicate_groups: Nombre de groupes de quasi-doublons
+        - near_duplicate_samples: Exemples de groupes de quasi-doublons
+    """
+    counts = values.value_counts(dropna=True, sort=False)
+    counts = counts[counts > 0]
+    duplicates = counts[counts > 1].sort_values(ascending=False)
+
+    normalized = pd.Series(counts.index.astype(str), index=counts.index).str.strip().str.casefold()
+    group_sizes = normalized.map(normalized.value_counts())
+    near_duplicates = normalized[group_sizes > 1]
+    near_keys = pd.unique(near_duplicates.to_numpy())
+    near_samples = [near_duplicates.index[near_duplicates.to_numpy() == key].astype(str).tolist()
+                    for key in near_keys[:sample_size]]
+
+    return {
+        'total_rows': len(values),
+        'null_keys': int(values.isna().sum()),
+        'distinct_keys': len(counts),
+        'duplicate_keys': len(duplicates),
+        'duplicate_rows': int((duplicates - 1).sum()),
+        'duplicate_samples': list(zip(duplicates.index[:sample_size].tolist(),
+                                      duplicates.iloc[:sample_size].astype(int).tolist())),
+        'near_duplicate_groups': len(near_keys),
+        'near_duplicate_samples': near_samples
+    }
+
+def profile_model_keys(mappings: Dict, source_files: Dict, sample_size: int = 5) -> Dict[str, Dict]:
+    """
+    Profile la clé de chaque modèle, simple ou composite (voir profile_key_column).
+
+    Args:
+        mappings: Configuration des mappings
+        source_files: Fichiers sources chargés
+        sample_size: Nombre maximum d'exemples par catégorie
+
+    Returns:
+        Dict[str, Dict]: Profil par modèle, avec source_file, key_cols et
+        error si la clé n'a pas pu être analysée
+    """
+    profiles = {}
+    source_files = _pin_sources(mappings, source_files)
+    for model, model_mappings in mappings.items():
+        key_mapping = get_source_mapping(model_mappings)
+        if key_mapping is None:
+            continue
+        key_cols = get_key_columns(model_mappings)
+        try:
+            source_df = _get_source_frame(source_files, key_mapping["source_file"], key_cols)
+            source_df = filter_model_rows(source_df, model_mappings, model, key_mapping["source_file"])
+            # Les clés composites sont profilées sur leur libellé "a | b"
+            values = source_df[key_cols[0]] if len(key_cols) == 1 else format_key_labels(source_df, key_cols)
+            profile = profile_key_column(values, sample_size)
+            profile['error'] = None
+        except Exception as e:
+            profile = {'error': str(e)}
+        profile['source_file'] = key_mapping["source_file"]
+        profile['key_cols'] = key_cols
+        profiles[model] = profile
+    return profiles
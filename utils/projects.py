@@ -0,0 +1,19 @@
+import re
+from pathlib import Path
+
+def project_directory(root: str, project: str) -> Path:
+    """
+    Dossier d'un projet sous un répertoire de données persistantes.
+
+    Les instantanés, les points de contrôle et l'état des générations delta
+    sont rangés par projet : deux sessions ne voient les données l'une de
+    l'autre que si elles utilisent le même nom de projet.
+
+    Args:
+        root: Répertoire des données (instantanés, points de contrôle...)
+        project: Nom du projet saisi par l'utilisateur
+
+    Returns:
+        Path: Dossier du projet, nommé d'après le projet sans caractères spéciaux
+    """
+    return Path(root) / (re.sub(r"[^\w-]+", "_", project).strip("_") or "projet")
@@ -0,0 +1,161 @@
+"""Table de correspondance des UUID générés, en base SQLite indexée.
+
+Usage: python -m utils.reference_store references_uuid.sqlite (--value VALEUR [--model MODELE] | --uuid UUID | --files)
+"""
+import argparse
+import logging
+import sqlite3
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, List, Optional
+import pandas as pd
+from .uuids import format_uuids
+
+logger = logging.getLogger(__name__)
+
+# Nom de la base dans le dossier references/ de l'archive
+REFERENCE_STORE_NAME = "references_uuid.sqlite"
+
+_SCHEMA = """
+CREATE TABLE uuids (model TEXT NOT NULL, original_value TEXT, uuid TEXT NOT NULL);
+CREATE TABLE files (model TEXT NOT NULL, format TEXT NOT NULL, file TEXT NOT NULL, part INTEGER, rows INTEGER);
+CREATE TABLE stats (model TEXT PRIMARY KEY, total_values INTEGER, unique_values INTEGER,
+                    mapped_values INTEGER, na_values INTEGER);
+"""
+
+# Créés après l'insertion, en une passe triée plutôt que ligne par ligne
+_INDEXES = """
+CREATE INDEX uuids_by_value ON uuids (original_value, model);
+CREATE INDEX uuids_by_uuid ON uuids (uuid);
+"""
+
+def write_reference_store(path: Path, uuid_mappings: Dict[str, pd.Series], key_labels: Dict[str, pd.Series],
+                          output_files: List[Dict], mapping_stats: Dict[str, Dict]) -> int:
+    """
+    Écrit la table de correspondance valeur originale / UUID de chaque modèle.
+
+    Args:
+        path: Chemin de la base (remplacée si elle existe)
+        uuid_mappings: Table UUID de chaque modèle (UUID binaires indexés par valeur clé, voir utils.uuids)
+        key_labels: Libellés des clés composites, par modèle
+        output_files: Fichiers générés (voir write_model_output)
+        mapping_stats: Statistiques de mapping de chaque modèle
+
+    Returns:
+        int: Nombre de correspondances écrites
+    """
+    path = Path(path)
+    if path.exists():
+        path.unlink()
+    rows = 0
+    connection = sqlite3.connect(path)
+    try:
+        # Base construite en une fois : ni journal ni synchronisation
+        connection.execute("PRAGMA journal_mode = OFF")
+        connection.execute("PRAGMA synchronous = OFF")
+        connection.executescript(_SCHEMA)
+        for model_name, uuid_map in uuid_mappings.items():
+            if not len(uuid_map):
+                logger.warning(f"Mapping vide pour le modèle {model_name}")
+                continue
+            originals = pd.Series(uuid_map.index)
+            if model_name in key_labels:
+                originals = originals.map(key_labels[model_name])
+            # Les UUID sont écrits en texte, interrogeables depuis tout client SQLite
+            connection.executemany(
+                "INSERT INTO uuids VALUES (?, ?, ?)",
+                zip(repeat(model_name), originals.astype(str).tolist(), format_uuids(uuid_map.array).tolist())
+            )
+            rows += len(uuid_map)
+        connection.executemany(
+            "INSERT INTO files VALUES (?, ?, ?, ?, ?)",
+            [(f['model'], f['format'], f"fichiers_kimaiko/{f['file']}", f['part'], f['rows']) for f in output_files]
+        )
+        connection.executemany(
+            "INSERT INTO stats VALUES (?, ?, ?, ?, ?)",
+            [(model_name, stats.get('total_values'), stats.get('unique_values'), stats.get('mapped_values'), stats.get('na_values'))
+             for model_name, stats in mapping_stats.items()]
+        )
+        connection.executescript(_INDEXES)
+        connection.commit()
+    finally:
+        connection.close()
+    logger.info(f"Table de correspondance écrite: {path} ({rows} UUID)")
+    return rows
+
+def _connect(path: Path) -> sqlite3.Connection:
+    """Ouvre la base en lecture seule"""
+    if not Path(path).exists():
+        raise FileNotFoundError(f"Table de correspondance introuvable: {path}")
+    connection = sqlite3.connect(f"{Path(path).resolve().as_uri()}?mode=ro", uri=True)
+    connection.row_factory = sqlite3.Row
+    return connection
+
+def lookup_references(path: Path, value: Optional[str] = None, uuid: Optional[str] = None,
+                      model: Optional[str] = None, limit: int = 100) -> List[Dict]:
+    """
+    Recherche des correspondances par valeur originale ou par UUID.
+
+    Args:
+        path: Chemin de la base
+        value: Valeur originale de la clé (libellé "a | b" pour une clé composite)
+        uuid: UUID généré
+        model: Restreint la recherche à un modèle
+        limit: Nombre maximum de résultats
+
+    Returns:
+        List[Dict]: Correspondances (model, original_value, uuid)
+    """
+    if (value is None) == (uuid is None):
+        raise ValueError("Indiquez une valeur originale ou un UUID")
+    query = "SELECT model, original_value, uuid FROM uuids WHERE "
+    params = []
+    if value is not None:
+        query += "original_value = ?"
+        params.append(str(value))
+    else:
+        query += "uuid = ?"
+        params.append(uuid)
+    if model is not None:
+        query += " AND model = ?"
+        params.append(model)
+    query += " LIMIT ?"
+    params.append(limit)
+
+    connection = _connect(path)
+    try:
+        return [dict(row) for row in connection.execute(query, params)]
+    finally:
+        connection.close()
+
+def list_output_files(path: Path) -> List[Dict]:
+    """Fichiers générés et leurs parties, avec leur nombre de lignes"""
+    connection = _connect(path)
+    try:
+        return [dict(row) for row in connection.execute("SELECT * FROM files ORDER BY rowid")]
+    finally:
+        connection.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("database", type=Path, help=f"Base {REFERENCE_STORE_NAME} (dossier references/ de l'archive)")
+    query = parser.add_mutually_exclusive_group(required=True)
+    query.add_argument("--value", help="Valeur originale de la clé")
+    query.add_argument("--uuid", help="UUID généré")
+    query.add_argument("--files", action="store_true", help="Lister les fichiers générés")
+    parser.add_argument("--model", help="Modèle Kimaiko (avec --value ou --uuid)")
+    parser.add_argument("--limit", type=int, default=100)
+    args = parser.parse_args()
+
+    if args.files:
+        for f in list_output_files(args.database):
+            print(f"{f['model']}\t{f['file']}\t{f['rows']}")
+        return
+    matches = lookup_references(args.database, value=args.value, uuid=args.uuid, model=args.model, limit=args.limit)
+    if not matches:
+        print("Aucune correspondance")
+    for match in matches:
+        print(f"{match['model']}\t{match['original_value']}\t{match['uuid']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+from typing import Dict, List, Set
+
+def strongly_connected_components(dependencies: Dict[str, Set[str]]) -> List[List[str]]:
+    """
+    Décompose le graphe des dépendances en composantes fortement connexes (Tarjan).
+
+    Parcours itératif en O(V + E). Une composante n'est émise qu'après toutes
+    celles dont elle dépend : l'ordre d'émission est un ordre de traitement.
+    Les dépendances vers des modèles absents du graphe sont ignorées.
+
+    Args:
+        dependencies: Modèles dont dépend chaque modèle (modèles référencés)
+
+    Returns:
+        List[List[str]]: Composantes, modèles référencés d'abord
+    """
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    components = []
+
+    for root in sorted(dependencies):
+        if root in index:
+            continue
+        # Pile de parcours : (modèle, itérateur sur ses dépendances restantes)
+        work = [(root, iter(sorted(dependencies[root])))]
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            model, successors = work[-1]
+            for successor in successors:
+                if successor not in dependencies:
+                    continue
+                if successor not in index:
+                    index[successor] = lowlink[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(sorted(dependencies[successor]))))
+                    break
+                if successor in on_stack:
+                    lowlink[model] = min(lowlink[model], index[successor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[model])
+                if lowlink[model] == index[model]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == model:
+                            break
+                    components.append(sorted(component))
+    return components
+
+def schedule_models(dependencies: Dict[str, Set[str]]) -> Dict:
+    """
+    Planifie le traitement des modèles, cycles et auto-références compris.
+
+    Les modèles d'une même composante fortement connexe (employé -> manager,
+    fournisseur <-> maison mère) se référencent mutuellement : toutes leurs
+    clés sont générées avant la résolution de leurs références, ce que
+    permet la génération des UUID en une passe séparée.
+
+    Chaque composante est placée au niveau qui suit celui de ses
+    dépendances ; les modèles d'un même niveau ne dépendent que des niveaux
+    précédents (ou d'eux-mêmes au sein d'une composante). L'ordre de
+    traitement parcourt les niveaux, par ordre alphabétique dans un niveau.
+
+    Args:
+        dependencies: Modèles dont dépend chaque modèle (modèles référencés)
+
+    Returns:
+        Dict contenant:
+        - processing_order: Liste ordonnée des modèles
+        - components: Composantes fortement connexes, dans l'ordre de traitement
+        - cycles: Composantes qui se référencent elles-mêmes (cycle ou auto-référence)
+        - levels: Modèles de chaque niveau
+        - widths: Nombre de modèles traitables en parallèle à chaque niveau
+    """
+    components = strongly_connected_components(dependencies)
+    component_of = {model: i for i, component in enumerate(components) for model in component}
+
+    levels = []
+    component_levels = []
+    cycles = []
+    for i, component in enumerate(components):
+        external = {component_of[dep] for model in component for dep in dependencies[model]
+                    if dep in component_of and component_of[dep] != i}
+        level = max((component_levels[c] + 1 for c in external), default=0)
+        component_levels.append(level)
+        if level == len(levels):
+            levels.append([])
+        levels[level].extend(component)
+        if len(component) > 1 or component[0] in dependencies[component[0]]:
+            cycles.append(component)
+
+    levels = [sorted(level) for level in levels]
+    return {
+        'processing_order': [model for level in levels for model in level],
+        'components': components,
+        'cycles': cycles,
+        'levels': levels,
+        'widths': [len(level) for level in levels]
+    }
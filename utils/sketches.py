@@ -0,0 +1,87 @@
+from typing import Dict
+import numpy as np
+import pandas as pd
+from .keys import key_text
+
+# Nombre d'empreintes conservées par colonne (esquisse "bottom-k" / KMV)
+SKETCH_SIZE = 256
+
+_HASH_SPACE = float(2 ** 64)
+
+def normalize_values(values: pd.Series) -> pd.Series:
+    """
+    Normalise les valeurs distinctes d'une colonne pour la comparaison.
+
+    Les valeurs sont converties en texte comme à la génération (voir
+    key_text : 1.0 devient "1"), sans espaces autour comme les références.
+    """
+    return pd.Series(key_text(values).dropna().unique()).str.strip().drop_duplicates(ignore_index=True)
+
+def sketch_values(values: pd.Series, size: int = SKETCH_SIZE) -> Dict:
+    """
+    Calcule l'esquisse KMV (k plus petites empreintes) d'une colonne.
+
+    L'esquisse tient en quelques kilo-octets quelle que soit la taille de la
+    colonne et permet d'estimer le recouvrement entre deux colonnes sans
+    comparer les ensembles complets.
+
+    Args:
+        values: Colonne à esquisser
+        size: Nombre d'empreintes conservées
+
+    Returns:
+        Dict contenant:
+        - hashes: Les plus petites empreintes 64 bits, triées
+        - distinct: Nombre de valeurs distinctes
+        - size: Taille de l'esquisse
+    """
+    normalized = normalize_values(values)
+    # Les valeurs sont déjà distinctes : pas de factorisation avant hachage
+    hashes = pd.util.hash_array(normalized.to_numpy(dtype=object), categorize=False)
+    distinct = len(hashes)
+    if distinct > 2 * size:
+        # Sélection partielle des plus petites empreintes, sans trier toute la colonne
+        hashes = np.partition(hashes, 2 * size)[:2 * size]
+    hashes = np.unique(hashes)[:size]
+    return {
+        'hashes': hashes,
+        'distinct': distinct,
+        'size': size
+    }
+
+def sketch_frame(df: pd.DataFrame, size: int = SKETCH_SIZE) -> Dict:
+    """Esquisse chaque colonne d'un DataFrame (voir sketch_values)"""
+    return {col: sketch_values(df[col], size) for col in df.columns}
+
+def _estimate_distinct(hashes: np.ndarray) -> float:
+    """Estimateur KMV du nombre de valeurs distinctes : (k - 1) / (k-ième empreinte normalisée)"""
+    return (len(hashes) - 1) / (float(hashes[-1]) / _HASH_SPACE)
+
+def _is_complete(sketch: Dict) -> bool:
+    return sketch['distinct'] <= sketch['size']
+
+def estimate_containment(sketch: Dict, other: Dict) -> float:
+    """
+    Estime la part des valeurs distinctes de sketch présentes dans other.
+
+    L'intersection est estimée sur l'esquisse de l'union (k plus petites
+    empreintes des deux esquisses) ; elle est exacte quand les deux
+    colonnes ont moins de valeurs distinctes que la taille de l'esquisse.
+
+    Args:
+        sketch: Esquisse de la colonne candidate (ex: colonne référence)
+        other: Esquisse de la colonne contenante (ex: clé du modèle référencé)
+
+    Returns:
+        float: Containment estimé entre 0 et 1
+    """
+    if not len(sketch['hashes']) or not len(other['hashes']):
+        return 0.0
+    if _is_complete(sketch) and _is_complete(other):
+        return len(np.intersect1d(sketch['hashes'], other['hashes'], assume_unique=True)) / len(sketch['hashes'])
+
+    size = min(sketch['size'], other['size'])
+    union = np.union1d(sketch['hashes'], other['hashes'])[:size]
+    in_both = np.isin(union, sketch['hashes'], assume_unique=True) & np.isin(union, other['hashes'], assume_unique=True)
+    intersection = in_both.sum() / len(union) * _estimate_distinct(union)
+    return float(min(intersection / sketch['distinct'], 1.0))
@@ -0,0 +1,188 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import pandas as pd
+from .file_operations import PREVIEW_ROWS, get_source_data
+from .sketches import sketch_frame
+
+logger = logging.getLogger(__name__)
+
+# Répertoire des instantanés, un dossier par projet (voir project_directory)
+SNAPSHOT_DIR = "snapshots"
+
+# Compression des fichiers Parquet
+SNAPSHOT_COMPRESSION = "zstd"
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Calcule l'empreinte du contenu d'un DataFrame.
+
+    Les valeurs sont hachées ligne par ligne de façon vectorisée
+    (pd.util.hash_pandas_object), puis combinées avec les noms et types
+    des colonnes.
+
+    Args:
+        df: Données à identifier
+
+    Returns:
+        str: Empreinte SHA-256 hexadécimale
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def write_snapshot(df: pd.DataFrame, snapshot_dir: str = SNAPSHOT_DIR) -> str:
+    """
+    Écrit un DataFrame en fichier Parquet compressé, dédupliqué par contenu.
+
+    Un contenu déjà présent n'est pas réécrit. Les noms de colonnes sont
+    convertis en texte, comme l'exige le format Parquet.
+
+    Args:
+        df: Données à sauvegarder
+        snapshot_dir: Répertoire des instantanés
+
+    Returns:
+        str: Empreinte du contenu, nom du fichier dans snapshot_dir/objects
+    """
+    df = df.rename(columns=str)
+    fingerprint = frame_fingerprint(df)
+    objects_dir = Path(snapshot_dir) / "objects"
+    objects_dir.mkdir(parents=True, exist_ok=True)
+    object_path = objects_dir / f"{fingerprint}.parquet"
+
+    if object_path.exists():
+        logger.info(f"Instantané {fingerprint[:12]} déjà présent, écriture ignorée")
+        return fingerprint
+
+    # Écriture dans un fichier temporaire puis renommage atomique
+    tmp_path = object_path.with_suffix(f".{os.getpid()}.tmp")
+    df.to_parquet(tmp_path, compression=SNAPSHOT_COMPRESSION, index=False)
+    os.replace(tmp_path, object_path)
+    logger.info(f"Instantané {fingerprint[:12]} écrit ({len(df)} lignes)")
+    return fingerprint
+
+def read_snapshot(fingerprint: str, snapshot_dir: str = SNAPSHOT_DIR, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Relit un instantané écrit par write_snapshot.
+
+    Args:
+        fingerprint: Empreinte du contenu
+        snapshot_dir: Répertoire des instantanés
+        columns: Colonnes à lire (toutes par défaut)
+
+    Returns:
+        pd.DataFrame: Données, avec leurs types d'origine
+    """
+    return pd.read_parquet(Path(snapshot_dir) / "objects" / f"{fingerprint}.parquet", columns=columns)
+
+def snapshot_entry(df: pd.DataFrame, snapshot_dir: str = SNAPSHOT_DIR) -> Dict:
+    """Écrit un DataFrame (voir write_snapshot) et retourne son entrée de manifeste"""
+    return {
+        "fingerprint": write_snapshot(df, snapshot_dir),
+        "columns": [str(c) for c in df.columns],
+        "row_count": len(df)
+    }
+
+def write_manifest(kind: str, entries: Dict, snapshot_dir: str = SNAPSHOT_DIR, label: Optional[str] = None) -> str:
+    """Écrit le manifeste d'un instantané et retourne son chemin"""
+    manifests_dir = Path(snapshot_dir) / "manifests"
+    manifests_dir.mkdir(parents=True, exist_ok=True)
+    created_at = datetime.now()
+    manifest_path = manifests_dir / f"{created_at.strftime('%Y%m%d_%H%M%S_%f')}_{kind}.json"
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "kind": kind,
+            "label": label,
+            "created_at": created_at.isoformat(timespec="seconds"),
+            "files": entries
+        }, f, ensure_ascii=False)
+    return str(manifest_path)
+
+def snapshot_frames(frames: Dict[str, pd.DataFrame], kind: str, snapshot_dir: str = SNAPSHOT_DIR,
+                    label: Optional[str] = None) -> str:
+    """
+    Crée un instantané d'un ensemble de DataFrames (sources ou modèles générés).
+
+    Args:
+        frames: DataFrames par nom
+        kind: Type d'instantané ("sources" ou "outputs")
+        snapshot_dir: Répertoire des instantanés
+        label: Libellé optionnel
+
+    Returns:
+        str: Chemin du manifeste de l'instantané
+    """
+    entries = {name: snapshot_entry(df, snapshot_dir) for name, df in frames.items()}
+    return write_manifest(kind, entries, snapshot_dir, label)
+
+def snapshot_source_files(source_files: Dict, snapshot_dir: str = SNAPSHOT_DIR, label: Optional[str] = None) -> str:
+    """
+    Crée un instantané des fichiers sources chargés.
+
+    Args:
+        source_files: Fichiers sources (st.session_state.source_files)
+        snapshot_dir: Répertoire des instantanés
+        label: Libellé optionnel
+
+    Returns:
+        str: Chemin du manifeste (voir restore_source_files)
+    """
+    frames = {name: get_source_data(source_files, name) for name in source_files}
+    return snapshot_frames(frames, "sources", snapshot_dir, label)
+
+def list_snapshots(snapshot_dir: str = SNAPSHOT_DIR, kind: Optional[str] = None) -> List[Dict]:
+    """
+    Liste les instantanés disponibles, du plus récent au plus ancien.
+
+    Args:
+        snapshot_dir: Répertoire des instantanés
+        kind: Filtre sur le type d'instantané
+
+    Returns:
+        List[Dict]: Manifestes, avec leur chemin dans "path"
+    """
+    manifests_dir = Path(snapshot_dir) / "manifests"
+    if not manifests_dir.exists():
+        return []
+    snapshots = []
+    for manifest_path in sorted(manifests_dir.glob("*.json"), reverse=True):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if kind is None or manifest.get("kind") == kind:
+            manifest["path"] = str(manifest_path)
+            snapshots.append(manifest)
+    return snapshots
+
+def restore_source_files(manifest_path: str, snapshot_dir: Optional[str] = None) -> Dict:
+    """
+    Recharge les fichiers sources d'un instantané, sans relire les fichiers Excel.
+
+    Args:
+        manifest_path: Chemin du manifeste (voir snapshot_source_files)
+        snapshot_dir: Répertoire des instantanés (par défaut, celui du manifeste)
+
+    Returns:
+        Dict: Fichiers sources au format de st.session_state.source_files
+    """
+    snapshot_dir = snapshot_dir or str(Path(manifest_path).parent.parent)
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    source_files = {}
+    for name, entry in manifest["files"].items():
+        df = read_snapshot(entry["fingerprint"], snapshot_dir)
+        source_files[name] = {
+            'columns': df.columns.tolist(),
+            'data': df,
+            'preview': df.head(PREVIEW_ROWS),
+            'row_count': len(df),
+            'row_count_exact': True,
+            'sketches': sketch_frame(df)
+        }
+    return source_files
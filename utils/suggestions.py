@@ -0,0 +1,206 @@
+import difflib
+import logging
+import unicodedata
+from typing import Dict, List
+from .sketches import sketch_frame, estimate_containment
+from .file_operations import get_source_data, resolve_source, get_source_mapping, get_key_columns
+
+logger = logging.getLogger(__name__)
+
+# Similarité minimale des noms de colonnes (difflib, entre 0 et 1)
+NAME_CUTOFF = 0.6
+
+# Part minimale des valeurs d'une colonne présentes dans une clé pour suggérer une référence
+REFERENCE_CONTAINMENT = 0.9
+
+# Une colonne est une clé alternative si presque toutes ses valeurs sont distinctes
+UNIQUE_RATIO = 0.95
+
+def normalize_name(name) -> str:
+    """Normalise un nom de colonne : sans accents, sans casse, lettres et chiffres uniquement"""
+    text = unicodedata.normalize("NFKD", str(name))
+    return "".join(c for c in text if c.isalnum()).casefold()
+
+def name_similarity(target: str, candidate: str) -> float:
+    """Similarité de deux noms normalisés ; un nom contenu dans l'autre ("email" / "contactemail") compte comme proche"""
+    score = difflib.SequenceMatcher(None, target, candidate).ratio()
+    if target and candidate and (target in candidate or candidate in target):
+        score = max(score, 0.8)
+    return score
+
+def get_column_sketch(source_files: Dict, name: str, col) -> Dict:
+    """
+    Retourne l'esquisse d'une colonne source.
+
+    Les esquisses sont calculées au chargement des fichiers ; elles ne sont
+    recalculées ici que pour les fichiers chargés autrement.
+    """
+    info = resolve_source(source_files, name)
+    if info.get('sketches') is None:
+        info['sketches'] = sketch_frame(get_source_data(source_files, name))
+    return info['sketches'][col]
+
+def suggest_mappings(templates: Dict, source_files: Dict, cutoff: float = NAME_CUTOFF, limit: int = 3) -> Dict[str, Dict]:
+    """
+    Suggère les colonnes sources de chaque colonne de modèle, par similarité de nom.
+
+    Les noms sources sont regroupés par forme normalisée, puis chaque colonne
+    de modèle est rapprochée des plus proches (difflib). Les colonnes du
+    fichier qui correspond au plus grand nombre de colonnes du modèle passent
+    en premier.
+
+    Args:
+        templates: Colonnes de chaque modèle Kimaiko
+        source_files: Fichiers sources chargés
+        cutoff: Similarité minimale
+        limit: Nombre maximum de noms rapprochés par colonne
+
+    Returns:
+        Dict[str, Dict]: Par modèle et par colonne, liste de suggestions
+        (source_file, source_col, score) de la meilleure à la moins bonne
+    """
+    candidates = {}
+    for name, info in source_files.items():
+        for col in info['columns']:
+            candidates.setdefault(normalize_name(col), []).append((name, col))
+    names = list(candidates)
+
+    suggestions = {}
+    for model, columns in templates.items():
+        matches = {}
+        for col in columns:
+            if col == "ID":
+                continue
+            target = normalize_name(col)
+            close = difflib.get_close_matches(target, names, n=limit, cutoff=cutoff)
+            close += [name for name in names if target and (target in name or name in target) and name not in close]
+            matches[col] = [
+                (name_similarity(target, match), name, source_col)
+                for match in close
+                for name, source_col in candidates[match]
+            ]
+
+        # Fichier dominant du modèle : celui qui apparaît dans le plus de correspondances
+        votes = {}
+        for col_matches in matches.values():
+            for name in {name for _, name, _ in col_matches}:
+                votes[name] = votes.get(name, 0) + 1
+        dominant = max(votes, key=votes.get) if votes else None
+
+        suggestions[model] = {
+            col: [{'source_file': name, 'source_col': source_col, 'score': round(score, 2)}
+                  for score, name, source_col in sorted(col_matches, key=lambda m: (m[1] != dominant, -m[0], -votes[m[1]]))]
+            for col, col_matches in matches.items() if col_matches
+        }
+    return suggestions
+
+def _mapped_columns(mappings: Dict):
+    """Colonnes mappées et non encore références : (modèle, colonne, mapping)"""
+    for model, model_mappings in mappings.items():
+        for col, mapping in model_mappings.items():
+            if col != "ID" and isinstance(mapping, dict) and "source_file" in mapping and not mapping.get("is_ref"):
+                yield model, col, mapping
+
+def _match_keys(mappings: Dict, source_files: Dict, keys: List[Dict], min_containment: float) -> Dict:
+    """Meilleure clé de chaque colonne mappée, parmi celles des autres modèles"""
+    matches = {}
+    for model, col, mapping in _mapped_columns(mappings):
+        try:
+            sketch = get_column_sketch(source_files, mapping["source_file"], mapping["source_col"])
+        except (KeyError, ValueError) as e:
+            logger.warning("Colonne %s.%s non esquissable: %s", model, col, str(e))
+            continue
+        if sketch['distinct'] < 2:
+            continue
+
+        best, best_containment = None, min_containment
+        for key in keys:
+            if key['ref_model'] == model or (key['source_file'], key['source_col']) == (mapping["source_file"], mapping["source_col"]):
+                continue
+            containment = estimate_containment(sketch, key['sketch'])
+            if containment >= best_containment and (best is None or containment > best_containment):
+                best, best_containment = key, containment
+        if best is not None:
+            matches[(model, col)] = {'model': model, 'column': col, 'ref_model': best['ref_model'], 'ref_key': best['ref_key'],
+                                     'containment': round(best_containment, 3), 'distinct_values': sketch['distinct']}
+    return matches
+
+def suggest_references(mappings: Dict, source_files: Dict, min_containment: float = REFERENCE_CONTAINMENT) -> List[Dict]:
+    """
+    Détecte les colonnes mappées qui sont probablement des références.
+
+    Les valeurs d'une colonne sont comparées, via leurs esquisses, aux clés
+    des autres modèles : une colonne dont presque toutes les valeurs
+    distinctes figurent dans une clé est une référence probable. Chaque
+    comparaison porte sur deux esquisses de taille fixe, jamais sur les
+    ensembles complets.
+
+    Les clés des modèles sont essayées d'abord. Les colonnes restantes sont
+    ensuite comparées aux clés alternatives (ref_key) : colonnes mappées aux
+    valeurs uniques qui ne sont pas elles-mêmes des références.
+
+    Args:
+        mappings: Configuration des mappings
+        source_files: Fichiers sources chargés
+        min_containment: Part minimale des valeurs présentes dans la clé
+
+    Returns:
+        List[Dict]: Suggestions (model, column, ref_model, ref_key,
+        containment, distinct_values), de la plus sûre à la moins sûre
+    """
+    model_keys = []
+    for model, model_mappings in mappings.items():
+        key_mapping = get_source_mapping(model_mappings)
+        key_cols = get_key_columns(model_mappings) if key_mapping else []
+        if len(key_cols) == 1:
+            model_keys.append({'ref_model': model, 'ref_key': None,
+                               'source_file': key_mapping["source_file"], 'source_col': key_cols[0],
+                               'sketch': get_column_sketch(source_files, key_mapping["source_file"], key_cols[0])})
+    matches = _match_keys(mappings, source_files, model_keys, min_containment)
+
+    alternative_keys = []
+    model_key_columns = {(key['source_file'], key['source_col']) for key in model_keys}
+    for model, col, mapping in _mapped_columns(mappings):
+        if (model, col) in matches or (mapping["source_file"], mapping["source_col"]) in model_key_columns:
+            continue
+        sketch = get_column_sketch(source_files, mapping["source_file"], mapping["source_col"])
+        row_count = source_files[mapping["source_file"]].get('row_count')
+        if row_count and sketch['distinct'] >= UNIQUE_RATIO * row_count:
+            alternative_keys.append({'ref_model': model, 'ref_key': col, 'source_file': mapping["source_file"],
+                                     'source_col': mapping["source_col"], 'sketch': sketch})
+    unmatched = {model: {col: m for col, m in model_mappings.items() if (model, col) not in matches}
+                 for model, model_mappings in mappings.items()}
+    matches.update(_match_keys(unmatched, source_files, alternative_keys, min_containment))
+
+    return sorted(matches.values(), key=lambda s: -s['containment'])
+
+def apply_mapping_suggestions(mappings: Dict, templates: Dict, suggestions: Dict[str, Dict]) -> int:
+    """
+    Mappe les colonnes encore non mappées sur leur meilleure suggestion.
+
+    Les mappings sont reconstruits dans l'ordre des colonnes du modèle, la
+    première colonne mappée restant la clé du modèle.
+
+    Returns:
+        int: Nombre de colonnes mappées
+    """
+    applied = 0
+    for model, model_suggestions in suggestions.items():
+        model_mappings = mappings.setdefault(model, {"ID": {"type": "uuid"}})
+        for col, col_suggestions in model_suggestions.items():
+            if col_suggestions and "source_file" not in (model_mappings.get(col) or {}):
+                best = col_suggestions[0]
+                model_mappings[col] = {"source_file": best['source_file'], "source_col": best['source_col'], "is_ref": False}
+                applied += 1
+        ordered = {col: model_mappings[col] for col in ["ID"] + list(templates[model]) if col in model_mappings}
+        model_mappings.clear()
+        model_mappings.update(ordered)
+    return applied
+
+def apply_reference_suggestions(mappings: Dict, suggestions: List[Dict]) -> int:
+    """Marque comme références les colonnes suggérées par suggest_references"""
+    for suggestion in suggestions:
+        mappings[suggestion['model']][suggestion['column']].update(
+            is_ref=True, ref_model=suggestion['ref_model'], ref_key=suggestion['ref_key']
+        )
+    return len(suggestions)
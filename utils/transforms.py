@@ -0,0 +1,143 @@
+import re
+from typing import Callable, Dict, List
+import numpy as np
+import pandas as pd
+
+# Séparateurs décimaux et de milliers par locale pour la transformation "number"
+NUMBER_LOCALES = {
+    "fr": {"decimal": ",", "thousands": [" ", "\u00a0", "\u202f", "."]},
+    "en": {"decimal": ".", "thousands": [",", " "]},
+    "de": {"decimal": ",", "thousands": [".", " "]},
+    "ch": {"decimal": ".", "thousands": ["'", "\u2019", " "]}
+}
+
+# Constructeurs de transformations : spécification -> opération sur une colonne entière
+TRANSFORMS: Dict[str, Callable[[Dict], Callable[[pd.Series], pd.Series]]] = {}
+
+def register_transform(name: str):
+    """Enregistre un constructeur de transformation sous le nom utilisé dans "op" """
+    def decorator(builder):
+        TRANSFORMS[name] = builder
+        return builder
+    return decorator
+
+def _as_text(values: pd.Series) -> pd.Series:
+    """Convertit une colonne en texte en conservant les valeurs manquantes"""
+    return values.astype("string")
+
+def _on_distinct(values: pd.Series, operation: Callable[[pd.Series], pd.Series]) -> pd.Series:
+    """
+    Applique une opération coûteuse une seule fois par valeur distincte.
+
+    Les colonnes de dates, montants ou téléphones contiennent beaucoup de
+    répétitions : l'opération porte sur les valeurs uniques, puis le résultat
+    est redistribué par indexation entière.
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    result = operation(pd.Series(uniques))
+    taken = result.take(np.where(codes < 0, 0, codes)) if len(result) else result.reindex(range(len(codes)))
+    taken = pd.Series(taken.to_numpy(), index=values.index, dtype=result.dtype)
+    return taken.mask(codes < 0)
+
+@register_transform("trim")
+def _trim(spec: Dict) -> Callable[[pd.Series], pd.Series]:
+    return lambda values: _as_text(values).str.strip()
+
+@register_transform("upper")
+def _upper(spec: Dict) -> Callable[[pd.Series], pd.Series]:
+    return lambda values: _as_text(values).str.upper()
+
+@register_transform("lower")
+def _lower(spec: Dict) -> Callable[[pd.Series], pd.Series]:
+    return lambda values: _as_text(values).str.lower()
+
+@register_transform("regex_replace")
+def _regex_replace(spec: Dict) -> Callable[[pd.Series], pd.Series]:
+    pattern = re.compile(spec["pattern"])
+    replacement = spec.get("replacement", "")
+    return lambda values: _on_distinct(values, lambda v: _as_text(v).str.replace(pattern, replacement, regex=True))
+
+@register_transform("date")
+def _date(spec: Dict) -> Callable[[pd.Series], pd.Series]:
+    date_format = spec.get("format")
+    dayfirst = spec.get("dayfirst", False)
+    output_format = spec.get("output_format")
+
+    def parse(values: pd.Series) -> pd.Series:
+        if not pd.api.types.is_datetime64_any_dtype(values):
+            source = values if date_format is None else _as_text(values)
+            values = _on_distinct(source, lambda v: pd.to_datetime(v, format=date_format, dayfirst=dayfirst, errors="coerce"))
+        return values.dt.strftime(output_format) if output_format else values
+    return parse
+
+@register_transform("number")
+def _number(spec: Dict) -> Callable[[pd.Series], pd.Series]:
+    locale = NUMBER_LOCALES.get(spec.get("locale", "en"))
+    if locale is None:
+        raise ValueError(f"Locale inconnue pour la transformation number: '{spec.get('locale')}'")
+    decimal = spec.get("decimal", locale["decimal"])
+    thousands = spec.get("thousands", locale["thousands"])
+    thousands_pattern = re.compile("|".join(re.escape(sep) for sep in thousands)) if thousands else None
+
+    def cast(values: pd.Series) -> pd.Series:
+        if pd.api.types.is_numeric_dtype(values):
+            return values
+        return _on_distinct(values, parse)
+
+    def parse(values: pd.Series) -> pd.Series:
+        text = _as_text(values).str.strip()
+        if thousands_pattern is not None:
+            text = text.str.replace(thousands_pattern, "", regex=True)
+        if decimal != ".":
+            text = text.str.replace(decimal, ".", regex=False)
+        return pd.to_numeric(text, errors="coerce")
+    return cast
+
+@register_transform("lookup")
+def _lookup(spec: Dict) -> Callable[[pd.Series], pd.Series]:
+    table = spec["table"]
+    has_default = "default" in spec
+    default = spec.get("default")
+
+    def lookup(values: pd.Series) -> pd.Series:
+        values = values.astype(object)
+        found = values.isin(list(table.keys()))
+        # Sans valeur par défaut, les valeurs absentes de la table sont conservées
+        return values.map(table).where(found, default if has_default else values)
+    return lookup
+
+def compile_transforms(specs: List[Dict]) -> Callable[[pd.Series], pd.Series]:
+    """
+    Compile une liste déclarative de transformations en une opération sur colonne.
+
+    Chaque spécification est un dict avec une clé "op" et ses paramètres :
+    - {"op": "trim"}, {"op": "upper"}, {"op": "lower"}
+    - {"op": "regex_replace", "pattern": r"[^0-9+]", "replacement": ""}
+    - {"op": "date", "format": "%d/%m/%Y", "output_format": "%Y-%m-%d"}
+    - {"op": "number", "locale": "fr"} (ou "decimal" / "thousands" explicites)
+    - {"op": "lookup", "table": {"O": "Oui", "N": "Non"}, "default": None}
+
+    Args:
+        specs: Transformations à appliquer dans l'ordre
+
+    Returns:
+        Callable: Fonction appliquant toutes les transformations à une pd.Series
+
+    Raises:
+        ValueError: Si une transformation est inconnue ou mal configurée
+    """
+    steps = []
+    for spec in specs or []:
+        op = spec.get("op") if isinstance(spec, dict) else None
+        if op not in TRANSFORMS:
+            raise ValueError(f"Transformation inconnue: {spec!r} (disponibles: {', '.join(TRANSFORMS)})")
+        try:
+            steps.append(TRANSFORMS[op](spec))
+        except (KeyError, re.error) as e:
+            raise ValueError(f"Transformation '{op}' mal configurée: {str(e)}") from e
+
+    def apply(values: pd.Series) -> pd.Series:
+        for step in steps:
+            values = step(values)
+        return values
+    return apply
@@ -0,0 +1,139 @@
+import os
+from typing import Dict
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# UUID sous forme binaire : 16 octets par valeur dans un tableau Arrow, sans objet Python
+UUID_TYPE = pa.binary(16)
+UUID_DTYPE = pd.ArrowDtype(UUID_TYPE)
+
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+# Position des 32 chiffres hexadécimaux dans le texte 8-4-4-4-12
+_TEXT_POSITIONS = np.array([i for i in range(36) if i not in (8, 13, 18, 23)])
+
+def _uuid_array(raw: np.ndarray, valid: np.ndarray = None) -> pd.api.extensions.ExtensionArray:
+    """Tableau de UUID binaires à partir d'une matrice (n, 16) d'octets, NA hors de valid"""
+    array = pa.FixedSizeBinaryArray.from_buffers(UUID_TYPE, len(raw), [None, pa.py_buffer(np.ascontiguousarray(raw))])
+    if valid is not None and not valid.all():
+        array = pc.if_else(pa.array(valid), array, pa.scalar(None, UUID_TYPE))
+    return pd.array(array, dtype=UUID_DTYPE)
+
+def _uuid_bytes(values) -> tuple:
+    """Matrice (n, 16) des octets d'un tableau de UUID binaires et masque des valeurs présentes"""
+    array = pa.array(values, type=UUID_TYPE)
+    if isinstance(array, pa.ChunkedArray):
+        array = array.combine_chunks()
+    valid = array.is_valid().to_numpy(zero_copy_only=False)
+    array = array.fill_null(b"\0" * 16)
+    data = np.frombuffer(array.buffers()[1], dtype=np.uint8)
+    raw = data[array.offset * 16:(array.offset + len(array)) * 16].reshape(-1, 16)
+    return raw, valid
+
+def new_uuids(count: int) -> pd.api.extensions.ExtensionArray:
+    """
+    Génère count UUID version 4 aléatoires, en un seul tirage.
+
+    Returns:
+        ExtensionArray: UUID binaires (voir UUID_DTYPE)
+    """
+    raw = np.frombuffer(os.urandom(16 * count), dtype=np.uint8).reshape(count, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # variante RFC 4122
+    return _uuid_array(raw)
+
+def format_uuids(values) -> np.ndarray:
+    """
+    Convertit des UUID binaires en texte "xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx".
+
+    La conversion est vectorisée sur les octets ; les valeurs manquantes
+    deviennent des chaînes vides, comme les références non résolues.
+
+    Returns:
+        np.ndarray: Textes (objets str)
+    """
+    raw, valid = _uuid_bytes(values)
+    digits = np.empty((len(raw), 32), dtype=np.uint8)
+    digits[:, 0::2] = _HEX_DIGITS[raw >> 4]
+    digits[:, 1::2] = _HEX_DIGITS[raw & 0x0F]
+    text = np.full((len(raw), 36), ord("-"), dtype=np.uint8)
+    text[:, _TEXT_POSITIONS] = digits
+    # Textes de largeur fixe : un tampon de chaînes Arrow converti en str en une passe
+    offsets = np.arange(0, 36 * (len(raw) + 1), 36, dtype=np.int64)
+    formatted = pa.Array.from_buffers(pa.large_string(), len(raw), [None, pa.py_buffer(offsets), pa.py_buffer(text)])
+    formatted = formatted.to_numpy(zero_copy_only=False)
+    formatted[~valid] = ""
+    return formatted
+
+def parse_uuids(texts) -> pd.api.extensions.ExtensionArray:
+    """Convertit des UUID texte en UUID binaires (valeur manquante ou vide : NA)"""
+    texts = pd.Series(texts, dtype=object)
+    valid = (texts.notna() & (texts != "")).to_numpy()
+    hex_text = "".join(texts[valid].str.replace("-", "", regex=False))
+    raw = np.zeros((len(texts), 16), dtype=np.uint8)
+    raw[valid] = np.frombuffer(bytes.fromhex(hex_text), dtype=np.uint8).reshape(-1, 16)
+    return _uuid_array(raw, valid)
+
+def is_uuid_column(values: pd.Series) -> bool:
+    """Colonne de UUID binaires (ID ou référence)"""
+    return values.dtype == UUID_DTYPE
+
+def format_uuid_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Copie d'un modèle généré dont les colonnes UUID binaires sont converties en texte"""
+    columns = [col for col in df.columns if is_uuid_column(df[col])]
+    if not columns:
+        return df
+    return df.assign(**{col: format_uuids(df[col].array) for col in columns})
+
+def create_uuid_table(values) -> pd.Series:
+    """
+    Attribue un UUID à chaque valeur distincte non manquante.
+
+    Args:
+        values: Valeurs clés (doublons et NA acceptés)
+
+    Returns:
+        pd.Series: UUID binaires indexés par valeur clé, dans l'ordre
+        d'apparition
+    """
+    keys = pd.Index(pd.unique(pd.Series(values).dropna().to_numpy()))
+    return pd.Series(new_uuids(len(keys)), index=keys)
+
+def lookup_uuids(uuid_table: pd.Series, values: pd.Series) -> pd.Series:
+    """UUID de chaque valeur (table de hachage de l'index), NA si la valeur n'a pas de UUID"""
+    positions = uuid_table.index.get_indexer(values)
+    return pd.Series(uuid_table.array.take(positions, allow_fill=True), index=values.index)
+
+def reuse_uuids(uuid_table: pd.Series, stable: pd.Series) -> pd.Series:
+    """Reprend les UUID de stable (génération précédente) pour les clés qu'il connaît"""
+    positions = stable.index.get_indexer(uuid_table.index)
+    found = positions >= 0
+    if not found.any():
+        return uuid_table
+    raw, _ = _uuid_bytes(uuid_table.array)
+    stable_raw, _ = _uuid_bytes(stable.array)
+    raw = raw.copy()
+    raw[found] = stable_raw[positions[found]]
+    return pd.Series(_uuid_array(raw), index=uuid_table.index)
+
+def verify_uuid_table(uuid_table: pd.Series, values) -> bool:
+    """
+    Vérifie une table UUID : toutes les valeurs non manquantes ont un UUID,
+    chaque valeur a un seul UUID et deux valeurs n'ont jamais le même UUID.
+    """
+    values = pd.Series(values).dropna()
+    if uuid_table.index.has_duplicates or uuid_table.duplicated().any():
+        return False
+    return bool((uuid_table.index.get_indexer(values) >= 0).all())
+
+def uuid_table_stats(uuid_table: pd.Series, values) -> Dict[str, int]:
+    """Statistiques d'une table UUID, comme get_mapping_stats"""
+    values = pd.Series(values)
+    return {
+        "total_values": len(values),
+        "unique_values": int(values.nunique(dropna=True)),
+        "mapped_values": len(uuid_table),
+        "na_values": int(values.isna().sum())
+    }